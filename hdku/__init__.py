@@ -1,10 +1,49 @@
-from . import hangul
-from . import hangul_automata
-from . import ko_levenstein_distance
-from . import utils
-from .hangul import *  # NOQA
-from .hangul_automata import *  # NOQA
-from .ko_levenstein_distance import * # NOQA
-from .utils import * # NOQA
-
-__all__ = hangul.__all__ + hangul_automata.__all__ + ko_levenstein_distance.__all__ + utils.__all__
+"""Hangul Dubeolsik keystroke utils.
+
+Submodules are imported when one of their names is first accessed
+(PEP 562), so ``import hdku`` loads nothing, and NumPy comes in only with
+the classes that compute distances.
+"""
+
+import importlib
+
+# public name -> submodule defining it
+_EXPORTS = {
+    'KoDubeolsikBKTree': 'bk_tree',
+    'convert_column': 'bulk',
+    'CostEstimator': 'cost_estimator',
+    'CostModel': 'cost_model',
+    'Hangul': 'hangul',
+    'JamoAutomata': 'hangul_automata',
+    'KeystrokeAutomata': 'hangul_automata',
+    'convert_jamos_to_hangul': 'hangul_automata',
+    'convert_keystrokes_to_hangul': 'hangul_automata',
+    'Stats': 'instrumentation',
+    'JamoCostModel': 'jamo_distance',
+    'KoJamoDistance': 'jamo_distance',
+    'KoDubeolsikTrie': 'keystroke_trie',
+    'EditOperation': 'ko_levenstein_distance',
+    'KoLevensteinDistance': 'ko_levenstein_distance',
+    'DistanceService': 'service',
+    'serve': 'service',
+    'KoSpellCorrector': 'spell_corrector',
+    'KoDubeolsikDistance': 'utils',
+}
+_SUBMODULES = frozenset(_EXPORTS.values())
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module('.' + _EXPORTS[name], __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
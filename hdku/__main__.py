@@ -0,0 +1,279 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+"""Command line interface, e.g. ``python -m hdku to-keys corpus.txt``.
+
+Input lines are read lazily, grouped into chunks and converted in worker
+processes, at most a few chunks ahead of the output, which keeps the input
+order and bounds memory for inputs of any size.
+
+``python -m hdku index lexicon.tsv -o lexicon.idx`` builds the file that
+KoSpellCorrector.load maps into memory, ``python -m hdku estimate-costs
+typos.tsv -o costs.json`` a cost table from typed<TAB>corrected pairs and
+``python -m hdku serve`` a local JSON lines/HTTP server of DistanceService.
+"""
+
+import argparse
+import fileinput
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, TextIO
+
+# per process converter, set by _init_worker
+_state: dict = {}
+
+
+def _converter(options: Dict) -> Callable[[str], str]:
+    command: str = options['command']
+    if command == 'distance':
+        from .utils import KoDubeolsikDistance
+        kdd = KoDubeolsikDistance()
+        src: int = options['src_column']
+        target: int = options['target_column']
+        max_cost: Optional[float] = options['max_cost']
+
+        def distance(line: str) -> str:
+            fields: List[str] = line.split('\t')
+            if max(src, target) >= len(fields):
+                raise ValueError('expected columns {} and {} in {!r}'.format(src + 1, target + 1, line))
+            return '{}\t{}'.format(line, kdd.get_distance(fields[src], fields[target], max_cost))
+        return distance
+    if command == 'from-keys':
+        from .hangul_automata import KeystrokeAutomata
+        return KeystrokeAutomata(not options['no_force']).convert
+    from .hangul import Hangul
+    h = Hangul()
+    if command == 'to-jamo':
+        return lambda line: h.convert_hangul_to_jamos(line, options['div'])
+    return lambda line: h.convert_hangul_to_keystrokes(line, options['fullwidth'], options['div'])
+
+
+def _init_worker(options: Dict) -> None:
+    _state['convert'] = _converter(options)
+
+
+def _convert_chunk(lines: List[str]) -> List[str]:
+    convert: Callable[[str], str] = _state['convert']
+    return [convert(line) for line in lines]
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    it: Iterator[str] = (line.rstrip('\r\n') for line in lines)
+    while True:
+        chunk: List[str] = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered_map(pool: ProcessPoolExecutor, chunks: Iterable[List[str]], window: int) -> Iterator[List[str]]:
+    # like pool.map, but without submitting the whole input up front
+    pending: Deque[Future] = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_convert_chunk, chunk))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class _Progress:
+    """lines per second on stderr, every `interval` seconds and at the end"""
+
+    def __init__(self, stream: Optional[TextIO], interval: float = 10.0) -> None:
+        self.stream = stream
+        self.interval = interval
+        self.lines: int = 0
+        self.start: float = time.perf_counter()
+        self.last: float = self.start
+
+    def update(self, lines: int) -> None:
+        self.lines += lines
+        now: float = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.report()
+
+    def report(self) -> None:
+        if self.stream is None:
+            return
+        elapsed: float = max(time.perf_counter() - self.start, 1e-9)
+        self.stream.write('hdku: {} lines in {:.1f}s, {:.0f} lines/s\n'.format(
+            self.lines, elapsed, self.lines / elapsed))
+        self.stream.flush()
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m hdku', description='Hangul Dubeolsik keystroke utils')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='*', help='input files, stdin when none or -')
+    common.add_argument('-o', '--output', help='output file, stdout by default')
+    common.add_argument('-j', '--jobs', type=int, default=1, help='worker processes (default: 1)')
+    common.add_argument('--chunk-size', type=int, default=1000, help='lines per task (default: 1000)')
+    common.add_argument('-q', '--quiet', action='store_true', help='no lines/s report on stderr')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    distance = commands.add_parser('distance', parents=[common],
+                                   help='append the keystroke distance of two tab-separated columns')
+    distance.add_argument('--src-column', type=int, default=1, help='1-based (default: 1)')
+    distance.add_argument('--target-column', type=int, default=2, help='1-based (default: 2)')
+    distance.add_argument('--max-cost', type=float, help='distances over it are written as inf')
+
+    to_jamo = commands.add_parser('to-jamo', parents=[common], help='Hangul to jamos')
+    to_jamo.add_argument('--div', action='store_true', help='divider after every syllable')
+
+    to_keys = commands.add_parser('to-keys', parents=[common], help='Hangul to Dubeolsik keystrokes')
+    to_keys.add_argument('--fullwidth', action='store_true', help='fullwidth keystrokes for Hangul')
+    to_keys.add_argument('--div', action='store_true', help='divider after every syllable')
+
+    from_keys = commands.add_parser('from-keys', parents=[common], help='Dubeolsik keystrokes to Hangul')
+    from_keys.add_argument('--no-force', action='store_true', help='keep words that are not valid Hangul as typed')
+
+    index = commands.add_parser('index', help='build a spelling corrector index of word<TAB>frequency lines')
+    index.add_argument('files', nargs='*', help='input files, stdin when none or -')
+    index.add_argument('-o', '--output', required=True, help='index file')
+    index.add_argument('--max-edits', type=int, default=2, help='keystroke edits covered by the index (default: 2)')
+
+    estimate = commands.add_parser('estimate-costs', help='estimate a cost table from typed<TAB>corrected lines')
+    estimate.add_argument('files', nargs='+', help='input files')
+    estimate.add_argument('-o', '--output', required=True, help='cost table, .npz or JSON')
+    estimate.add_argument('-j', '--jobs', type=int, default=1, help='worker processes (default: 1)')
+    estimate.add_argument('--chunk-size', type=int, default=10000, help='lines per task (default: 10000)')
+    estimate.add_argument('--costs', help='cost table to align with, the built-in one by default')
+    estimate.add_argument('--checkpoint', help='resumable counts, continued when the file exists')
+    estimate.add_argument('--checkpoint-every', type=int, default=1000000,
+                          help='lines between checkpoints (default: 1000000)')
+    estimate.add_argument('--min-count', type=int, default=100,
+                          help='observations needed to estimate a keystroke (default: 100)')
+
+    server = commands.add_parser('serve', help='serve distances and conversions as JSON lines or HTTP')
+    server.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    server.add_argument('--port', type=int, default=8700, help='port (default: 8700)')
+    server.add_argument('-j', '--jobs', type=int, default=1, help='worker processes (default: 1)')
+    server.add_argument('--costs',
+                        help='cost table, reloaded on SIGHUP or a "reload" request, the built-in one by default')
+    server.add_argument('--max-delay', type=float, default=2.0, help='ms a request waits for a batch (default: 2)')
+    server.add_argument('--max-batch', type=int, default=256, help='requests per batch (default: 256)')
+    server.add_argument('--max-pending', type=int, default=10000,
+                        help='requests waiting for a batch before clients are slowed down (default: 10000)')
+    return parser
+
+
+def _build_index(args: argparse.Namespace) -> None:
+    from .spell_corrector import KoSpellCorrector
+    corrector = KoSpellCorrector(max_edits=args.max_edits)
+    with fileinput.input(args.files, openhook=fileinput.hook_encoded('utf-8')) as lines:
+        for line in lines:
+            fields: List[str] = line.rstrip('\r\n').split('\t')
+            if not fields[0]:
+                continue
+            try:
+                corrector.add(fields[0], int(fields[1]) if len(fields) > 1 else 1)
+            except ValueError:
+                raise ValueError('expected word<TAB>frequency in {!r}'.format(line.rstrip('\r\n')))
+    corrector.save(args.output)
+
+
+def _estimate_costs(args: argparse.Namespace) -> None:
+    from .cost_estimator import CostEstimator
+    from .cost_model import CostModel
+    estimator = CostEstimator(CostModel.load(args.costs) if args.costs else None)
+    estimator.fit_files(args.files, n_jobs=args.jobs, chunk_size=args.chunk_size,
+                        checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every)
+    estimator.to_cost_model(min_count=args.min_count).save(args.output)
+
+
+def _serve(args: argparse.Namespace) -> None:
+    import asyncio
+    from .cost_model import CostModel
+    from .service import DistanceService, serve
+
+    def ready(server: asyncio.AbstractServer) -> None:
+        host, port = server.sockets[0].getsockname()[:2]
+        sys.stderr.write('hdku: serving on {}:{}\n'.format(host, port))
+
+    async def run() -> None:
+        service = DistanceService(args.jobs, CostModel.load(args.costs) if args.costs else None,
+                                  args.max_delay / 1000, args.max_batch, args.max_pending)
+        async with service:
+            await serve(service, args.host, args.port, args.costs, ready)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+def _options(args: argparse.Namespace) -> Dict:
+    # picklable settings of the converter
+    options: Dict = {'command': args.command}
+    if args.command == 'distance':
+        options.update(src_column=args.src_column - 1, target_column=args.target_column - 1,
+                       max_cost=args.max_cost)
+    elif args.command == 'from-keys':
+        options.update(no_force=args.no_force)
+    else:
+        options.update(div=args.div, fullwidth=getattr(args, 'fullwidth', False))
+    return options
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.command in ('index', 'estimate-costs', 'serve'):
+        try:
+            if args.command == 'index':
+                _build_index(args)
+            elif args.command == 'estimate-costs':
+                _estimate_costs(args)
+            else:
+                _serve(args)
+        except ValueError as e:
+            parser.exit(1, 'hdku: error: {}\n'.format(e))
+        return 0
+    if args.jobs < 1 or args.chunk_size < 1:
+        parser.error('--jobs and --chunk-size must be positive')
+    if args.command == 'distance' and min(args.src_column, args.target_column) < 1:
+        parser.error('columns are 1-based')
+    options: Dict = _options(args)
+    progress = _Progress(None if args.quiet else sys.stderr)
+    out: TextIO = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    lines = fileinput.input(args.files, openhook=fileinput.hook_encoded('utf-8'))
+    try:
+        chunks: Iterator[List[str]] = _chunks(lines, args.chunk_size)
+        if args.jobs > 1:
+            pool = ProcessPoolExecutor(args.jobs, initializer=_init_worker, initargs=(options, ))
+            results: Iterator[List[str]] = _ordered_map(pool, chunks, 2 * args.jobs)
+        else:
+            pool = None
+            _init_worker(options)
+            results = map(_convert_chunk, chunks)
+        try:
+            for result in results:
+                out.write('\n'.join(result))
+                out.write('\n')
+                progress.update(len(result))
+            out.flush()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    except ValueError as e:
+        parser.exit(1, 'hdku: error: {}\n'.format(e))
+    except BrokenPipeError:
+        # the reader went away, e.g. `| head`, silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        lines.close()
+        if out is not sys.stdout:
+            out.close()
+    progress.report()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
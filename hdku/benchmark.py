@@ -0,0 +1,249 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+"""Reproducible benchmarks, e.g. ``python -m hdku.benchmark -o run.json --baseline base.json``.
+
+Every case runs over a seeded synthetic corpus in three length buckets
+(word, sentence, paragraph). Timing and peak memory are measured in
+separate passes, since tracemalloc slows the code it traces. The import
+statements of IMPORTS are timed in fresh interpreters, startup being paid
+by every short-lived process.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .hangul import Hangul
+from .hangul_automata import JamoAutomata, KeystrokeAutomata
+from .ko_levenstein_distance import KoLevensteinDistance
+from .utils import KoDubeolsikDistance
+
+__all__ = ['make_corpus', 'measure_imports', 'run_benchmarks', 'compare']
+
+# number of texts of each bucket at scale 1
+BUCKETS: Dict[str, int] = {'word': 2000, 'sentence': 300, 'paragraph': 30}
+# statements timed by measure_imports
+IMPORTS: Tuple[str, ...] = ('import hdku', 'from hdku import Hangul', 'from hdku import KoDubeolsikDistance')
+
+
+def make_corpus(bucket: str, size: int, seed: int = 0) -> List[str]:
+    """seeded synthetic Korean texts
+
+    Syllables follow a Zipf-like distribution over a fixed vocabulary, so the
+    texts repeat syllables the way real text does.
+
+    Args:
+        bucket (str): 'word', 'sentence' or 'paragraph'
+        size (int): number of texts
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        List[str]: texts
+    """
+    rnd = random.Random(seed)
+    vocab: List[str] = [chr(Hangul.HANGUL_SYLLABLE_START + rnd.randrange(11172)) for _ in range(2000)]
+    weights: List[float] = [1 / (rank + 1) for rank in range(len(vocab))]
+
+    def word() -> str:
+        return ''.join(rnd.choices(vocab, weights, k=rnd.randint(1, 4)))
+
+    def sentence() -> str:
+        return ' '.join(word() for _ in range(rnd.randint(4, 12))) + rnd.choice('.?!')
+
+    if bucket == 'word':
+        return [word() for _ in range(size)]
+    if bucket == 'sentence':
+        return [sentence() for _ in range(size)]
+    if bucket == 'paragraph':
+        return [' '.join(sentence() for _ in range(rnd.randint(4, 8))) for _ in range(size)]
+    raise ValueError('unknown bucket {!r}'.format(bucket))
+
+
+def _typo(text: str, rnd: random.Random) -> str:
+    # one to three substituted, dropped or doubled characters
+    chars: List[str] = list(text)
+    for _ in range(rnd.randint(1, 3)):
+        i: int = rnd.randrange(len(chars))
+        op: float = rnd.random()
+        if op < 0.5:
+            chars[i] = chr(Hangul.HANGUL_SYLLABLE_START + rnd.randrange(11172))
+        elif op < 0.75 and len(chars) > 1:
+            del chars[i]
+        else:
+            chars.insert(i, chars[i])
+    return ''.join(chars)
+
+
+def _cases(texts: List[str], seed: int) -> List[Tuple[str, Callable, List[tuple], int]]:
+    # (name, function, argument tuples, number of input characters)
+    h = Hangul()
+    kdd = KoDubeolsikDistance()
+    lev = KoLevensteinDistance()
+    rnd = random.Random(seed)
+    jamos: List[str] = [h.convert_hangul_to_jamos(t) for t in texts]
+    keys: List[str] = [h.convert_hangul_to_keystrokes(t) for t in texts]
+    pairs: List[Tuple[str, str]] = [(t, _typo(t, rnd)) for t in texts]
+    key_pairs: List[Tuple[str, str]] = [(h.convert_hangul_to_keystrokes(a), h.convert_hangul_to_keystrokes(b))
+                                        for a, b in pairs]
+    n_chars: int = sum(map(len, texts))
+    return [
+        ('Hangul.convert_hangul_to_jamos', h.convert_hangul_to_jamos, [(t, ) for t in texts], n_chars),
+        ('Hangul.convert_hangul_to_keystrokes', h.convert_hangul_to_keystrokes, [(t, ) for t in texts], n_chars),
+        ('KeystrokeAutomata.convert', KeystrokeAutomata().convert, [(k, ) for k in keys], sum(map(len, keys))),
+        ('JamoAutomata.convert', JamoAutomata().convert, [(j, ) for j in jamos], sum(map(len, jamos))),
+        ('KoLevensteinDistance.get_dubeolsik_distance', lev.get_dubeolsik_distance, key_pairs,
+         sum(len(a) + len(b) for a, b in key_pairs)),
+        ('KoDubeolsikDistance.get_distance', kdd.get_distance, pairs, sum(len(a) + len(b) for a, b in pairs)),
+    ]
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _measure(func: Callable, args: List[tuple], n_chars: int) -> Dict[str, float]:
+    for a in args[:10]:
+        func(*a)  # warm up caches and lazily built tables
+    latencies: List[float] = []
+    clock = time.perf_counter
+    start: float = clock()
+    for a in args:
+        t: float = clock()
+        func(*a)
+        latencies.append(clock() - t)
+    seconds: float = clock() - start
+    latencies.sort()
+
+    tracemalloc.start()
+    try:
+        for a in args:
+            func(*a)
+        peak: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'calls': len(args), 'chars': n_chars, 'seconds': seconds,
+            'calls_per_s': len(args) / seconds, 'chars_per_s': n_chars / seconds,
+            'p50_us': _percentile(latencies, 0.5) * 1e6, 'p99_us': _percentile(latencies, 0.99) * 1e6,
+            'peak_kib': peak / 1024}
+
+
+def measure_imports(repeat: int = 5) -> Dict[str, float]:
+    """milliseconds each statement of IMPORTS takes in a fresh interpreter
+
+    Args:
+        repeat (int, optional): interpreters started per statement, the fastest counts. Defaults to 5.
+
+    Returns:
+        Dict[str, float]: milliseconds by statement
+    """
+    env: Dict[str, str] = dict(os.environ)
+    # the hdku being measured, not an installed one
+    root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (root, env.get('PYTHONPATH')) if p)
+    timings: Dict[str, float] = {}
+    for statement in IMPORTS:
+        code: str = 'import time; t = time.perf_counter(); {}; print(time.perf_counter() - t)'.format(statement)
+        timings[statement] = min(
+            float(subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                                 stdout=subprocess.PIPE, universal_newlines=True).stdout)
+            for _ in range(repeat)) * 1e3
+    return timings
+
+
+def run_benchmarks(scale: float = 1.0, seed: int = 0, buckets: Optional[Sequence[str]] = None,
+                   cases: Optional[Sequence[str]] = None, imports: bool = True) -> Dict:
+    """time every case on every length bucket
+
+    Args:
+        scale (float, optional): multiplies the number of texts per bucket. Defaults to 1.0.
+        seed (int, optional): corpus seed. Defaults to 0.
+        buckets (Optional[Sequence[str]], optional): subset of BUCKETS. Defaults to None.
+        cases (Optional[Sequence[str]], optional): subset of the case names. Defaults to None.
+        imports (bool, optional): also run measure_imports. Defaults to True.
+
+    Returns:
+        Dict: 'meta', 'results', keyed by 'case/bucket', and 'imports' when measured
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for bucket in buckets or BUCKETS:
+        texts: List[str] = make_corpus(bucket, max(1, int(BUCKETS[bucket] * scale)), seed)
+        for name, func, args, n_chars in _cases(texts, seed):
+            if cases is None or name in cases:
+                results['{}/{}'.format(name, bucket)] = _measure(func, args, n_chars)
+    meta: Dict = {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+                  'machine': platform.machine(), 'scale': scale, 'seed': seed}
+    run: Dict = {'meta': meta, 'results': results}
+    if imports:
+        run['imports'] = measure_imports()
+    return run
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float = 0.2) -> List[str]:
+    """regressions of `current` against `baseline`
+
+    Args:
+        baseline (Dict): output of run_benchmarks
+        current (Dict): output of run_benchmarks
+        tolerance (float, optional): allowed relative loss of throughput and
+            growth of p99 latency, peak memory and import time. Defaults to 0.2.
+
+    Returns:
+        List[str]: one message per regression
+    """
+    regressions: List[str] = []
+    for key, now in current['results'].items():
+        before: Optional[Dict[str, float]] = baseline['results'].get(key)
+        if before is None:
+            continue
+        if now['chars_per_s'] < before['chars_per_s'] * (1 - tolerance):
+            regressions.append('{}: throughput {:.0f} -> {:.0f} chars/s'.format(
+                key, before['chars_per_s'], now['chars_per_s']))
+        for metric in ('p99_us', 'peak_kib'):
+            if now[metric] > before[metric] * (1 + tolerance):
+                regressions.append('{}: {} {:.1f} -> {:.1f}'.format(key, metric, before[metric], now[metric]))
+    for statement, now_ms in current.get('imports', {}).items():
+        before_ms: Optional[float] = baseline.get('imports', {}).get(statement)
+        if before_ms is not None and now_ms > before_ms * (1 + tolerance):
+            regressions.append('{}: {:.1f} -> {:.1f}ms'.format(statement, before_ms, now_ms))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m hdku.benchmark', description='HDKU benchmarks')
+    parser.add_argument('-o', '--output', help='write the results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression (default: 0.2)')
+    parser.add_argument('--scale', type=float, default=1.0, help='corpus size multiplier (default: 1)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bucket', action='append', choices=list(BUCKETS), help='only these buckets')
+    parser.add_argument('--no-imports', action='store_true', help='skip the import time measurements')
+    args = parser.parse_args(argv)
+
+    current: Dict = run_benchmarks(args.scale, args.seed, args.bucket, imports=not args.no_imports)
+    for key, r in current['results'].items():
+        print('{:60s} {:12.0f} chars/s  p50 {:9.1f}us  p99 {:9.1f}us  peak {:9.1f}KiB'.format(
+            key, r['chars_per_s'], r['p50_us'], r['p99_us'], r['peak_kib']))
+    for statement, ms in current.get('imports', {}).items():
+        print('{:60s} {:9.1f}ms'.format(statement, ms))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions: List[str] = compare(json.load(f), current, args.tolerance)
+        for message in regressions:
+            print('regression: ' + message, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = ['KoDubeolsikBKTree']
+
+
+class KoDubeolsikBKTree:
+    """BK-tree over keystroke strings for dictionary lookup.
+
+    Nodes are pruned with the triangle inequality, which needs a symmetric
+    distance, so the tree uses the mean of the Dubeolsik distance in both
+    directions (KoDubeolsikDistance.get_symmetric_distance). The weighted
+    distance does not satisfy the triangle inequality for every triple, so
+    a few far-off matches can be missed in exchange for sublinear lookups.
+    """
+    # tolerance of the float comparisons between edge labels and distances
+    EPSILON: float = 1e-9
+
+    def __init__(self, distance=None) -> None:
+        if distance is None:
+            from .utils import KoDubeolsikDistance
+            distance = KoDubeolsikDistance()
+        self.distance = distance
+        self.keys: List[str] = []
+        self.words: List[List[str]] = []
+        self.children: List[Dict[float, int]] = []
+        # number of distance evaluations of the last query or knn call
+        self.last_evaluations: int = 0
+
+    def __len__(self) -> int:
+        return sum(len(w) for w in self.words)
+
+    def _distance(self, a: str, b: str) -> float:
+        lev = self.distance.dubul_levelstein
+        return round((lev.get_dubeolsik_distance(a, b) + lev.get_dubeolsik_distance(b, a)) / 2, 6)
+
+    def build(self, words: Iterable[str]) -> 'KoDubeolsikBKTree':
+        for word in words:
+            self.add(word)
+        return self
+
+    def add(self, word: str) -> None:
+        key: str = self.distance.hangul.convert_hangul_to_keystrokes(word)
+        if not self.keys:
+            self._new_node(key, word)
+            return
+        node: int = 0
+        while True:
+            d: float = self._distance(key, self.keys[node])
+            if d == 0 and key == self.keys[node]:
+                if word not in self.words[node]:
+                    self.words[node].append(word)
+                return
+            child: Optional[int] = self.children[node].get(d)
+            if child is None:
+                self.children[node][d] = self._new_node(key, word)
+                return
+            node = child
+
+    def _new_node(self, key: str, word: str) -> int:
+        self.keys.append(key)
+        self.words.append([word])
+        self.children.append({})
+        return len(self.keys) - 1
+
+    def query(self, word: str, max_cost: float) -> List[Tuple[float, str]]:
+        """all words within `max_cost` of `word`
+
+        Args:
+            word (str): Hangul string
+            max_cost (float): largest symmetrized distance
+
+        Returns:
+            List[Tuple[float, str]]: (distance, word) sorted by distance
+        """
+        self.last_evaluations = 0
+        if not self.keys:
+            return []
+        key: str = self.distance.hangul.convert_hangul_to_keystrokes(word)
+        found: List[Tuple[float, str]] = []
+        stack: List[int] = [0]
+        while stack:
+            node: int = stack.pop()
+            d: float = self._distance(key, self.keys[node])
+            self.last_evaluations += 1
+            if d <= max_cost + KoDubeolsikBKTree.EPSILON:
+                found.extend((d, w) for w in self.words[node])
+            lo: float = d - max_cost - KoDubeolsikBKTree.EPSILON
+            hi: float = d + max_cost + KoDubeolsikBKTree.EPSILON
+            stack.extend(c for label, c in self.children[node].items() if lo <= label <= hi)
+        found.sort()
+        return found
+
+    def knn(self, word: str, k: int) -> List[Tuple[float, str]]:
+        """the `k` nearest words of `word`
+
+        Args:
+            word (str): Hangul string
+            k (int): number of neighbours
+
+        Returns:
+            List[Tuple[float, str]]: (distance, word) sorted by distance
+        """
+        self.last_evaluations = 0
+        if not self.keys or k <= 0:
+            return []
+        key: str = self.distance.hangul.convert_hangul_to_keystrokes(word)
+        # max heap of the best k as (-distance, -node, word)
+        best: List[Tuple[float, int, str]] = []
+        # min heap of (lower bound of the subtree, node)
+        pending: List[Tuple[float, int]] = [(0.0, 0)]
+        while pending:
+            bound, node = heapq.heappop(pending)
+            if len(best) == k and bound > -best[0][0] + KoDubeolsikBKTree.EPSILON:
+                break
+            d: float = self._distance(key, self.keys[node])
+            self.last_evaluations += 1
+            for w in self.words[node]:
+                if len(best) < k:
+                    heapq.heappush(best, (-d, -node, w))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, -node, w))
+            radius: float = -best[0][0] if len(best) == k else float('inf')
+            for label, child in self.children[node].items():
+                lower: float = abs(d - label)
+                if lower <= radius + KoDubeolsikBKTree.EPSILON:
+                    heapq.heappush(pending, (lower, child))
+        return sorted((-d, w) for d, _, w in best)
@@ -0,0 +1,236 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+"""Conversion of whole columns of strings.
+
+convert_column takes a sequence of strings, a NumPy string array, an Arrow
+string array or a pandas Series and returns the converted column of the
+same kind. Rows are converted a chunk at a time, joined by a character
+none of them contains, so there is one conversion per chunk instead of one
+Python call per row. Hangul to jamos or keystrokes maps the code points of
+the chunk with NumPy. Arrow data is read in place from its buffers and
+written with preallocated offsets, without a Python string per row.
+
+pyarrow and pandas are optional, they are only needed for their own types.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .hangul import Hangul
+from .hangul_automata import KeystrokeAutomata
+
+__all__ = ['convert_column']
+
+# row separators for joined chunks, the first one absent from a chunk is used
+_SEPARATORS: Tuple[str, ...] = ('\x00', '\x1e', '\x1f', '\uffff')
+
+# largest offset of an Arrow string array, larger outputs become large_string
+_INT32_MAX: int = (1 << 31) - 1
+
+
+class _CodePointMap:
+    """A str.translate table as NumPy arrays over code points.
+
+    Row c of `points` holds the code points c is replaced by, padded with
+    PAD. Code points past the table map to themselves.
+    """
+    PAD: int = 0xFFFFFFFF
+
+    def __init__(self, table: Mapping[int, str]) -> None:
+        size: int = max(table) + 1
+        width: int = max(1, max(map(len, table.values())))
+        points = np.full((size, width), _CodePointMap.PAD, dtype=np.uint32)
+        points[:, 0] = np.arange(size, dtype=np.uint32)
+        nbytes = _utf8_lengths(np.arange(size, dtype=np.uint32))
+        for c, text in table.items():
+            points[c] = _CodePointMap.PAD
+            points[c, :len(text)] = [ord(ch) for ch in text]
+            nbytes[c] = len(text.encode('utf-8'))
+        self.size: int = size
+        self.points: np.ndarray = points
+        # utf-8 length of the replacement of every code point
+        self.nbytes: np.ndarray = nbytes
+
+    def map(self, cp: np.ndarray) -> np.ndarray:
+        """replacements of `cp` in a (len(cp), width) array padded with PAD"""
+        outside: np.ndarray = cp >= self.size
+        mapped: np.ndarray = self.points[np.where(outside, 0, cp)]
+        mapped[outside, 0] = cp[outside]
+        return mapped
+
+    def apply(self, cp: np.ndarray) -> np.ndarray:
+        """the code points of the converted text"""
+        flat: np.ndarray = self.map(cp).ravel()
+        return flat[flat != _CodePointMap.PAD]
+
+    def utf8_lengths(self, cp: np.ndarray) -> np.ndarray:
+        """utf-8 length of the replacement of every code point"""
+        outside: np.ndarray = cp >= self.size
+        lengths: np.ndarray = self.nbytes[np.where(outside, 0, cp)]
+        lengths[outside] = _utf8_lengths(cp[outside])
+        return lengths
+
+
+_maps: Dict[str, _CodePointMap] = {}
+
+
+def _code_point_map(op: str) -> _CodePointMap:
+    mapping: Optional[_CodePointMap] = _maps.get(op)
+    if mapping is None:
+        table: Mapping[int, str] = Hangul.translation_table('jamos' if op == 'to-jamo' else 'keystrokes')
+        mapping = _maps[op] = _CodePointMap(table)
+    return mapping
+
+
+def _utf8_lengths(cp: np.ndarray) -> np.ndarray:
+    return 1 + (cp >= 0x80).astype(np.int64) + (cp >= 0x800) + (cp >= 0x10000)
+
+
+def _decode(cp: np.ndarray) -> str:
+    return cp.astype(np.uint32, copy=False).tobytes().decode('utf-32-le')
+
+
+def _code_points(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+def _convert_texts(texts: List[str], op: str, force: bool) -> List[str]:
+    # convert a chunk of strings at once, joined by a separator none of them contains
+    sep: Optional[str] = None
+    joined: str = ''
+    for candidate in _SEPARATORS:
+        joined = candidate.join(texts)
+        if joined.count(candidate) == len(texts) - 1:
+            sep = candidate
+            break
+    if op == 'from-keys':
+        automata = KeystrokeAutomata(force)
+        # without force, a row whose last word is invalid is returned as typed
+        # as a whole, which the joined text cannot tell
+        if sep is None or not force:
+            return [automata.convert(t) for t in texts]
+        return automata.convert(joined).split(sep)
+    mapping: _CodePointMap = _code_point_map(op)
+    if sep is None:
+        return [_decode(mapping.apply(_code_points(t))) for t in texts]
+    return _decode(mapping.apply(_code_points(joined))).split(sep)
+
+
+def _convert_object_array(values: Sequence[Any], op: str, force: bool, chunk_size: int) -> List[Any]:
+    # strings converted chunk by chunk, other values such as None or NaN kept
+    out: List[Any] = list(values)
+    rows: List[int] = [i for i, v in enumerate(out) if isinstance(v, str)]
+    for start in range(0, len(rows), chunk_size):
+        chunk: List[int] = rows[start:start + chunk_size]
+        for i, text in zip(chunk, _convert_texts([out[i] for i in chunk], op, force)):
+            out[i] = text
+    return out
+
+
+def _convert_arrow(array: Any, op: str, force: bool, chunk_size: int) -> Any:
+    import pyarrow as pa
+
+    if isinstance(array, pa.ChunkedArray):
+        chunks: List[Any] = [_convert_arrow(c, op, force, chunk_size) for c in array.chunks]
+        if len({c.type for c in chunks}) > 1:
+            chunks = [c.cast(pa.large_string()) for c in chunks]
+        return pa.chunked_array(chunks, type=chunks[0].type if chunks else array.type)
+    if pa.types.is_string(array.type):
+        offset_type = np.int32
+    elif pa.types.is_large_string(array.type):
+        offset_type = np.int64
+    else:
+        raise ValueError('expected an Arrow string array, not {}'.format(array.type))
+    if array.offset:
+        # a slice, copied so that its buffers start at its first row
+        array = pa.concat_arrays([array])
+    n: int = len(array)
+    validity, offsets_buffer, data_buffer = array.buffers()
+    offsets: np.ndarray = np.frombuffer(offsets_buffer, dtype=offset_type, count=n + 1)
+    data: np.ndarray = np.frombuffer(data_buffer, dtype=np.uint8) if data_buffer is not None \
+        else np.zeros(0, dtype=np.uint8)
+
+    out_offsets: np.ndarray = np.zeros(n + 1, dtype=np.int64)
+    out_data = bytearray()
+    for start in range(0, n, chunk_size):
+        stop: int = min(n, start + chunk_size)
+        lo: int = int(offsets[start])
+        raw: np.ndarray = data[lo:int(offsets[stop])]
+        text: str = str(memoryview(raw), 'utf-8')
+        # code point offset of every row, from the utf-8 lead bytes
+        leads: np.ndarray = np.zeros(len(raw) + 1, dtype=np.int64)
+        np.cumsum((raw & 0xC0) != 0x80, out=leads[1:])
+        bounds: np.ndarray = leads[offsets[start:stop + 1] - lo]
+        if op == 'from-keys':
+            rows: List[str] = [text[a:b] for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+            encoded: List[bytes] = [t.encode('utf-8') for t in _convert_texts(rows, op, force)]
+            lengths: np.ndarray = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+            out_data += b''.join(encoded)
+        else:
+            mapping: _CodePointMap = _code_point_map(op)
+            cp: np.ndarray = _code_points(text)
+            cum: np.ndarray = np.zeros(len(cp) + 1, dtype=np.int64)
+            np.cumsum(mapping.utf8_lengths(cp), out=cum[1:])
+            lengths = np.diff(cum[bounds])
+            out_data += _decode(mapping.apply(cp)).encode('utf-8')
+        out_offsets[start + 1:stop + 1] = out_offsets[start] + np.cumsum(lengths)
+
+    out_type = array.type
+    if offset_type is np.int32:
+        if out_offsets[-1] > _INT32_MAX:
+            out_type = pa.large_string()
+        else:
+            out_offsets = out_offsets.astype(np.int32)
+    return pa.Array.from_buffers(out_type, n, [validity, pa.py_buffer(out_offsets), pa.py_buffer(out_data)],
+                                 array.null_count)
+
+
+def convert_column(column: Any, op: str = 'to-jamo', force: bool = True, chunk_size: int = 65536) -> Any:
+    """convert every string of a column
+
+    Missing values (None, NaN, Arrow nulls) are kept. Object arrays and
+    sequences may mix strings and other values.
+
+    Args:
+        column (Any): sequence of strings, NumPy array of str or object,
+            pyarrow (Chunked)Array of string or large_string, or pandas Series
+        op (str, optional): Hangul to jamos ('to-jamo') or keystrokes
+            ('to-keys'), or keystrokes to Hangul ('from-keys'). Defaults to 'to-jamo'.
+        force (bool, optional): force_convert of the automata of
+            'from-keys'. Defaults to True.
+        chunk_size (int, optional): rows converted at once. Defaults to 65536.
+
+    Raises:
+        ValueError: unknown operation, or not a column of strings
+
+    Returns:
+        Any: converted column, a list for sequences, else of the same type
+            as `column` (NumPy str arrays get the width of the longest output)
+    """
+    if op not in ('to-jamo', 'to-keys', 'from-keys'):
+        raise ValueError("unknown conversion {!r}, expected 'to-jamo', 'to-keys' or 'from-keys'".format(op))
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+    package: str = type(column).__module__.split('.')[0]
+    if package == 'pyarrow':
+        return _convert_arrow(column, op, force, chunk_size)
+    if package == 'pandas':
+        if hasattr(column.array, '__arrow_array__'):
+            import pandas as pd
+            import pyarrow as pa
+            converted = _convert_arrow(pa.array(column.array), op, force, chunk_size)
+            return pd.Series(pd.array(converted, dtype=column.dtype), index=column.index, name=column.name)
+        values: List[Any] = _convert_object_array(column.to_numpy(dtype=object), op, force, chunk_size)
+        return type(column)(values, index=column.index, name=column.name, dtype=column.dtype)
+    if isinstance(column, np.ndarray):
+        if column.dtype.kind not in 'UOT':
+            raise ValueError('expected an array of strings, not {}'.format(column.dtype))
+        out = np.empty(column.shape, dtype=object)
+        out.ravel()[:] = _convert_object_array(column.ravel().tolist(), op, force, chunk_size)
+        if column.dtype.kind == 'O':
+            return out
+        # the width of a str array follows the longest output
+        return out.astype(str if column.dtype.kind == 'U' else column.dtype)
+    return _convert_object_array(column, op, force, chunk_size)
@@ -0,0 +1,311 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cost_model import CostModel
+from .hangul import Hangul
+from .ko_levenstein_distance import KoLevensteinDistance
+
+__all__ = ['CostEstimator']
+
+# per process estimator, set by _init_worker
+_state: dict = {}
+
+# (lines, index of their file, offset after the last line)
+_Chunk = Tuple[List[bytes], int, int]
+
+
+def _init_worker(table: np.ndarray) -> None:
+    _state['estimator'] = CostEstimator(CostModel(table))
+
+
+def _count_chunk(lines: List[bytes]) -> Dict[str, np.ndarray]:
+    estimator: CostEstimator = _state['estimator']
+    estimator.reset()
+    estimator.fit_lines(lines)
+    return estimator.counts()
+
+
+class CostEstimator:
+    """Estimates the keystroke cost table from (typed, corrected) pairs.
+
+    Every pair is converted to keystrokes and aligned with
+    KoLevensteinDistance.align under the current costs. The alignment is
+    counted as substitutions of intended by typed keystrokes, typed
+    keystrokes with no counterpart (inserts) and intended keystrokes that
+    were not typed (deletes). An insert is counted for the intended
+    keystroke it follows, whose insert cost the distance charges for it.
+    to_table turns the counts into costs in the layout of
+    KoLevensteinDistance.cost. fit_files streams TSV files through a
+    process pool and checkpoints the counts with the input position, so a
+    pass over a corpus larger than memory can be stopped and resumed.
+
+    Args:
+        cost_model (Optional[CostModel], optional): costs of the alignment,
+            the table of KoLevensteinDistance when None. Defaults to None.
+    """
+    # checkpoint format, see save_checkpoint
+    CHECKPOINT_VERSION: int = 1
+
+    def __init__(self, cost_model: Optional[CostModel] = None) -> None:
+        self.hangul = Hangul()
+        self.distance = KoLevensteinDistance(cost_model)
+        self.reset()
+
+    def reset(self) -> None:
+        size: int = self.distance.cost_model.OTHER + 1
+        # substitutions[typed, intended], by cost table code
+        self.substitutions: np.ndarray = np.zeros((size, size), dtype=np.int64)
+        self.inserts: np.ndarray = np.zeros(size, dtype=np.int64)
+        self.deletes: np.ndarray = np.zeros(size, dtype=np.int64)
+        # every intended keystroke, typed correctly or not
+        self.intended: np.ndarray = np.zeros(size, dtype=np.int64)
+        self.pairs: int = 0
+        # lines that were not typed<TAB>corrected
+        self.skipped: int = 0
+
+    def add(self, typed: str, corrected: str) -> None:
+        """count the alignment of one pair
+
+        Args:
+            typed (str): Hangul string as typed
+            corrected (str): Hangul string as intended
+        """
+        model: CostModel = self.distance.cost_model
+        typed_keys: str = self.hangul.convert_hangul_to_keystrokes(typed)
+        corrected_keys: str = self.hangul.convert_hangul_to_keystrokes(corrected)
+        typed_codes: np.ndarray = model.encode(typed_keys)
+        corrected_codes: np.ndarray = model.encode(corrected_keys)
+        np.add.at(self.intended, corrected_codes, 1)
+        # intended minus typed keystrokes consumed, unchanged by matches and substitutions
+        lead: int = 0
+        for op in self.distance.align(typed_keys, corrected_keys):
+            if op.operation == 'transition':
+                self.substitutions[typed_codes[op.source], corrected_codes[op.target]] += 1
+            elif op.operation == 'insert':
+                # the DP charges the insert cost of the last intended keystroke,
+                # before the first one the unit border cost is not in the table
+                j: int = op.source + lead
+                if j > 0:
+                    self.inserts[corrected_codes[j - 1]] += 1
+                lead -= 1
+            else:
+                self.deletes[corrected_codes[op.target]] += 1
+                lead += 1
+        self.pairs += 1
+
+    def fit(self, pairs: Iterable[Tuple[str, str]]) -> 'CostEstimator':
+        for typed, corrected in pairs:
+            self.add(typed, corrected)
+        return self
+
+    def fit_lines(self, lines: Iterable[bytes]) -> 'CostEstimator':
+        """count utf-8 typed<TAB>corrected lines, other lines are skipped"""
+        for line in lines:
+            fields: List[str] = line.decode('utf-8', 'replace').rstrip('\r\n').split('\t')
+            if len(fields) != 2:
+                self.skipped += 1
+                continue
+            self.add(fields[0], fields[1])
+        return self
+
+    def counts(self) -> Dict[str, np.ndarray]:
+        """the counts, as arrays for merge and the checkpoints"""
+        return {'substitutions': self.substitutions, 'inserts': self.inserts, 'deletes': self.deletes,
+                'intended': self.intended, 'totals': np.array([self.pairs, self.skipped], dtype=np.int64)}
+
+    def merge(self, counts: Dict[str, np.ndarray]) -> None:
+        """add the counts of another estimator
+
+        Args:
+            counts (Dict[str, np.ndarray]): its counts()
+        """
+        self.substitutions += counts['substitutions']
+        self.inserts += counts['inserts']
+        self.deletes += counts['deletes']
+        self.intended += counts['intended']
+        self.pairs += int(counts['totals'][0])
+        self.skipped += int(counts['totals'][1])
+
+    def save_checkpoint(self, path: str, position: Dict) -> None:
+        """write the counts and the input position, replacing `path` atomically
+
+        Args:
+            path (str): .npz file
+            position (Dict): where the counted input ends, see fit_files
+        """
+        meta: Dict = {'version': CostEstimator.CHECKPOINT_VERSION, 'position': position}
+        tmp: str = '{}.{}.tmp.npz'.format(path, os.getpid())
+        np.savez(tmp, meta=np.array(json.dumps(meta)), table=self.distance.cost_model.table, **self.counts())
+        os.replace(tmp, path)
+
+    def load_checkpoint(self, path: str) -> Dict:
+        """replace the counts by the ones of a checkpoint
+
+        Args:
+            path (str): file written by save_checkpoint
+
+        Raises:
+            ValueError: another version, or aligned with other costs
+
+        Returns:
+            Dict: the position saved with the counts
+        """
+        with np.load(path) as data:
+            meta: Dict = json.loads(str(data['meta']))
+            if meta['version'] != CostEstimator.CHECKPOINT_VERSION:
+                raise ValueError('{} has checkpoint version {}, expected {}'.format(
+                    path, meta['version'], CostEstimator.CHECKPOINT_VERSION))
+            if not np.array_equal(data['table'], self.distance.cost_model.table):
+                raise ValueError('{} was counted with other alignment costs'.format(path))
+            self.reset()
+            self.merge({name: data[name] for name in self.counts()})
+        return meta['position']
+
+    def fit_files(self, paths: Sequence[str], n_jobs: int = 1, chunk_size: int = 10000,
+                  checkpoint: Optional[str] = None, checkpoint_every: int = 1000000) -> 'CostEstimator':
+        """count every typed<TAB>corrected line of `paths`
+
+        Lines are read in chunks and counted by `n_jobs` processes, at most
+        a few chunks ahead of the merge, so memory stays bounded. The merged
+        counts are checkpointed every `checkpoint_every` lines with the file
+        and byte offset they end at; when `checkpoint` exists the pass
+        resumes from there.
+
+        Args:
+            paths (Sequence[str]): TSV files
+            n_jobs (int, optional): worker processes. Defaults to 1.
+            chunk_size (int, optional): lines per task. Defaults to 10000.
+            checkpoint (Optional[str], optional): checkpoint file. Defaults to None.
+            checkpoint_every (int, optional): lines between checkpoints. Defaults to 1000000.
+
+        Raises:
+            ValueError: the checkpoint is of other files
+
+        Returns:
+            CostEstimator: self
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        position: Dict = {'files': paths, 'file': 0, 'offset': 0}
+        if checkpoint is not None and os.path.exists(checkpoint):
+            position = self.load_checkpoint(checkpoint)
+            if position['files'] != paths:
+                raise ValueError('{} is a checkpoint of other files'.format(checkpoint))
+        chunks: Iterator[_Chunk] = self._chunks(paths, position['file'], position['offset'], chunk_size)
+
+        pool: Optional[ProcessPoolExecutor] = None
+        if n_jobs > 1:
+            pool = ProcessPoolExecutor(n_jobs, initializer=_init_worker,
+                                       initargs=(self.distance.cost_model.table, ))
+        try:
+            since: int = 0
+            for counts, file_index, offset, n_lines in self._count(pool, chunks, 2 * n_jobs):
+                self.merge(counts)
+                position.update(file=file_index, offset=offset)
+                since += n_lines
+                if checkpoint is not None and since >= checkpoint_every:
+                    self.save_checkpoint(checkpoint, position)
+                    since = 0
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if checkpoint is not None:
+            self.save_checkpoint(checkpoint, position)
+        return self
+
+    @staticmethod
+    def _chunks(paths: List[str], file_index: int, offset: int, size: int) -> Iterator[_Chunk]:
+        for index in range(file_index, len(paths)):
+            with open(paths[index], 'rb') as f:
+                if index == file_index:
+                    f.seek(offset)
+                else:
+                    offset = 0
+                lines: List[bytes] = []
+                for line in f:
+                    lines.append(line)
+                    offset += len(line)
+                    if len(lines) == size:
+                        yield lines, index, offset
+                        lines = []
+                if lines:
+                    yield lines, index, offset
+
+    def _count(self, pool: Optional[ProcessPoolExecutor], chunks: Iterator[_Chunk],
+               window: int) -> Iterator[Tuple[Dict[str, np.ndarray], int, int, int]]:
+        # counts of every chunk in input order, with where it ends
+        if pool is None:
+            local = CostEstimator(self.distance.cost_model)
+            for lines, file_index, offset in chunks:
+                local.reset()
+                yield local.fit_lines(lines).counts(), file_index, offset, len(lines)
+            return
+        pending: Deque[Tuple[Future, int, int, int]] = deque()
+        for lines, file_index, offset in chunks:
+            pending.append((pool.submit(_count_chunk, lines), file_index, offset, len(lines)))
+            if len(pending) >= window:
+                future, file_index, offset, n_lines = pending.popleft()
+                yield future.result(), file_index, offset, n_lines
+        while pending:
+            future, file_index, offset, n_lines = pending.popleft()
+            yield future.result(), file_index, offset, n_lines
+
+    def to_table(self, smoothing: float = 0.5, min_count: int = 100, min_cost: float = 0.01,
+                 max_cost: float = 3.0) -> List[List[float]]:
+        """costs in the layout of KoLevensteinDistance.cost
+
+        An edit of probability p costs -log(p), scaled so that the median
+        letter delete costs 1 as in the hand made table, and clipped to
+        [`min_cost`, `max_cost`], since a free edit would make every typo
+        of it invisible. Substitutions, deletes and inserts are conditioned
+        on the intended keystroke. Keystrokes intended fewer than
+        `min_count` times keep the costs of the table the pairs were
+        aligned with.
+
+        Args:
+            smoothing (float, optional): added to every count. Defaults to 0.5.
+            min_count (int, optional): observations needed to estimate a keystroke. Defaults to 100.
+            min_cost (float, optional): smallest cost of an edit. Defaults to 0.01.
+            max_cost (float, optional): largest cost. Defaults to 3.0.
+
+        Raises:
+            ValueError: min_cost is not positive or larger than max_cost
+
+        Returns:
+            List[List[float]]: square cost table
+        """
+        if not 0 < min_cost <= max_cost:
+            raise ValueError('min_cost must be positive and at most max_cost')
+        base: np.ndarray = self.distance.cost_model.table
+        size: int = len(base)
+        keys: int = size - 1  # the last row and column hold deletes and inserts
+        intended: np.ndarray = self.intended[:keys].astype(np.float64)
+        known: np.ndarray = intended >= min_count
+
+        sub: np.ndarray = -np.log((self.substitutions[:keys, :keys] + smoothing) / (intended + smoothing * size))
+        dele: np.ndarray = -np.log((self.deletes[:keys] + smoothing) / (intended + smoothing * size))
+        ins: np.ndarray = -np.log((self.inserts[:keys] + smoothing) / (intended + smoothing * size))
+        letters: np.ndarray = known[:52]
+        unit: float = float(np.median(dele[:52][letters])) if letters.any() else 1.0
+
+        def costs(neg_log: np.ndarray) -> np.ndarray:
+            # clipped after rounding, so that no estimate rounds to 0
+            return np.clip(np.round(neg_log / unit, 4), min_cost, max_cost)
+
+        table: np.ndarray = base.copy()
+        table[:keys, :keys] = np.where(known[None, :], costs(sub), base[:keys, :keys])
+        np.fill_diagonal(table[:keys, :keys], 0)
+        table[keys, :keys] = np.where(known, costs(dele), base[keys, :keys])
+        table[:keys, keys] = np.where(known, costs(ins), base[:keys, keys])
+        return table.tolist()
+
+    def to_cost_model(self, **kwargs) -> CostModel:
+        """CostModel of to_table, e.g. to align again with the new costs"""
+        return CostModel(self.to_table(**kwargs))
@@ -0,0 +1,137 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+import json
+from typing import Sequence
+
+import numpy as np
+
+__all__ = ['CostModel']
+
+
+class CostModel:
+    """Keystroke cost table compiled into dense arrays.
+
+    Every keystroke is mapped to its row/column in the cost table
+    (a-z, A-Z interleaved, then 0-9 and space). Characters outside the
+    table share the code `OTHER`, which keeps the fallback-to-1.0
+    semantics of the original per-character cost functions.
+
+    A model is validated and compiled once; its arrays are read-only, so
+    any number of distance instances can share it, and models built from
+    different tables (e.g. with load) can be used side by side.
+
+    Args:
+        table (Sequence[Sequence[float]]): square cost table, as
+            KoLevensteinDistance.cost
+
+    Raises:
+        ValueError: the table is not square, too small, has negative or
+            non-finite costs, a non-zero cost for an unchanged keystroke or
+            a zero cost for inserting or deleting one
+    """
+    SPACE: int = 62
+
+    def __init__(self, table: Sequence[Sequence[float]]) -> None:
+        try:
+            dense = np.array(table, dtype=np.float64)
+        except ValueError:
+            raise ValueError('the cost table must be a square matrix of numbers')
+        size: int = len(dense)
+        if dense.shape != (size, size) or size < CostModel.SPACE + 2:
+            raise ValueError('the cost table must be square with at least {} rows, not {}'.format(
+                CostModel.SPACE + 2, dense.shape))
+        if not np.isfinite(dense).all() or (dense < 0).any():
+            raise ValueError('costs must be finite and non-negative')
+        if np.diagonal(dense)[:size - 1].any():
+            raise ValueError('replacing a keystroke by itself must cost 0')
+        dense.setflags(write=False)
+        # the validated table, as passed
+        self.table: np.ndarray = dense
+        # the last row/column of the table holds insert/delete costs
+        self.table_size: int = size
+        self.OTHER: int = size
+
+        substitution = np.ones((size + 1, size + 1), dtype=np.float64)
+        substitution[:size, :size] = dense
+        insert = np.ones(size + 1, dtype=np.float64)
+        insert[:size] = dense[:, size - 1]
+        delete = np.ones(size + 1, dtype=np.float64)
+        delete[:size] = dense[size - 1, :]
+
+        lut = np.full(128, self.OTHER, dtype=np.uint8)
+        for c in range(26):
+            lut[ord('a') + c] = c * 2
+            lut[ord('A') + c] = c * 2 + 1
+        for c in range(10):
+            lut[ord('0') + c] = c + 52
+        lut[ord(' ')] = CostModel.SPACE
+
+        for arr in (substitution, insert, delete, lut):
+            arr.setflags(write=False)
+        # substitution[s, t] : cost of replacing source code s with target code t
+        self.substitution: np.ndarray = substitution
+        # rows indexed by the target code, used to fetch one DP row at once
+        self.substitution_by_target: np.ndarray = np.ascontiguousarray(substitution.T)
+        self.substitution_by_target.setflags(write=False)
+        self.insert: np.ndarray = insert
+        self.delete: np.ndarray = delete
+        self.lut: np.ndarray = lut
+
+        # bounds the band of the bounded DP, so it must be positive
+        codes: np.ndarray = np.unique(lut)
+        min_indel: float = float(min(insert[codes].min(), delete[codes].min()))
+        if min_indel <= 0:
+            raise ValueError('inserting or deleting a keystroke must cost more than 0')
+        # smallest insert/delete cost of any encodable character, including the unit cost at the borders
+        self.min_indel_cost: float = min(min_indel, 1.0)
+
+    def code(self, ch: str) -> int:
+        c: int = ord(ch)
+        return int(self.lut[c]) if c < 128 else self.OTHER
+
+    def encode(self, keystroke: str) -> np.ndarray:
+        """Map every character of `keystroke` to its cost table code.
+
+        Non-ASCII characters are replaced by '?' before the lookup, which
+        is an `OTHER` character itself, so lengths are preserved.
+        """
+        raw: bytes = keystroke.encode('ascii', 'replace')
+        return self.lut[np.frombuffer(raw, dtype=np.uint8)]
+
+    @classmethod
+    def load(cls, path: str) -> 'CostModel':
+        """read a table saved by save
+
+        Args:
+            path (str): a .npz file with a 'table' array, or a JSON file
+                holding {"table": [[...], ...]}
+
+        Raises:
+            ValueError: not a valid cost table
+
+        Returns:
+            CostModel: compiled model
+        """
+        if path.endswith('.npz'):
+            with np.load(path) as data:
+                if 'table' not in data:
+                    raise ValueError('{} has no cost table'.format(path))
+                return cls(data['table'])
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or 'table' not in data:
+            raise ValueError('{} has no cost table'.format(path))
+        return cls(data['table'])
+
+    def save(self, path: str) -> None:
+        """write the table, as .npz when `path` ends with it, as JSON otherwise
+
+        Args:
+            path (str): output file
+        """
+        if path.endswith('.npz'):
+            np.savez(path, table=self.table)
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'table': self.table.tolist()}, f)
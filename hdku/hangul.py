@@ -14,7 +14,9 @@
 
 # see <http://www.gnu.org/licenses/>
 
-from typing import List, Dict, FrozenSet
+from itertools import accumulate, product
+from types import MappingProxyType
+from typing import List, Dict, FrozenSet, Mapping, Optional, Tuple
 
 __all__ = ['Hangul', ]
 
@@ -293,6 +295,9 @@ class Hangul:
 
     double_to_one: Dict[str, str] ={'ㅏㅣ': 'ㅐ', 'ㅑㅣ': 'ㅒ', 'ㅓㅣ': 'ㅔ', 'ㅕㅣ': 'ㅖ', 'ㅗㅏ': 'ㅘ', 'ㅗㅐ': 'ㅙ', 'ㅗㅣ': 'ㅚ', 'ㅜㅓ': 'ㅝ', 'ㅜㅔ': 'ㅞ', 'ㅜㅣ': 'ㅟ', 'ㅡㅣ': 'ㅢ', 'ㄱㅅ': 'ㄳ', 'ㄴㅈ': 'ㄵ', 'ㄴㅎ': 'ㄶ', 'ㄹㄱ': 'ㄺ', 'ㄹㅁ': 'ㄻ', 'ㄹㅂ': 'ㄼ', 'ㄹㅅ': 'ㄽ', 'ㄹㅌ': 'ㄾ', 'ㄹㅍ': 'ㄿ', 'ㄹㅎ': 'ㅀ', 'ㅂㅅ': 'ㅄ', 'ㄱㄱ': 'ㄲ', 'ㅅㅅ': 'ㅆ'}
 
+    # str.translate tables, see _translation_tables
+    _translation: Optional[Tuple[Dict[int, str], Dict[int, str], Dict[int, str]]] = None
+
     def __init__(self) -> None:
         pass
 
@@ -454,38 +459,83 @@ class Hangul:
         jamos[2] = Hangul.jongsung[jamo_buf3]
         return ''.join(jamos)
 
+    @classmethod
+    def _translation_tables(cls) -> Tuple[Dict[int, str], Dict[int, str], Dict[int, str]]:
+        """str.translate tables of every Hangul syllable and compatibility jamo
+
+        Built on first use into jamos, keystrokes and fullwidth keystrokes.
+
+        Returns:
+            Tuple[Dict[int, str], Dict[int, str], Dict[int, str]]: jamo, keystroke and fullwidth keystroke tables
+        """
+        if cls._translation is None:
+            h = cls()
+            # syllables are ordered by chosung, jwungsung and jongsung, so their
+            # conversions are the products of the conversions of the jamos
+            parts: List[Tuple[List[str], List[str], List[str]]] = []
+            for by_idx in (Hangul.chosung, Hangul.jwungsung, Hangul.jongsung):
+                jamos: List[str] = [by_idx[i] for i in range(len(by_idx))]
+                keys: List[str] = [h._get_key_from_jamo(j) for j in jamos]
+                parts.append(([j.replace('\x00', '') for j in jamos], keys,
+                              [h._convert_halfwidth_to_fullwidth(k) for k in keys]))
+            codes: range = range(Hangul.HANGUL_SYLLABLE_START, Hangul.HANGUL_SYLLABLE_END + 1)
+            to_jamos: Dict[int, str] = dict(zip(codes, map(''.join, product(*(p[0] for p in parts)))))
+            to_keys: Dict[int, str] = dict(zip(codes, map(''.join, product(*(p[1] for p in parts)))))
+            to_fullwidth_keys: Dict[int, str] = dict(zip(codes, map(''.join, product(*(p[2] for p in parts)))))
+            for ch in sorted(Hangul.jaeum | Hangul.moeum):
+                jamo: str = h.convert_syllable_to_jamos(ch)
+                key: str = ''.join(h._get_key_from_jamo(j) for j in jamo)
+                to_jamos[ord(ch)] = jamo.replace('\x00', '')
+                to_keys[ord(ch)] = key
+                to_fullwidth_keys[ord(ch)] = h._convert_halfwidth_to_fullwidth(key)
+            cls._translation = (to_jamos, to_keys, to_fullwidth_keys)
+        return cls._translation
+
+    # targets of translation_table, in the order of _translation_tables
+    TRANSLATIONS: Tuple[str, ...] = ('jamos', 'keystrokes', 'fullwidth')
+
+    @classmethod
+    def translation_table(cls, to: str = 'keystrokes') -> Mapping[int, str]:
+        """read-only str.translate table of every Hangul syllable and compatibility jamo
+
+        Characters missing from the table are kept as they are by
+        convert_hangul_to_jamos and convert_hangul_to_keystrokes.
+
+        Args:
+            to (str, optional): 'jamos', 'keystrokes' or 'fullwidth' keystrokes. Defaults to 'keystrokes'.
+
+        Raises:
+            ValueError: unknown target
+
+        Returns:
+            Mapping[int, str]: code point to its jamos or keystrokes
+        """
+        if to not in Hangul.TRANSLATIONS:
+            raise ValueError('unknown translation {!r}, expected one of {}'.format(to, Hangul.TRANSLATIONS))
+        return MappingProxyType(cls._translation_tables()[Hangul.TRANSLATIONS.index(to)])
+
+    def _with_divider(self, syllables: str) -> str:
+        # a divider after every character, conversion leaves the dividers untouched
+        return Hangul.DIVIDER.join(syllables) + Hangul.DIVIDER if syllables else syllables
+
     def convert_hangul_to_jamos(self, syllables: str, div: bool = False) -> str:
-        sb: List[str] = []
-        for ch in syllables:
-            if not self.is_hangul(ch):
-                sb.append(ch)
-            else:
-                jamos: str = self.convert_syllable_to_jamos(ch)
-                assert len(jamos) == Hangul.JAMO_LEN_PER_SYLLABLE
-                for j in jamos:
-                    if ord(j) == 0:
-                        continue
-                    sb.append(j)
-            # insert divider at the end of each Syllable
-            if div:
-                sb.append(Hangul.DIVIDER)
-        return ''.join(sb)
+        if div:
+            syllables = self._with_divider(syllables)
+        return syllables.translate(Hangul._translation_tables()[0])
 
     def convert_hangul_to_keystrokes(self, syllables: str, fullwidth: bool = False, div: bool = False) -> str:
-        keystrokes: List[str] = []
-
-        for ch in syllables:
-            if self.is_hangul(ch):
-                jamos: str = self.convert_syllable_to_jamos(ch)
-                for jamo in jamos:
-                    key: str = self._get_key_from_jamo(jamo)
-                    for k in key:
-                        if fullwidth:
-                            keystrokes.append(self._convert_halfwidth_to_fullwidth(k))
-                        else:
-                            keystrokes.append(k)
-            else:
-                keystrokes.append(ch)
-            if div:
-                keystrokes.append(Hangul.DIVIDER)
-        return ''.join(keystrokes)
+        if div:
+            syllables = self._with_divider(syllables)
+        return syllables.translate(Hangul._translation_tables()[2 if fullwidth else 1])
+
+    def get_keystroke_offsets(self, syllables: str) -> List[int]:
+        """where each character starts in convert_hangul_to_keystrokes(syllables)
+
+        Args:
+            syllables (str): Hangul string
+
+        Returns:
+            List[int]: len(syllables) + 1 offsets, the last one is the keystroke length
+        """
+        to_keys: Dict[int, str] = Hangul._translation_tables()[1]
+        return list(accumulate((len(to_keys.get(ord(ch), ch)) for ch in syllables), initial=0))
@@ -14,12 +14,15 @@
 
 # see <http://www.gnu.org/licenses/>
 
-from typing import List
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from abc import ABCMeta, abstractmethod
 
 from .hangul import Hangul
+from .instrumentation import Stats
 
-__all__ = ['JamoAutomata', 'KeystrokeAutomata']
+__all__ = ['JamoAutomata', 'KeystrokeAutomata', 'convert_jamos_to_hangul', 'convert_keystrokes_to_hangul']
 
 
 class HangulAutomata(metaclass=ABCMeta):
@@ -37,6 +40,10 @@ class HangulAutomata(metaclass=ABCMeta):
         self.syllables: List[str] = []
         self.raw_char: List[str] = []
         self.hangul_util = Hangul()
+        # word pending between push calls
+        self._pending: _Pending = _START
+        # opt-in counters, see Stats
+        self.stats: Optional[Stats] = None
 
     def clear_comp(self) -> None:
         self.chosung = '\x00'
@@ -91,7 +98,8 @@ class HangulAutomata(metaclass=ABCMeta):
     def force_convert(self, force: bool) -> None:
         self.__force_convert = force
 
-    def convert(self, keystroke: str) -> str:
+    def _convert_by_feed(self, keystroke: str) -> str:
+        # reference implementation, one feed call per character
         self.clear()
         for k in keystroke:
             self.feed(k)
@@ -105,15 +113,152 @@ class HangulAutomata(metaclass=ABCMeta):
         self.clear()
         return ''.join(sb)
 
+    def convert(self, keystroke: str) -> str:
+        """compose a whole text, reentrant: no state of the automata is used"""
+        start: float = time.perf_counter() if self.stats is not None else 0.0
+        text: str = _convert(type(self), self.force_convert, keystroke)
+        if self.stats is not None:
+            self.stats.record('automata', time.perf_counter() - start, calls=1, chars=len(keystroke))
+        return text
+
+    def push(self, chunk: str) -> str:
+        """feed a chunk of a stream
+
+        The pending syllable and word are kept across calls, so a stream can
+        be cut anywhere. With force_convert, syllables are returned as soon
+        as they are completed. Otherwise a word is returned once it ends,
+        since an invalid word is returned as typed.
+
+        Args:
+            chunk (str): next part of the stream
+
+        Returns:
+            str: text finalized by this chunk
+        """
+        start: float = time.perf_counter() if self.stats is not None else 0.0
+        table: _AutomataTable = _AutomataTable.get(type(self), self.force_convert)
+        out: List[str] = []
+        try:
+            self._pending = self._scan(table, chunk, self._pending, out)
+        except _Untabulated as e:
+            self._pending = _START
+            table.replay(*e.args)
+        if self.stats is not None:
+            self.stats.record('automata', time.perf_counter() - start, calls=1, chars=len(chunk))
+        return ''.join(out)
+
+    def flush(self) -> str:
+        """finalize the stream fed by push
+
+        Unlike convert, an invalid last word is returned as typed without
+        the rest of the stream, which has already been returned.
+
+        Returns:
+            str: the pending word
+        """
+        table: _AutomataTable = _AutomataTable.get(type(self), self.force_convert)
+        out: List[str] = []
+        pending: _Pending = self._pending
+        self._pending = _START
+        try:
+            if not self._finish(table, pending, out):
+                return pending[3]
+        except _Untabulated as e:
+            table.replay(*e.args)
+        return ''.join(out)
+
+    def iter_convert(self, chunks: Iterable[str]) -> Iterator[str]:
+        """convert a stream chunk by chunk
+
+        Args:
+            chunks (Iterable[str]): parts of the stream, e.g. lines of a file
+
+        Yields:
+            Iterator[str]: converted text, in order
+        """
+        self._pending = _START
+        for chunk in chunks:
+            text: str = self.push(chunk)
+            if text:
+                yield text
+        text = self.flush()
+        if text:
+            yield text
+
+    @staticmethod
+    def _scan(table: '_AutomataTable', text: str, pending: '_Pending', out: List[str]) -> '_Pending':
+        # run the compiled table over `text` from `pending`, appending
+        # finalized text to `out`, and return the new pending word
+        classes: Dict[str, int] = table.classes
+        transitions: List[Optional[Tuple[int, str, bool]]] = table.transitions
+        force: bool = table.force
+        state, syllables, valid, raw = pending
+        # with force_convert, the syllables of a word are never taken back
+        syllables = out if force else list(syllables)
+        start: int = 0  # first character of the current word in `text`
+        for i, ch in enumerate(text):
+            cls: Optional[int] = classes.get(ch)
+            if cls is not None:
+                step = transitions[state + cls]
+                if step is _UNKNOWN:
+                    step = table.step(state, cls)
+                if step is None:
+                    raise _Untabulated(state, ch)
+                state, emit, keep = step
+                if emit:
+                    syllables.append(emit)
+                if not keep:
+                    valid = False
+                continue
+            # invalid key code, finalization of the current word
+            if HangulAutomata._finish(table, (state, syllables, valid, raw), out):
+                out.append(ch)
+            else:
+                out.append(raw + text[start:i + 1])
+            syllables = out if force else []
+            valid = True
+            state = 0
+            start = i + 1
+            raw = ''
+        if force:
+            return state, (), valid, ''
+        return state, syllables, valid, raw + text[start:]
+
+    @staticmethod
+    def _finish(table: '_AutomataTable', pending: '_Pending', out: List[str]) -> bool:
+        # push the pending syllable and word to `out`, or return False
+        # for an invalid word without force_convert
+        state, syllables, valid, _ = pending
+        last = table.final[state]
+        if last is _UNKNOWN:
+            last = table.finish(state)
+        if last is None:
+            raise _Untabulated(state, None)
+        if not table.force and not (valid and last[1]):
+            return False
+        if syllables is not out:
+            out += syllables
+        if last[0]:
+            out.append(last[0])
+        return True
+
     @abstractmethod
     def feed(self, ch: str) -> None:
         pass
 
+    @abstractmethod
+    def _in_alphabet(self, ch: str) -> bool:
+        """whether feed composes `ch` rather than treating it as an invalid key code"""
+        pass
+
 
 class JamoAutomata(HangulAutomata):
     def __init__(self, force: bool=True) -> None:
         super().__init__(force)
 
+    def _in_alphabet(self, ch: str) -> bool:
+        return self.hangul_util.is_jamo(ch)
+
     def feed(self, ch: str) -> None:
         self.raw_char.append(ch)
         if self.hangul_util.is_jamo(ch):
@@ -196,6 +341,9 @@ class KeystrokeAutomata(HangulAutomata):
     def __init__(self, force: bool = True) -> None:
         super().__init__(force)
 
+    def _in_alphabet(self, ch: str) -> bool:
+        return len(ch) == 1 and self.hangul_util._in_keyjamo(ch)
+
     def feed(self, ch: str) -> None:
         self.raw_char.append(ch)
         if self.hangul_util._in_keyjamo(ch):
@@ -269,3 +417,143 @@ class KeystrokeAutomata(HangulAutomata):
             is_uncompleted: int = self.finalization()
             if is_uncompleted == 0 or is_uncompleted == 2:
                 self.hangul_buffer += ch
+
+
+def _convert(automata_type: type, force: bool, text: str) -> str:
+    # compose `text` with the shared table, keeping all state in locals
+    table: _AutomataTable = _AutomataTable.get(automata_type, force)
+    out: List[str] = []  # hangul_buffer
+    try:
+        valid: bool = HangulAutomata._finish(table, HangulAutomata._scan(table, text, _START, out), out)
+    except _Untabulated:
+        # feed keeps its state in the automata, use one of our own
+        return automata_type(force)._convert_by_feed(text)
+    return ''.join(out) if valid else text
+
+
+def convert_keystrokes_to_hangul(keystroke: str, force: bool = True) -> str:
+    """KeystrokeAutomata(force).convert as a pure function, safe to call from any thread
+
+    Args:
+        keystroke (str): Dubeolsik keystrokes
+        force (bool, optional): compose invalid words as far as possible
+            instead of returning the text as typed. Defaults to True.
+
+    Returns:
+        str: Hangul string
+    """
+    return _convert(KeystrokeAutomata, force, keystroke)
+
+
+def convert_jamos_to_hangul(jamos: str, force: bool = True) -> str:
+    """JamoAutomata(force).convert as a pure function, safe to call from any thread
+
+    Args:
+        jamos (str): jamo string
+        force (bool, optional): compose invalid words as far as possible
+            instead of returning the text as typed. Defaults to True.
+
+    Returns:
+        str: Hangul string
+    """
+    return _convert(JamoAutomata, force, jamos)
+
+
+# transition that has not been simulated yet
+_UNKNOWN: Tuple = ('unknown', )
+
+# (state, syllables, word valid, word as typed) of the word being composed
+_Pending = Tuple[int, Sequence[str], bool, str]
+_START: _Pending = (0, (), True, '')
+
+
+class _Untabulated(Exception):
+    """raised with (state, character) where feed itself raises"""
+
+
+class _AutomataTable:
+    """State-transition table compiled from an automata's feed method.
+
+    A state is a pending (chosung, jwungsung, jongsung) triple. The first
+    time a state meets an input character, feed is simulated once and the
+    next state, the syllable pushed on the way and whether the word stayed
+    valid are recorded, so convert reproduces feed exactly. The table is
+    filled lazily because it holds more than 11,000 states, of which real
+    text touches a small part. Transitions where feed raises are stored as
+    None and make convert fall back to feed.
+    """
+    _cache: Dict[Tuple[type, bool], '_AutomataTable'] = {}
+
+    @classmethod
+    def get(cls, automata_type: type, force: bool) -> '_AutomataTable':
+        table: Optional[_AutomataTable] = cls._cache.get((automata_type, force))
+        if table is None:
+            table = cls._cache.setdefault((automata_type, force), cls(automata_type, force))
+        return table
+
+    def __init__(self, automata_type: type, force: bool) -> None:
+        self._sim: HangulAutomata = automata_type(force)
+        self.force: bool = force
+        keys = self._sim.hangul_util.jamo_to_key.keys() | self._sim.hangul_util.key_to_jamo.keys()
+        self._alphabet: List[str] = sorted(ch for ch in keys if len(ch) == 1 and self._sim._in_alphabet(ch))
+        self.width: int = len(self._alphabet)
+        # states are stored pre-multiplied by the number of input classes,
+        # so a transition is a single index into a flat list
+        self.classes: Dict[str, int] = {ch: i for i, ch in enumerate(self._alphabet)}
+        self._states: Dict[Tuple[str, str, str], int] = {}
+        self._order: List[Tuple[str, str, str]] = []
+        self.transitions: List[Optional[Tuple[int, str, bool]]] = []
+        # what finalization pushes from each state, at the same offsets
+        self.final: List[Optional[Tuple[str, bool]]] = []
+        self._lock = threading.Lock()
+        self._add_state(('\x00', '\x00', '\x00'))
+        self.final[0] = ('', True)
+
+    def _add_state(self, comp: Tuple[str, str, str]) -> int:
+        state: Optional[int] = self._states.get(comp)
+        if state is None:
+            state = self._states[comp] = len(self._order) * self.width
+            self._order.append(comp)
+            self.transitions += [_UNKNOWN] * self.width
+            self.final += [_UNKNOWN] * self.width
+        return state
+
+    def step(self, state: int, cls: int) -> Optional[Tuple[int, str, bool]]:
+        with self._lock:
+            step = self._simulate(self._order[state // self.width], self._alphabet[cls])
+            if step is not None:
+                step = (self._add_state(step[0]), step[1], step[2])
+            self.transitions[state + cls] = step
+        return step
+
+    def finish(self, state: int) -> Optional[Tuple[str, bool]]:
+        with self._lock:
+            step = self._simulate(self._order[state // self.width], None)
+            last = None if step is None else (step[1], step[2])
+            self.final[state] = last
+        return last
+
+    def replay(self, state: int, ch: Optional[str]) -> None:
+        """run feed where the table has no entry, raising its error"""
+        with self._lock:
+            self._run(self._order[state // self.width], ch)
+        raise ValueError('no transition from state {} on {!r}'.format(state, ch))
+
+    def _run(self, comp: Tuple[str, str, str], ch: Optional[str]) -> HangulAutomata:
+        # feed `ch` (or push the pending syllable) from state `comp`
+        sim: HangulAutomata = self._sim
+        sim.clear()
+        sim.chosung, sim.jwungsung, sim.jongsung = comp
+        if ch is None:
+            sim.push_comp()
+        else:
+            sim.feed(ch)
+        return sim
+
+    def _simulate(self, comp: Tuple[str, str, str],
+                  ch: Optional[str]) -> Optional[Tuple[Tuple[str, str, str], str, bool]]:
+        try:
+            sim: HangulAutomata = self._run(comp, ch)
+        except Exception:
+            return None
+        return (sim.chosung, sim.jwungsung, sim.jongsung), ''.join(sim.syllables), sim.word_valid != 0
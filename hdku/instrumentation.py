@@ -0,0 +1,68 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+import threading
+from collections import defaultdict
+from typing import Callable, DefaultDict, Dict, Optional
+
+__all__ = ['Stats']
+
+
+class Stats:
+    """Opt-in counters and timings of the conversion and distance hot paths.
+
+    Assign an instance to the `stats` attribute of KoDubeolsikDistance,
+    KoLevensteinDistance, KoJamoDistance, DistanceService or an automata; it
+    is None by default, which leaves a single attribute check on each call.
+    Every instrumented call records its stage ('keystrokes', 'automata',
+    'distance', 'batch_distance', 'align', 'syllable_distance',
+    'jamo_distance' or 'service') with its elapsed time and counts such as
+    calls, DP cells, converted characters, batches and cache hits/misses.
+
+    Args:
+        callback (Optional[Callable[[str, float, Dict[str, int]], None]], optional):
+            called with (stage, seconds, counts) after every record, e.g. to
+            export to a metrics system. Defaults to None.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float, Dict[str, int]], None]] = None) -> None:
+        self.callback = callback
+        self._counters: DefaultDict[str, int] = defaultdict(int)
+        self._seconds: DefaultDict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, **counts: int) -> None:
+        """add one observation of `stage`
+
+        Args:
+            stage (str): stage name
+            seconds (float): time spent
+            counts (int): counters, stored as '<stage>.<name>'
+        """
+        with self._lock:
+            self._seconds[stage] += seconds
+            for name, n in counts.items():
+                self._counters[stage + '.' + name] += n
+        if self.callback is not None:
+            self.callback(stage, seconds, counts)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """current values
+
+        Returns:
+            Dict[str, Dict]: {'counters': {name: count}, 'seconds': {stage: seconds}}
+        """
+        with self._lock:
+            return {'counters': dict(self._counters), 'seconds': dict(self._seconds)}
+
+    def reset(self) -> Dict[str, Dict]:
+        """clear all values, for periodic scraping
+
+        Returns:
+            Dict[str, Dict]: the values before the reset, as snapshot
+        """
+        with self._lock:
+            values: Dict[str, Dict] = {'counters': dict(self._counters), 'seconds': dict(self._seconds)}
+            self._counters.clear()
+            self._seconds.clear()
+        return values
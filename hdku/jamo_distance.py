@@ -0,0 +1,160 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+import string
+import time
+import weakref
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .cost_model import CostModel
+from .hangul import Hangul
+from .instrumentation import Stats
+from .ko_levenstein_distance import KoLevensteinDistance, _next_row
+
+__all__ = ['JamoCostModel', 'KoJamoDistance']
+
+
+class _Codes(dict):
+    """str.translate table of the alphabet, every other character becomes OTHER"""
+
+    def __init__(self, codes: Dict[int, str], other: str) -> None:
+        super().__init__(codes)
+        self.other = other
+
+    def __missing__(self, key: int) -> str:
+        return self.other
+
+
+class JamoCostModel:
+    """Jamo confusion matrix derived from the keystroke cost table.
+
+    The alphabet is the 51 compatibility jamo and the characters of the
+    keystroke table (letters, digits and space). Replacing a symbol costs the
+    keystroke distance between their keystrokes, inserting or deleting one
+    the sum of the keystroke costs, so e.g. ㅘ (hk) against ㅗ (h) costs one
+    deleted key and ㄲ (R) against ㄱ (r) one shifted key. Characters outside
+    the alphabet share the code `OTHER` and cost 1, as in CostModel.
+    """
+
+    def __init__(self, distance: KoLevensteinDistance) -> None:
+        jamos: List[str] = sorted(Hangul.jaeum | Hangul.moeum)
+        self.symbols: List[str] = jamos + list(string.ascii_letters + string.digits + ' ')
+        keys: List[str] = [Hangul.jamo_to_key.get(s, s) for s in self.symbols]
+        size: int = len(self.symbols)
+        self.OTHER: int = size
+
+        substitution = np.ones((size + 1, size + 1), dtype=np.float64)
+        for s, s_keys in enumerate(keys):
+            substitution[s, :size] = distance.get_dubeolsik_distances(s_keys, keys)
+        insert = np.ones(size + 1, dtype=np.float64)
+        insert[:size] = [sum(distance.insert_cost(k) for k in s_keys) for s_keys in keys]
+        delete = np.ones(size + 1, dtype=np.float64)
+        delete[:size] = [sum(distance.delete_cost(k) for k in s_keys) for s_keys in keys]
+        # weight of a symbol on the borders of the DP, one per keystroke as in the keystroke DP
+        border = np.ones(size + 1, dtype=np.float64)
+        border[:size] = [len(s_keys) for s_keys in keys]
+
+        for arr in (substitution, insert, delete, border):
+            arr.setflags(write=False)
+        # substitution[s, t] : cost of replacing source code s with target code t
+        self.substitution: np.ndarray = substitution
+        self.substitution_by_target: np.ndarray = np.ascontiguousarray(substitution.T)
+        self.substitution_by_target.setflags(write=False)
+        self.insert: np.ndarray = insert
+        self.delete: np.ndarray = delete
+        self.border: np.ndarray = border
+        self._codes = _Codes({ord(s): chr(c) for c, s in enumerate(self.symbols)}, chr(self.OTHER))
+
+    def encode(self, jamos: str) -> np.ndarray:
+        """Map every character of `jamos` to its code, OTHER outside the alphabet."""
+        return np.frombuffer(jamos.translate(self._codes).encode('ascii'), dtype=np.uint8)
+
+
+class KoJamoDistance:
+    """Weighted edit distance over jamos instead of keystrokes.
+
+    Strings are compared as the output of Hangul.convert_hangul_to_jamos with
+    the costs of JamoCostModel, in the same DP as
+    KoLevensteinDistance.get_dubeolsik_distance. A compound jamo is one
+    symbol, so the sequences are shorter than the keystrokes and ㅘ is edited
+    as a whole like ㄲ. Without compound jamo the distance is the keystroke
+    distance of KoDubeolsikDistance.get_distance.
+
+    Args:
+        cost_model (Optional[CostModel], optional): keystroke costs the
+            confusion matrix is derived from, the table of
+            KoLevensteinDistance when None. Defaults to None.
+    """
+    # number of substitution costs fetched at once by get_jamo_distance
+    ROW_BLOCK_CELLS: int = 1 << 16
+
+    # jamo costs of every keystroke cost model in use
+    _compiled: 'weakref.WeakKeyDictionary[CostModel, JamoCostModel]' = weakref.WeakKeyDictionary()
+
+    def __init__(self, cost_model: Optional[CostModel] = None) -> None:
+        self.hangul = Hangul()
+        self.cost_model: JamoCostModel = KoJamoDistance.compiled_cost_model(cost_model)
+        # opt-in counters, see Stats
+        self.stats: Optional[Stats] = None
+
+    @classmethod
+    def compiled_cost_model(cls, cost_model: Optional[CostModel] = None) -> JamoCostModel:
+        # derive the confusion matrix only once per keystroke cost model
+        distance = KoLevensteinDistance(cost_model)
+        compiled: Optional[JamoCostModel] = cls._compiled.get(distance.cost_model)
+        if compiled is None:
+            compiled = cls._compiled[distance.cost_model] = JamoCostModel(distance)
+        return compiled
+
+    def get_distance(self, src: str, target: str) -> float:
+        """jamo distance between two Hangul strings
+
+        Args:
+            src (str): Hangul string
+            target (str): Hangul string
+
+        Returns:
+            float: distance
+        """
+        return self.get_jamo_distance(self.hangul.convert_hangul_to_jamos(src),
+                                      self.hangul.convert_hangul_to_jamos(target))
+
+    def get_jamo_distance(self, target: str, other: str) -> float:
+        """weighted edit distance between two jamo strings
+
+        Args:
+            target (str): jamo string
+            other (str): jamo string
+
+        Returns:
+            float: distance
+        """
+        start: float = time.perf_counter() if self.stats is not None else 0.0
+        model: JamoCostModel = self.cost_model
+        n: int = len(target)
+        m: int = len(other)
+        s_codes: np.ndarray = model.encode(target)
+        p: List[float] = list(accumulate(model.border[s_codes].tolist(), initial=0.0))
+        if m > 0:
+            t_codes: np.ndarray = model.encode(other)
+            left: List[float] = list(accumulate(model.border[t_codes].tolist()))
+            ins: List[float] = model.insert[t_codes].tolist()
+            dels: List[float] = model.delete[t_codes].tolist()
+            block: int = max(1, KoJamoDistance.ROW_BLOCK_CELLS // max(n, 1))
+            for j0 in range(0, m, block):
+                j1: int = min(m, j0 + block)
+                rows: np.ndarray = model.substitution_by_target[t_codes[j0:j1]][:, s_codes]
+                others: np.ndarray = t_codes[j0:j1] == model.OTHER
+                if others.any() and n > 0:
+                    # identical characters outside the alphabet cost 0
+                    s_ords = np.fromiter(map(ord, target), dtype=np.int64, count=n)
+                    t_ords = np.fromiter(map(ord, other[j0:j1]), dtype=np.int64, count=j1 - j0)
+                    rows[others[:, None] & (t_ords[:, None] == s_ords[None, :])] = 0
+                for j, trans in enumerate(rows.tolist(), j0):
+                    p = _next_row(p, left[j], trans, ins[j], dels[j])
+        if self.stats is not None:
+            self.stats.record('jamo_distance', time.perf_counter() - start, calls=1, cells=n * m)
+        return p[n]
@@ -0,0 +1,100 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .cost_model import CostModel
+from .ko_levenstein_distance import _next_row
+
+__all__ = ['KoDubeolsikTrie']
+
+
+class _Node:
+    __slots__ = ('children', 'words')
+
+    def __init__(self) -> None:
+        self.children: Dict[str, '_Node'] = {}
+        self.words: List[str] = []
+
+
+class KoDubeolsikTrie:
+    """Keystroke trie for fuzzy dictionary search.
+
+    A query walks the trie and computes one row of the weighted Dubeolsik
+    DP per trie node, so words sharing a keystroke prefix share its rows.
+    A subtree is cut off as soon as its row minimum exceeds the budget.
+    The distances are the ones of KoDubeolsikDistance.get_distance(query, word).
+    """
+
+    def __init__(self, distance=None) -> None:
+        if distance is None:
+            from .utils import KoDubeolsikDistance
+            distance = KoDubeolsikDistance()
+        self.distance = distance
+        self.root: _Node = _Node()
+        self.size: int = 0
+        # number of DP rows computed by the last search
+        self.last_rows: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def build(self, words: Iterable[str]) -> 'KoDubeolsikTrie':
+        for word in words:
+            self.add(word)
+        return self
+
+    def add(self, word: str) -> None:
+        node: _Node = self.root
+        for k in self.distance.hangul.convert_hangul_to_keystrokes(word):
+            child = node.children.get(k)
+            if child is None:
+                child = node.children[k] = _Node()
+            node = child
+        if word not in node.words:
+            node.words.append(word)
+            self.size += 1
+
+    def search(self, word: str, max_cost: float) -> List[Tuple[float, str]]:
+        """all words within `max_cost` of `word`
+
+        Args:
+            word (str): Hangul string
+            max_cost (float): largest distance
+
+        Returns:
+            List[Tuple[float, str]]: (distance, word) sorted by distance
+        """
+        model: CostModel = self.distance.dubul_levelstein.cost_model
+        query: str = self.distance.hangul.convert_hangul_to_keystrokes(word)
+        n: int = len(query)
+        s_codes: np.ndarray = model.encode(query)
+        # cost rows of every keystroke seen during this search
+        costs: Dict[str, Tuple[List[float], float, float]] = {}
+
+        found: List[Tuple[float, str]] = []
+        first: List[float] = list(range(n + 1))
+        if first[n] <= max_cost:
+            found.extend((first[n], w) for w in self.root.words)
+        self.last_rows = 0
+        stack: List[Tuple[_Node, List[float], int]] = [(self.root, first, 0)]
+        while stack:
+            node, prev, depth = stack.pop()
+            for k, child in node.children.items():
+                cost = costs.get(k)
+                if cost is None:
+                    code: int = model.code(k)
+                    trans: np.ndarray = model.substitution_by_target[code][s_codes]
+                    if code == model.OTHER:
+                        trans[[c == k for c in query]] = 0
+                    cost = costs[k] = (trans.tolist(), float(model.insert[code]), float(model.delete[code]))
+                row: List[float] = _next_row(prev, depth + 1, *cost)
+                self.last_rows += 1
+                if row[n] <= max_cost:
+                    found.extend((row[n], w) for w in child.words)
+                if min(row) <= max_cost:
+                    stack.append((child, row, depth + 1))
+        found.sort()
+        return found
@@ -14,9 +14,32 @@
 
 # see <http://www.gnu.org/licenses/>
 
-from typing import List
+import time
+from itertools import accumulate, islice, repeat
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
 
-__all__ = ['KoLevensteinDistance']
+import numpy as np
+
+from .cost_model import CostModel
+from .instrumentation import Stats
+
+__all__ = ['EditOperation', 'KoLevensteinDistance']
+
+# a keystroke string, or its cost table codes as returned by KoDubeolsikDistance.encode
+Keystrokes = Union[str, np.ndarray]
+
+
+class EditOperation(NamedTuple):
+    """one edit of an alignment
+
+    operation is 'insert' for a character only in the first string,
+    'delete' for a character only in the second one and 'transition' for a
+    substitution. The index of the side without a character is None.
+    """
+    operation: str
+    cost: float
+    source: Optional[int]
+    target: Optional[int]
 
 
 class KoLevensteinDistance:
@@ -56,633 +79,939 @@ class KoLevensteinDistance:
     //{a,A,b,B,c,C,d,D,e,E,f,F,g,G,h,H,i,I,j,J,k,K,l,L,m,M,n,N,o,O,p,P,q,Q,r,R,s,S,t,T,u,U,v,V,w,W,x,X,y,Y,z,Z,0,1,2,3,4,5,6,7,8,9,_,$,#,delete},
     """
     COST_TABLE_SIZE: int = 66
+    # returned by get_dubeolsik_distance when the distance is over max_cost
+    MAX_COST_EXCEEDED: float = float('inf')
+    # number of substitution costs fetched at once by get_dubeolsik_distance
+    ROW_BLOCK_CELLS: int = 1 << 16
+    # number of DP cells get_dubeolsik_distances keeps in one batch
+    BATCH_CELLS: int = 1 << 21
+    # sub-problems of align up to this many DP cells are traced back directly
+    ALIGN_BLOCK_CELLS: int = 1 << 12
     a_ascii = ord('a')
     z_ascii = ord('z')
     A_ascii = ord('A')
     Z_ascii = ord('Z')
 
     # cost table for 2 bul keyboard
-    cost: List = [
-        [
+    cost: Tuple[Tuple[float, ...], ...] = (
+        (
             0, 0.3, 2, 3, 1.5, 3, 1, 3, 1, 1, 1.5, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3,
             2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 0.5, 0.5, 1.5, 1.5, 0.5, 0.5, 2, 2, 2, 3,
             2, 3, 0.5, 0.5, 1, 3, 2, 3, 0.5, 0.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             0.3, 0, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3,
             0.5, 0.5, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3, 0.5,
             0.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 0, 0.3, 1, 3, 1.5, 3, 2, 2, 1, 3, 0.5, 0.5, 0.5,
             0.5, 1.5, 3, 1, 3, 1.5, 3, 2, 3, 1, 3, 0.5, 0.5, 2, 2, 2,
             2, 2, 2, 1.5, 1.5, 2, 3, 1, 1, 1, 3, 0.5, 0.5, 2, 2, 1.5,
             3, 1, 3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 0.3, 0, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             1.5, 3, 1, 3, 0, 0.3, 0.5, 0.5, 0.5, 1, 0.5, 0.5, 1, 3,
             1.5, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 1.5, 3, 2, 2, 2, 2,
             2, 2, 1, 1, 1, 3, 0.5, 0.5, 2, 3, 3, 3, 0.5, 0.5, 0.5,
             0.5, 1.5, 3, 1, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 0.3, 0, 0.5, 0.5, 3, 3, 0.5, 0.5, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             1, 3, 1.5, 3, 0.5, 0.5, 0, 0.3, 0.5, 0.5, 0.5, 0.5, 1, 3,
             1.5, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2,
             1.5, 1.5, 0.5, 0.5, 0.5, 0.5, 1, 1, 2, 3, 0.5, 0.5, 1, 1,
             0.5, 0.5, 1.5, 3, 1, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 0.5, 0.5, 0.3, 0, 0.5, 0.5, 0.5, 0.5, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 0.5, 0.5, 0.5, 0.5, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 0.5,
             0.5, 3, 3, 3, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             1, 3, 2, 3, 0.5, 3, 0.5, 3, 0, 0.3, 1, 3, 1.5, 3, 2, 3,
             2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 1, 1,
             0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 2, 3, 1.5, 3, 0.5, 0.5,
             0.5, 3, 1.5, 3, 1, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             1, 3, 2, 3, 1, 3, 0.5, 0.5, 0.3, 0, 1, 3, 1.5, 3, 2, 3,
             2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 1, 1,
             0.5, 0.5, 0.5, 0.5, 1, 1, 2, 3, 1.5, 3, 0.5, 0.5, 0.5, 3,
             1.5, 3, 1, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             1.5, 3, 1, 3, 0.5, 0.5, 0.5, 0.5, 1, 1, 0, 0.3, 0.5, 0.5,
             1, 3, 2, 3, 1.5, 3, 2, 3, 2, 3, 2, 3, 1.5, 3, 2, 2, 2, 2,
             2, 2, 0.5, 0.5, 1, 3, 0.5, 0.5, 1.5, 3, 0.5, 0.5, 1.5,
             1.5, 1, 3, 1, 3, 1.5, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5, 3, 3, 0.3, 0, 0.5, 0.5,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 0.5, 0.5, 3, 3, 0.5, 0.5, 3, 3, 0.5, 0.5, 3, 3, 3, 3,
             3, 3, 3, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 0.5, 0.5, 1, 3, 1, 3, 1.5, 1.5, 0.5, 0.5, 0, 0.3,
             0.5, 0.5, 1.5, 3, 1, 3, 1.5, 3, 2, 3, 1.5, 3, 1, 3, 2, 2,
             2, 2, 2, 2, 1, 1, 1.5, 3, 0.5, 0.5, 1, 3, 0.5, 0.5, 2, 2,
             1.5, 3, 0.5, 0.5, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 0.3, 0, 0.5,
             0.5, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 0.5, 0.5, 3, 3, 3, 3, 0.5,
             0.5, 3, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 0.5, 0.5, 1.5, 3, 1.5, 3, 2, 2, 1, 3, 0.5, 0.5, 0,
             0.3, 1, 3, 0.5, 0.5, 1, 3, 1.5, 3, 1, 3, 0.5, 0.5, 1.5,
             1.5, 2, 2, 2, 2, 1.5, 1.5, 2, 3, 1, 1, 0.5, 0.5, 1, 3, 2,
             2, 2, 3, 0.5, 0.5, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 0.3, 0,
             3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 0.5,
             0.5, 3, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1.5, 3, 2, 3, 2, 3, 2, 2, 2, 3, 1.5, 3, 1, 3, 0,
             0.3, 0.5, 0.5, 0.5, 0.5, 1, 3, 1, 3, 1, 3, 0.5, 0.5, 1,
             1, 2, 2, 2, 2, 2, 3, 1.5, 1.5, 0.5, 0.5, 2, 3, 2, 2, 2,
             3, 1, 3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.3, 0,
             0.5, 0.5, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1, 3, 2, 3, 2, 3, 2, 2, 1.5, 3, 1, 3, 0.5, 0.5,
             0.5, 0.5, 0, 0.3, 0.5, 0.5, 1, 3, 0.5, 0.5, 0.5, 0.5, 1,
             1, 1, 1.5, 2, 2, 2, 2, 2, 3, 1.5, 1.5, 0.5, 0.5, 1.5, 3,
             2, 2, 2, 3, 1, 3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 0.5,
             0.5, 0.3, 0, 0.5, 0.5, 3, 3, 0.5, 0.5, 0.5, 0.5, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1.5, 3, 2, 3, 2, 3, 2, 2, 2, 3, 1.5, 3, 1, 3, 0.5,
             3, 0.5, 0.5, 0, 0.3, 0.5, 0.5, 0.5, 0.5, 1, 3, 0.5, 0.5,
             1, 1, 2, 2, 2, 2, 2, 3, 2, 2, 1, 3, 2, 3, 2, 2, 2, 3,
             1.5, 3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5,
             0.5, 0.5, 0.3, 0, 0.5, 0.5, 0.5, 0.5, 3, 3, 0.5, 0.5, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 3, 2, 3, 1.5, 3, 1, 3,
             1, 3, 0.5, 0.5, 0, 0.3, 1, 3, 1.5, 3, 0.5, 0.5, 0.5, 0.5,
             2, 2, 2, 2, 2, 3, 2, 2, 1.5, 3, 2, 3, 2, 2, 2, 3, 2, 3,
             2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 0.5, 0.5, 0.3, 0, 3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1, 3, 2, 3, 2, 3, 2, 2, 2, 3, 1.5, 3, 1, 3, 1, 3,
             0.5, 0.5, 0.5, 0.5, 1, 3, 0, 0.3, 0.5, 0.5, 1, 1, 1.5,
             1.5, 2, 2, 2, 2, 2, 3, 2, 2, 1, 3, 1.5, 3, 2, 2, 2, 3,
             1.5, 3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             0.5, 0.5, 0.5, 0.5, 3, 3, 0.3, 0, 0.5, 0.5, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 0.5, 0.5, 1.5, 3, 2, 3, 2, 2, 1.5, 3, 1, 3, 0.5,
             0.5, 1, 3, 0.5, 0.5, 1, 3, 1.5, 3, 0.5, 0.5, 0, 0.3, 1.5,
             1.5, 2, 2, 2, 2, 2, 2, 2, 3, 1.5, 1.5, 1, 3, 1, 3, 2, 2,
             2, 3, 1, 3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5,
             3, 3, 0.5, 0.5, 3, 3, 3, 3, 0.5, 0.5, 0.3, 0, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 3, 2, 3, 1.5, 3, 0.5,
             0.5, 1, 3, 0.5, 0.5, 0.5, 0.5, 1, 3, 1.5, 3, 0, 0.3, 0.5,
             0.5, 2, 2, 2, 2, 2, 3, 2, 2, 1, 3, 2, 3, 2, 2, 2, 3, 1.5,
             3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 3, 2, 3, 1.5, 3, 0.5,
             0.5, 1, 3, 0.5, 0.5, 0.5, 0.5, 1, 3, 1.5, 3, 0.3, 0, 0.5,
             0.5, 2, 2, 2, 2, 2, 3, 2, 2, 1, 3, 2, 3, 2, 2, 2, 3, 1.5,
             3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 3, 2, 3, 2, 3, 1, 3, 1,
             3, 1, 3, 0.5, 0.5, 1.5, 3, 2, 3, 0.5, 0.5, 0, 0.3, 2, 2,
             2, 2, 2, 3, 2, 2, 1.5, 3, 2, 3, 2, 2, 2, 3, 2, 3, 2, 3,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 3, 2, 3, 2, 3, 1, 3,
             1.5, 3, 1, 3, 0.5, 0.5, 1.5, 3, 2, 3, 0.5, 0.5, 0.3, 0,
             2, 2, 2, 2, 2, 3, 2, 2, 1.5, 3, 2, 3, 2, 2, 2, 3, 2, 3,
             2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 2, 3, 2, 3, 1.5, 3, 1, 1, 2, 3, 2, 3, 2, 3, 2,
             3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 0, 0.3, 1.5,
             1.5, 1, 3, 2, 2, 2, 3, 0.5, 3, 0.5, 0.5, 1.5, 3, 2, 3, 1,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 2, 3, 2, 3, 1.5, 3, 1, 1, 2, 3, 2, 3, 2, 3, 2,
             3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 0.3, 0, 1.5,
             1.5, 1, 3, 2, 2, 2, 3, 0.5, 3, 0.5, 0.5, 1.5, 3, 2, 3, 1,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             1.5, 3, 1.5, 3, 1, 3, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 3,
             1.5, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2,
             1.5, 1.5, 0, 0.3, 1, 3, 0.5, 0.5, 1.5, 3, 1, 3, 1, 1, 1,
             3, 1, 3, 0.5, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             1.5, 3, 1.5, 3, 1, 3, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 3,
             1.5, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2,
             1.5, 1.5, 0.3, 0, 1, 3, 0.5, 0.5, 1.5, 3, 1, 3, 1, 1, 1,
             3, 1, 3, 0.5, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 2, 3, 1, 3, 0.5, 0.5, 0.5, 0.5, 1, 3, 1.5, 3,
             2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 1,
             1, 1, 1, 0, 0.3, 1.5, 1.5, 2, 3, 1.5, 3, 0.5, 0.5, 0.5,
             0.5, 2, 3, 0.5, 0.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 0.3, 0, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5, 3, 3,
             0.5, 0.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1, 3, 0.5, 3, 1, 3, 0.5, 1, 0.5, 0.5, 0.5, 0.5, 1,
             3, 1.5, 3, 1.5, 3, 2, 3, 2, 3, 2, 3, 1.5, 3, 2, 2, 2, 2,
             2, 2, 0.5, 0.5, 1.5, 3, 0, 0.3, 1, 3, 1, 3, 0.5, 1.5,
             0.5, 3, 0.5, 0.5, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1, 3, 0.5, 3, 1, 3, 0.5, 1, 0.5, 0.5, 0.5, 0.5, 1,
             3, 1.5, 3, 1.5, 3, 2, 3, 2, 3, 2, 3, 1.5, 3, 2, 2, 2, 2,
             2, 2, 0.5, 0.5, 1.5, 3, 0.3, 0, 1, 3, 1, 3, 0.5, 1.5,
             0.5, 3, 0.5, 0.5, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1, 3, 2, 3, 2, 3, 2, 2, 1.5, 3, 1, 3, 0.5, 0.5,
             0.5, 0.5, 0.5, 0.5, 1, 3, 1.5, 3, 1, 3, 1, 3, 1, 1, 1.5,
             1.5, 2, 2, 1.5, 1.5, 2, 3, 1, 1, 0, 0.3, 1.5, 3, 2, 2, 2,
             3, 0.5, 0.5, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 0.5,
             0.5, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 0.3, 0, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 0.5, 0.5, 0.5, 0.5, 1, 3, 1.5, 1.5, 0.5, 0.5, 0.5,
             0.5, 1, 3, 2, 3, 1.5, 3, 2, 3, 2, 3, 1.5, 3, 1, 3, 2, 2,
             2, 2, 0.5, 0.5, 1, 1, 1.5, 3, 1, 1, 1.5, 3, 0, 0.3, 2, 2,
             1, 3, 1, 3, 1.5, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 0.5, 0.5, 0.5, 0.5, 3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 0.3, 0, 3, 3, 3, 3, 3, 3, 3,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 2, 3, 0.5, 3, 1, 3, 0.5, 0.5, 1.5, 3, 2, 3, 2,
             3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 0.5,
             0.5, 1, 1, 0.5, 0.5, 0.5, 0.5, 2, 3, 2, 3, 0, 0.3, 0.5,
             3, 2, 3, 1, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 2, 3, 0.5, 3, 1, 3, 0.5, 0.5, 1.5, 3, 2, 3, 2,
             3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 0.5,
             0.5, 1, 1, 0.5, 0.5, 1.5, 1.5, 2, 3, 2, 3, 0.3, 0, 1, 3,
             2, 3, 1, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             1, 3, 1.5, 3, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 1, 3, 1.5, 3,
             2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2,
             1.5, 1.5, 1, 1, 0.5, 0.5, 0.5, 0.5, 2, 3, 1, 3, 0.5, 1,
             0, 0.3, 2, 3, 0.5, 0.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3, 0.3, 0, 3, 3, 0.5,
             0.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             2, 3, 1, 3, 1.5, 3, 1.5, 3, 1.5, 1.5, 1, 3, 0.5, 0.5,
             0.5, 0.5, 1, 3, 1, 3, 1.5, 3, 2, 3, 1.5, 3, 1, 3, 1.5,
             1.5, 2, 2, 2, 2, 1, 1, 2, 3, 0.5, 0.5, 0.5, 0.5, 1, 3, 2,
             2, 2, 3, 0, 0.3, 2, 3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 0.5, 0.5,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 0.5, 0.5, 0.5, 0.5, 3, 3, 3, 3, 3, 3, 0.3, 0, 3,
             3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 2, 3, 1, 3, 1, 3, 1, 1, 1.5, 3, 2, 3, 2, 3, 2,
             3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 3, 2, 2, 2, 2, 1, 1, 0.5,
             0.5, 0.5, 0.5, 2, 2, 2, 3, 1.5, 3, 1, 1, 0.5, 0.5, 2, 3,
             0, 0.3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 100, 100, 1
-        ],
-        [
+        ),
+        (
             0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3,
             0.5, 0.5, 3, 3, 3, 3, 3, 3, 3, 3, 0.5, 0.5, 3, 3, 0.3, 0,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             100, 100, 1
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 0, 2, 2, 2, 2, 2,
             2, 2, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 0, 2, 2, 2, 2,
             2, 2, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 0, 2, 2, 2,
             2, 2, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 2, 0, 2, 2,
             2, 2, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 2, 2, 0, 2,
             2, 2, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 2, 2, 2, 0,
             2, 2, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 2, 2, 2, 2,
             0, 2, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 2, 2, 2, 2,
             2, 0, 2, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 2, 2, 2, 2,
             2, 2, 0, 2, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 2, 2, 2, 2, 2, 2,
             2, 2, 2, 0, 1.5, 100, 100, 2
-        ],
-        [
+        ),
+        (
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5,
             1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5, 0, 100, 100, 0.5
-        ],
-        [
+        ),
+        (
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 0, 100, 0.15
-        ],
-        [
+        ),
+        (
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 100, 100,
             100, 100, 100, 100, 100, 100, 100, 100, 100, 0, 0.2
-        ],
-        [
+        ),
+        (
             1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
             1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
             1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2,
             2, 2, 2, 2, 2, 0.5, 0.15, 0.2, 1
-        ]
-    ]
+        )
+    )
 
-    def __init__(self) -> None:
-        pass
+    _compiled: Optional[CostModel] = None
+
+    def __init__(self, cost_model: Optional[CostModel] = None) -> None:
+        # compiled costs, the class table unless another model is given; it can be replaced at any time
+        self.cost_model: CostModel = KoLevensteinDistance.compiled_cost_model() if cost_model is None else cost_model
+        # opt-in counters, see Stats
+        self.stats: Optional[Stats] = None
+
+    @classmethod
+    def compiled_cost_model(cls) -> CostModel:
+        # compile the class-level table only once per process
+        if cls._compiled is None:
+            cls._compiled = CostModel(cls.cost)
+        return cls._compiled
 
     def insert_cost(self, ch: str) -> float:
-        c: int = ord(ch)
-        cost_sum: float = 0
-        if c >= KoLevensteinDistance.a_ascii and c <= KoLevensteinDistance.z_ascii:
-            cost_sum = KoLevensteinDistance.cost[
-                (c - KoLevensteinDistance.a_ascii) *
-                2][KoLevensteinDistance.COST_TABLE_SIZE - 1]
-        elif c >= KoLevensteinDistance.A_ascii and c <= KoLevensteinDistance.Z_ascii:
-            cost_sum = KoLevensteinDistance.cost[
-                (c - KoLevensteinDistance.A_ascii) * 2 +
-                1][KoLevensteinDistance.COST_TABLE_SIZE - 1]
-        elif c >= 48 and c <= 57:
-            cost_sum = KoLevensteinDistance.cost[c + 4][
-                KoLevensteinDistance.COST_TABLE_SIZE - 1]
-        elif c == 32:
-            cost_sum = KoLevensteinDistance.cost[62][
-                KoLevensteinDistance.COST_TABLE_SIZE - 1]
-        else:
-            cost_sum = 1.0
-        return cost_sum
+        return float(self.cost_model.insert[self.cost_model.code(ch)])
 
     def delete_cost(self, ch: str) -> float:
-        c: int = ord(ch)
-        cost_sum: float = 0
-        if c >= KoLevensteinDistance.a_ascii and c <= KoLevensteinDistance.z_ascii:
-            cost_sum = KoLevensteinDistance.cost[
-                KoLevensteinDistance.COST_TABLE_SIZE -
-                1][(c - KoLevensteinDistance.a_ascii) * 2]
-        elif c >= KoLevensteinDistance.A_ascii and c <= KoLevensteinDistance.Z_ascii:
-            cost_sum = KoLevensteinDistance.cost[
-                KoLevensteinDistance.COST_TABLE_SIZE -
-                1][(c - KoLevensteinDistance.A_ascii) * 2 + 1]
-        elif c >= 48 and c <= 57:
-            cost_sum = KoLevensteinDistance.cost[
-                KoLevensteinDistance.COST_TABLE_SIZE - 1][c + 4]
-        elif c == 32:
-            cost_sum = KoLevensteinDistance.cost[
-                KoLevensteinDistance.COST_TABLE_SIZE - 1][62]
-        else:
-            cost_sum = 1.0
-        return cost_sum
+        return float(self.cost_model.delete[self.cost_model.code(ch)])
 
     def trans_cost(self, sc: str, tc: str) -> float:
-        s: int = ord(sc)
-        t: int = ord(tc)
-        if s == t:
+        if sc == tc:
             return 0
-        cost_sum: float = 0
-        if s >= KoLevensteinDistance.a_ascii and s <= KoLevensteinDistance.z_ascii:
-            if t >= KoLevensteinDistance.a_ascii and t <= KoLevensteinDistance.z_ascii:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.a_ascii) *
-                    2][(t - KoLevensteinDistance.a_ascii) * 2]
-            elif t >= KoLevensteinDistance.A_ascii and t <= KoLevensteinDistance.Z_ascii:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.a_ascii) *
-                    2][(t - KoLevensteinDistance.A_ascii) * 2 + 1]
-            elif t >= 48 and t <= 57:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.a_ascii) * 2][t + 4]
-            elif t == 32:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.a_ascii) * 2][62]
-            else:
-                cost_sum = 1.0
-        elif s >= KoLevensteinDistance.A_ascii and s <= KoLevensteinDistance.Z_ascii:
-            if t >= KoLevensteinDistance.a_ascii and t <= KoLevensteinDistance.z_ascii:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.A_ascii) * 2 +
-                    1][(t - KoLevensteinDistance.a_ascii) * 2]
-            elif t >= KoLevensteinDistance.A_ascii and t <= KoLevensteinDistance.Z_ascii:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.A_ascii) * 2 +
-                    1][(t - KoLevensteinDistance.A_ascii) * 2 + 1]
-            elif t >= 48 and t <= 57:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.A_ascii) * 2 + 1][t + 4]
-            elif t == 32:
-                cost_sum = KoLevensteinDistance.cost[
-                    (s - KoLevensteinDistance.A_ascii) * 2 + 1][62]
-            else:
-                cost_sum = 1.0
-        elif s >= 48 and s <= 57:
-            if t >= KoLevensteinDistance.a_ascii and t <= KoLevensteinDistance.z_ascii:
-                cost_sum = KoLevensteinDistance.cost[
-                    s + 4][(t - KoLevensteinDistance.a_ascii) * 2]
-            elif t >= KoLevensteinDistance.A_ascii and t <= KoLevensteinDistance.Z_ascii:
-                cost_sum = KoLevensteinDistance.cost[
-                    s + 4][(t - KoLevensteinDistance.A_ascii) * 2 + 1]
-            elif t >= 48 and t <= 57:
-                cost_sum = KoLevensteinDistance.cost[s + 4][t + 4]
-            elif t == 32:
-                cost_sum = KoLevensteinDistance.cost[s + 4][62]
-            else:
-                cost_sum = 1.0
-        elif s == 32:
-            if t >= KoLevensteinDistance.a_ascii and t <= KoLevensteinDistance.z_ascii:
-                cost_sum = KoLevensteinDistance.cost[62][
-                    (t - KoLevensteinDistance.a_ascii) * 2]
-            elif t >= KoLevensteinDistance.A_ascii and t <= KoLevensteinDistance.Z_ascii:
-                cost_sum = KoLevensteinDistance.cost[62][
-                    (t - KoLevensteinDistance.A_ascii) * 2 + 1]
-            elif t >= 48 and t <= 57:
-                cost_sum = KoLevensteinDistance.cost[62][t + 4]
-            elif t == 32:
-                cost_sum = KoLevensteinDistance.cost[62][62]
-            else:
-                cost_sum = 1.0
-        else:
-            cost_sum = 1.0
-        return cost_sum
-
-    def get_dubeolsik_distance(self, target: str, other: str) -> float:
-        sa = target
-        n: int = len(sa)
-        p: List[float] = [0] * (n + 1)  # 'previous' cost array, horizontally
-        d: List[float] = [0] * (n + 1)  # cost array, horizontally
-        _d: List[float] = [0]  # placeholder to assist in swapping p and d
-
+        return float(self.cost_model.substitution[self.cost_model.code(sc), self.cost_model.code(tc)])
+
+    def _codes(self, keys: Keystrokes) -> np.ndarray:
+        return self.cost_model.encode(keys) if isinstance(keys, str) else np.asarray(keys, dtype=np.uint8)
+
+    def _encode_pair(self, target: Keystrokes,
+                     other: Keystrokes) -> Tuple[Keystrokes, np.ndarray, Keystrokes, np.ndarray]:
+        """codes of both inputs, and what identical characters outside the table are compared by
+
+        Two strings keep comparing their characters. Once either side is
+        encoded both are compared by code, so all characters outside the
+        table are then equal to each other.
+        """
+        if isinstance(target, str) and isinstance(other, str):
+            return target, self.cost_model.encode(target), other, self.cost_model.encode(other)
+        s_codes: np.ndarray = self._codes(target)
+        t_codes: np.ndarray = self._codes(other)
+        return s_codes, s_codes, t_codes, t_codes
+
+    def _substitution_rows(self, target: Keystrokes, s_codes: np.ndarray,
+                           other: Keystrokes, t_codes: np.ndarray) -> np.ndarray:
+        """substitution cost of every target character against each character of `other`
+
+        Row j holds the costs against other[j]. Identical characters cost 0,
+        which only needs fixing up for codes outside the table.
+        """
+        model: CostModel = self.cost_model
+        rows: np.ndarray = model.substitution_by_target[t_codes][:, s_codes]
+        others: np.ndarray = t_codes == model.OTHER
+        if others.any() and len(target) > 0:
+            same = others[:, None] & (_ords(other)[:, None] == _ords(target)[None, :])
+            rows[same] = 0
+        return rows
+
+    def get_dubeolsik_distance(self, target: Keystrokes, other: Keystrokes, max_cost: Optional[float] = None) -> float:
+        """weighted edit distance between two keystroke strings
+
+        Either string may be passed as its cost table codes, a uint8 array
+        such as KoDubeolsikDistance.encode returns, which skips encoding it
+        again on every call.
+
+        Args:
+            target (Keystrokes): keystroke string or codes
+            other (Keystrokes): keystroke string or codes
+            max_cost (Optional[float], optional): only distances up to `max_cost` are of interest.
+                The DP is restricted to a diagonal band and stops as soon as a whole row
+                exceeds the budget. Defaults to None.
+
+        Returns:
+            float: distance, or MAX_COST_EXCEEDED when it is larger than `max_cost`
+        """
+        if self.stats is None:
+            return self._get_distance(target, other, max_cost)[0]
+        start: float = time.perf_counter()
+        distance, cells = self._get_distance(target, other, max_cost)
+        self.stats.record('distance', time.perf_counter() - start, calls=1, cells=cells)
+        return distance
+
+    def _get_distance(self, target: Keystrokes, other: Keystrokes, max_cost: Optional[float]) -> Tuple[float, int]:
+        # distance and number of DP cells computed
+        if max_cost is not None and max_cost < KoLevensteinDistance.MAX_COST_EXCEEDED:
+            return self._get_bounded_distance(target, other, max_cost)
+        n: int = len(target)
         m: int = len(other)
-
-        # indexes into strings s and t
-        # i: int = 0  # iterates through s
-        # j: int = 1  # iterates through t
-        t_j: str = ''  # jth character of t
-
-        cost: float = 0  # cost
-
-        for i in range(n + 1):
-            p[i] = i
-
+        p: List[float] = list(range(n + 1))  # 'previous' cost array, horizontally
+        if m == 0:
+            return p[n], 0
+
+        model: CostModel = self.cost_model
+        target, s_codes, other, t_codes = self._encode_pair(target, other)
+        ins: List[float] = model.insert[t_codes].tolist()
+        dels: List[float] = model.delete[t_codes].tolist()
+        # fetch substitution rows in blocks to keep memory flat for long inputs
+        block: int = max(1, KoLevensteinDistance.ROW_BLOCK_CELLS // max(n, 1))
+        for j0 in range(0, m, block):
+            j1: int = min(m, j0 + block)
+            rows: List[List[float]] = self._substitution_rows(
+                target, s_codes, other[j0:j1], t_codes[j0:j1]).tolist()
+            for j in range(j0, j1):
+                p = _next_row(p, j + 1, rows[j - j0], ins[j], dels[j])
+        return p[n], n * m
+
+    def _get_bounded_distance(self, target: Keystrokes, other: Keystrokes, max_cost: float) -> Tuple[float, int]:
+        # every cell (i, j) is reached with at least |i - j| inserts or deletes
+        model: CostModel = self.cost_model
+        band: int = int(max_cost // model.min_indel_cost) if max_cost >= 0 else -1
+        n: int = len(target)
+        m: int = len(other)
+        if abs(n - m) > band:
+            return KoLevensteinDistance.MAX_COST_EXCEEDED, 0
+        inf: float = KoLevensteinDistance.MAX_COST_EXCEEDED
+        p: List[float] = [i if i <= band else inf for i in range(n + 1)]
+        target, s_codes, other, t_codes = self._encode_pair(target, other)
+        by_target: np.ndarray = model.substitution_by_target
+        ins: List[float] = model.insert[t_codes].tolist()
+        dels: List[float] = model.delete[t_codes].tolist()
+        cells: int = 0
         for j in range(1, m + 1):
-            t_j = other[j - 1]
-            d[0] = j
-
-            for i in range(1, n + 1):
-                cost = 0 if sa[i -
-                               1] == t_j else self.trans_cost(sa[i - 1], t_j)
-                d[i] = min(d[i - 1] + self.insert_cost(t_j),
-                           p[i] + self.delete_cost(t_j),
-                           p[i - 1] + cost)
-            _d = p
-            p = d
-            d = _d
-        return p[n]
+            lo: int = max(1, j - band)
+            hi: int = min(n, j + band)
+            cells += hi - lo + 1
+            tc: int = int(t_codes[j - 1])
+            trans: np.ndarray = by_target[tc][s_codes[lo - 1:hi]]
+            if tc == model.OTHER:
+                trans[[c == other[j - 1] for c in target[lo - 1:hi]]] = 0
+            p = _next_band_row(p, lo, hi, j if j <= band else inf, trans.tolist(), ins[j - 1], dels[j - 1])
+            if min(p[lo - 1:hi + 1]) > max_cost:
+                return KoLevensteinDistance.MAX_COST_EXCEEDED, cells
+        return (p[n] if p[n] <= max_cost else KoLevensteinDistance.MAX_COST_EXCEEDED), cells
+
+    def get_dubeolsik_distances(self, target: Keystrokes, others: Sequence[Keystrokes]) -> np.ndarray:
+        """get_dubeolsik_distance of `target` against every string of `others`
+
+        The strings of `others` are padded into batches and the DP is swept
+        along anti-diagonals, whose cells do not depend on each other, so
+        every step is one vectorized update of the whole batch. Each cell is
+        still the same min of the same three sums, so the results are
+        identical to get_dubeolsik_distance.
+
+        Args:
+            target (Keystrokes): keystroke string or codes
+            others (Sequence[Keystrokes]): keystroke strings or codes
+
+        Returns:
+            np.ndarray: distances aligned with `others`
+        """
+        start: float = time.perf_counter() if self.stats is not None else 0.0
+        n: int = len(target)
+        lengths: np.ndarray = np.fromiter(map(len, others), dtype=np.int64, count=len(others))
+        result: np.ndarray = np.where(lengths == 0, float(n), lengths.astype(np.float64))
+        if n == 0:
+            if self.stats is not None:
+                self.stats.record('batch_distance', time.perf_counter() - start, calls=1, pairs=len(others), cells=0)
+            return result
+
+        model: CostModel = self.cost_model
+        if not isinstance(target, str) or not all(isinstance(o, str) for o in others):
+            others = [self._codes(o) for o in others]
+            target = self._codes(target)
+        s_codes: np.ndarray = self._codes(target)
+        s_ords: np.ndarray = _ords(target)
+        by_target: np.ndarray = model.substitution_by_target[:, s_codes]
+        # longest first, so the candidates still being computed are always a prefix of a batch
+        order: np.ndarray = np.argsort(-lengths, kind='stable')
+        order = order[lengths[order] > 0]
+        first: int = 0
+        while first < len(order):
+            width: int = int(lengths[order[first]])
+            size: int = max(1, KoLevensteinDistance.BATCH_CELLS // (width * n))
+            chunk: np.ndarray = order[first:first + size]
+            result[chunk] = self._batch_distances(target, s_codes, s_ords, by_target,
+                                                  [others[i] for i in chunk], lengths[chunk])
+            first += size
+        if self.stats is not None:
+            self.stats.record('batch_distance', time.perf_counter() - start, calls=1, pairs=len(others),
+                              cells=n * int(lengths.sum()))
+        return result
+
+    def _batch_distances(self, target: Keystrokes, s_codes: np.ndarray, s_ords: np.ndarray, by_target: np.ndarray,
+                         others: List[Keystrokes], lengths: np.ndarray) -> np.ndarray:
+        model: CostModel = self.cost_model
+        n: int = len(target)
+        batch: int = len(others)
+        width: int = int(lengths[0])
+        # all strings or all codes, see get_dubeolsik_distances
+        joined: Keystrokes = ''.join(others) if isinstance(others[0], str) else np.concatenate(others)
+        rows_idx: np.ndarray = np.repeat(np.arange(batch), lengths)
+        cols_idx: np.ndarray = np.arange(len(joined)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        flat: np.ndarray = self._codes(joined)
+        t_codes: np.ndarray = np.full((batch, width), model.OTHER, dtype=np.uint8)
+        t_codes[rows_idx, cols_idx] = flat
+        ins: np.ndarray = model.insert[t_codes]
+        dels: np.ndarray = model.delete[t_codes]
+        # trans[b, j, i] : cost of target[i] against others[b][j]
+        trans: np.ndarray = by_target[t_codes]
+        if (flat == model.OTHER).any():
+            # identical characters outside the table cost 0, padding never matches
+            t_ords = np.full((batch, width), -1, dtype=np.int64)
+            t_ords[rows_idx, cols_idx] = _ords(joined)
+            trans[(t_codes == model.OTHER)[:, :, None] & (t_ords[:, :, None] == s_ords)] = 0
+        trans = trans.reshape(batch, width * n)
+
+        result: np.ndarray = np.empty(batch)
+        # cells (i, j) of the anti-diagonal i + j == k, indexed by i
+        before: np.ndarray = np.zeros((batch, n + 1))  # k - 2
+        last: np.ndarray = np.ones((batch, n + 1))     # k - 1
+        for k in range(2, n + width + 1):
+            active: int = int(np.searchsorted(-lengths, n - k, side='right'))
+            lo: int = max(1, k - width)
+            hi: int = min(n, k - 1)
+            # others[b][k - i - 1] for i = lo..hi is a reversed slice, and so
+            # is trans[b, k - i - 1, i - 1] in the flattened layout
+            j_hi: int = k - 1 - lo
+            j_lo: int = k - 1 - hi
+            j_stop: Optional[int] = j_lo - 1 if j_lo > 0 else None
+            first: int = j_hi * n + lo - 1
+            step: int = n - 1
+            cur: np.ndarray = np.empty((active, n + 1))
+            cells: np.ndarray = cur[:, lo:hi + 1]
+            np.minimum(last[:active, lo - 1:hi] + ins[:active, j_hi:j_stop:-1],
+                       last[:active, lo:hi + 1] + dels[:active, j_hi:j_stop:-1], out=cells)
+            if step > 0:
+                stop: int = first - step * (hi - lo + 1)
+                np.minimum(cells, before[:active, lo - 1:hi] + trans[:active, first:stop if stop >= 0 else None:-step],
+                           out=cells)
+            else:
+                np.minimum(cells, before[:active, lo - 1:hi] + trans[:active, first:first + 1], out=cells)
+            cur[:, 0] = k
+            if k <= n:
+                cur[:, k] = k
+            done: np.ndarray = lengths[:active] == k - n
+            result[:active][done] = cur[done, n]
+            before = last
+            last = cur
+        return result
+
+    def align(self, target: Keystrokes, other: Keystrokes) -> List[EditOperation]:
+        """edit operations of a cheapest alignment of two keystroke strings
+
+        The path of get_dubeolsik_distance is found by Hirschberg's divide
+        and conquer: the middle row of the DP is computed forwards from the
+        start and backwards from the end, the path is split where their sum
+        is smallest, and both halves are solved the same way. Memory stays
+        linear in the input lengths at the price of about twice the work.
+
+        Args:
+            target (Keystrokes): keystroke string or codes
+            other (Keystrokes): keystroke string or codes
+
+        Returns:
+            List[EditOperation]: edits in order, source indexes `target` and target indexes `other`.
+                Their costs add up to the distance.
+        """
+        start: float = time.perf_counter() if self.stats is not None else 0.0
+        model: CostModel = self.cost_model
+        path = _Alignment(*self._encode_pair(target, other), model)
+        ops: List[EditOperation] = []
+        path.solve(0, len(target), 0, len(other), ops)
+        if self.stats is not None:
+            self.stats.record('align', time.perf_counter() - start, calls=1, cells=path.cells)
+        return ops
+
+
+def _ords(keys: Keystrokes) -> np.ndarray:
+    # what identical characters are compared by, see KoLevensteinDistance._encode_pair
+    if isinstance(keys, str):
+        return np.fromiter(map(ord, keys), dtype=np.int64, count=len(keys))
+    return keys.astype(np.int64)
+
+
+def _next_row(p: List[float], left: float, trans: List[float], ins: float, dele: float) -> List[float]:
+    """compute DP row j from row j - 1
+
+    Args:
+        p (List[float]): previous row
+        left (float): value of the first cell (j)
+        trans (List[float]): substitution cost of each target character against the jth character
+        ins (float): insert cost of the jth character
+        dele (float): delete cost of the jth character
+
+    Returns:
+        List[float]: row j
+    """
+    d: List[float] = [left]
+    append = d.append
+    diag: float = p[0]
+    # same as min(left + ins, up + dele, diag + cost), without the call overhead
+    for up, cost in zip(islice(p, 1, None), trans):
+        v = left + ins
+        x = up + dele
+        if x < v:
+            v = x
+        x = diag + cost
+        if x < v:
+            v = x
+        append(v)
+        left = v
+        diag = up
+    return d
+
+
+def _next_band_row(p: List[float], lo: int, hi: int, left: float, trans: List[float],
+                   ins: float, dele: float) -> List[float]:
+    """_next_row restricted to the cells lo..hi, all other cells are infinite
+
+    Args:
+        p (List[float]): previous row
+        lo (int): first cell of the band
+        hi (int): last cell of the band
+        left (float): value of the first cell of the row
+        trans (List[float]): substitution costs of the band cells
+        ins (float): insert cost of the jth character
+        dele (float): delete cost of the jth character
+
+    Returns:
+        List[float]: row j
+    """
+    inf: float = KoLevensteinDistance.MAX_COST_EXCEEDED
+    d: List[float] = [inf] * len(p)
+    d[0] = left
+    if lo > 1:
+        left = inf
+    diag: float = p[lo - 1]
+    for i, cost in zip(range(lo, hi + 1), trans):
+        up = p[i]
+        v = left + ins
+        x = up + dele
+        if x < v:
+            v = x
+        x = diag + cost
+        if x < v:
+            v = x
+        d[i] = v
+        left = v
+        diag = up
+    return d
+
+
+class _Alignment:
+    """Hirschberg's algorithm over the grid of get_dubeolsik_distance.
+
+    Cell (i, j) is target[:i] against other[:j]. Edge costs depend on the
+    position: moves along row 0 and column 0 cost 1, other moves along a
+    row insert target[i - 1] at the insert cost of other[j - 1], and moves
+    along a column delete other[j - 1].
+    """
+
+    def __init__(self, target: Keystrokes, s_codes: np.ndarray, other: Keystrokes, t_codes: np.ndarray,
+                 model: CostModel) -> None:
+        self.target = target
+        self.other = other
+        self.s_codes = s_codes
+        self.t_codes = t_codes
+        self.model = model
+        self.ins: List[float] = model.insert[t_codes].tolist()
+        self.dels: List[float] = model.delete[t_codes].tolist()
+        # number of DP cells computed
+        self.cells: int = 0
+
+    def _row_cost(self, j: int) -> float:
+        # cost of a move along row j
+        return self.ins[j - 1] if j > 0 else 1.0
+
+    def _column_cost(self, i: int, j: int) -> float:
+        # cost of the move from (i, j - 1) to (i, j)
+        return self.dels[j - 1] if i > 0 else 1.0
+
+    def _trans(self, i0: int, i1: int, j: int) -> List[float]:
+        # cost of the moves from (i - 1, j - 1) to (i, j), i = i0 + 1..i1
+        self.cells += i1 - i0 + 1
+        tc: int = int(self.t_codes[j - 1])
+        trans: np.ndarray = self.model.substitution_by_target[tc][self.s_codes[i0:i1]]
+        if tc == self.model.OTHER:
+            trans[[c == self.other[j - 1] for c in self.target[i0:i1]]] = 0
+        return trans.tolist()
+
+    def _forward(self, i0: int, i1: int, j0: int, j1: int) -> List[float]:
+        # distances from (i0, j0) to every cell of row j1
+        p: List[float] = list(accumulate(repeat(self._row_cost(j0), i1 - i0), initial=0.0))
+        for j in range(j0 + 1, j1 + 1):
+            p = _next_row(p, p[0] + self._column_cost(i0, j), self._trans(i0, i1, j), self.ins[j - 1], self.dels[j - 1])
+        return p
+
+    def _backward(self, i0: int, i1: int, j0: int, j1: int) -> List[float]:
+        # distances from every cell of row j0 to (i1, j1), computed on the
+        # reversed grid, where a move along row j still costs _row_cost(j)
+        q: List[float] = list(accumulate(repeat(self._row_cost(j1), i1 - i0), initial=0.0))
+        for j in range(j1 - 1, j0 - 1, -1):
+            trans: List[float] = self._trans(i0, i1, j + 1)[::-1]
+            row: float = self._row_cost(j)
+            d: List[float] = _next_row(q, q[0] + self._column_cost(i1, j + 1), trans, row, self.dels[j])
+            if i0 == 0 and i1 > 0:
+                # the last cell is column 0, whose moves cost 1
+                v = d[-2] + row
+                x = q[-1] + 1.0
+                if x < v:
+                    v = x
+                x = q[-2] + trans[-1]
+                if x < v:
+                    v = x
+                d[-1] = v
+            q = d
+        return q[::-1]
+
+    def solve(self, i0: int, i1: int, j0: int, j1: int, ops: List[EditOperation]) -> None:
+        """append the edits of a cheapest path from (i0, j0) to (i1, j1) to `ops`"""
+        if j1 - j0 <= 1 or (i1 - i0 + 1) * (j1 - j0 + 1) <= KoLevensteinDistance.ALIGN_BLOCK_CELLS:
+            self._trace(i0, i1, j0, j1, ops)
+            return
+        mid: int = (j0 + j1) // 2
+        forward: List[float] = self._forward(i0, i1, j0, mid)
+        backward: List[float] = self._backward(i0, i1, mid, j1)
+        totals: List[float] = [f + b for f, b in zip(forward, backward)]
+        split: int = i0 + totals.index(min(totals))
+        self.solve(i0, split, j0, mid, ops)
+        self.solve(split, i1, mid, j1, ops)
+
+    def _trace(self, i0: int, i1: int, j0: int, j1: int, ops: List[EditOperation]) -> None:
+        # full DP of a small sub-problem and its traceback
+        rows: List[List[float]] = [list(accumulate(repeat(self._row_cost(j0), i1 - i0), initial=0.0))]
+        trans: List[List[float]] = [[]]
+        for j in range(j0 + 1, j1 + 1):
+            trans.append(self._trans(i0, i1, j))
+            p: List[float] = rows[-1]
+            rows.append(_next_row(p, p[0] + self._column_cost(i0, j), trans[-1], self.ins[j - 1], self.dels[j - 1]))
+        edits: List[EditOperation] = []
+        i: int = i1
+        j: int = j1
+        while i > i0 or j > j0:
+            v: float = rows[j - j0][i - i0]
+            if i > i0 and j > j0 and rows[j - j0 - 1][i - i0 - 1] + trans[j - j0][i - i0 - 1] == v:
+                if self.target[i - 1] != self.other[j - 1]:
+                    edits.append(EditOperation('transition', trans[j - j0][i - i0 - 1], i - 1, j - 1))
+                i -= 1
+                j -= 1
+            elif i > i0 and rows[j - j0][i - i0 - 1] + self._row_cost(j) == v:
+                edits.append(EditOperation('insert', self._row_cost(j), i - 1, None))
+                i -= 1
+            else:
+                edits.append(EditOperation('delete', self._column_cost(i, j), None, j - 1))
+                j -= 1
+        ops.extend(reversed(edits))
@@ -0,0 +1,126 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+"""Tiled all-pairs keystroke distances, used by KoDubeolsikDistance.pdist/cdist."""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .cost_model import CostModel
+from .ko_levenstein_distance import Keystrokes, KoLevensteinDistance
+
+# per process state, set by _init_worker
+_state: dict = {}
+
+
+def _init_worker(rows: List[Keystrokes], cols: List[Keystrokes], symmetric: bool, shape: Tuple[int, ...],
+                 shm_name: Optional[str], path: Optional[str], cost_model: Optional[CostModel]) -> None:
+    if path is not None:
+        out = np.memmap(path, dtype=np.float32, mode='r+', shape=shape)
+        shm = None
+    else:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        out = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    _state.update(rows=rows, cols=cols, symmetric=symmetric, out=out, shm=shm,
+                  distance=KoLevensteinDistance(cost_model))
+
+
+def _reset_state() -> None:
+    out = _state.get('out')
+    if isinstance(out, np.memmap):
+        out.flush()
+    shm = _state.get('shm')
+    _state.clear()
+    del out
+    if shm is not None:
+        shm.close()
+
+
+def _condensed_index(n: int, i: int, j: np.ndarray) -> np.ndarray:
+    # position of (i, j), i < j, in a scipy style condensed distance vector
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+
+def _compute_tile(tile: Tuple[int, int, int, int]) -> int:
+    r0, r1, c0, c1 = tile
+    rows: List[Keystrokes] = _state['rows']
+    cols: List[Keystrokes] = _state['cols']
+    distance: KoLevensteinDistance = _state['distance']
+    out: np.ndarray = _state['out']
+    if not _state['symmetric']:
+        for i in range(r0, r1):
+            out[i, c0:c1] = distance.get_dubeolsik_distances(rows[i], cols[c0:c1])
+    else:
+        forward = np.stack([distance.get_dubeolsik_distances(rows[i], rows[c0:c1]) for i in range(r0, r1)])
+        backward = np.stack([distance.get_dubeolsik_distances(rows[j], rows[r0:r1]) for j in range(c0, c1)])
+        mean = (forward + backward.T) / 2
+        n: int = len(rows)
+        for i in range(r0, r1):
+            j = np.arange(max(c0, i + 1), c1)
+            out[_condensed_index(n, i, j)] = mean[i - r0, j - c0]
+    if isinstance(out, np.memmap):
+        out.flush()
+    return r1 - r0
+
+
+def _tiles(n_rows: int, n_cols: int, tile_size: int, symmetric: bool) -> List[Tuple[int, int, int, int]]:
+    tiles: List[Tuple[int, int, int, int]] = []
+    for r0 in range(0, n_rows, tile_size):
+        for c0 in range(r0 if symmetric else 0, n_cols, tile_size):
+            tiles.append((r0, min(n_rows, r0 + tile_size), c0, min(n_cols, c0 + tile_size)))
+    return tiles
+
+
+def pairwise_distances(rows: List[Keystrokes], cols: List[Keystrokes], symmetric: bool, n_jobs: int = 1,
+                       tile_size: int = 256, out: Optional[str] = None,
+                       cost_model: Optional[CostModel] = None) -> np.ndarray:
+    """distances between keystroke strings, tile by tile
+
+    Args:
+        rows (List[Keystrokes]): keystroke strings or codes
+        cols (List[Keystrokes]): keystroke strings or codes, ignored when `symmetric`
+        symmetric (bool): condensed upper triangle of the symmetrized distance among `rows`
+        n_jobs (int, optional): worker processes. Defaults to 1.
+        tile_size (int, optional): rows/columns per tile. Defaults to 256.
+        out (Optional[str], optional): memory-mapped output file. Defaults to None.
+        cost_model (Optional[CostModel], optional): keystroke costs, sent to the workers. Defaults to None.
+
+    Returns:
+        np.ndarray: float32 matrix, or condensed vector when `symmetric`
+    """
+    n: int = len(rows)
+    shape: Tuple[int, ...] = (n * (n - 1) // 2, ) if symmetric else (n, len(cols))
+    tiles = _tiles(n, n if symmetric else len(cols), tile_size, symmetric)
+    shm: Optional[shared_memory.SharedMemory] = None
+    if out is not None:
+        result: np.ndarray = np.memmap(out, dtype=np.float32, mode='w+', shape=shape)
+        result.flush()
+    elif n_jobs > 1:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 4))
+    else:
+        result = np.empty(shape, dtype=np.float32)
+
+    try:
+        if n_jobs > 1:
+            initargs = (rows, cols, symmetric, shape, None if shm is None else shm.name, out, cost_model)
+            with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=initargs) as pool:
+                for _ in pool.map(_compute_tile, tiles):
+                    pass
+            if shm is not None:
+                result = np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        else:
+            _state.update(rows=rows, cols=cols, symmetric=symmetric, out=result, shm=None,
+                          distance=KoLevensteinDistance(cost_model))
+            try:
+                for tile in tiles:
+                    _compute_tile(tile)
+            finally:
+                _reset_state()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+    return result
@@ -0,0 +1,390 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+"""asyncio front end of the distance and conversion functions.
+
+DistanceService collects the requests of concurrent coroutines for at most
+`max_delay` seconds and sends them as one batch to a process pool of warm
+KoDubeolsikDistance instances, which keeps the event loop free and pays
+the inter-process round trip once per batch instead of once per call.
+
+serve exposes a service on a local TCP port, speaking JSON lines or HTTP
+POST with the same request objects, e.g.
+``{"id": 1, "op": "distance", "src": "안녕", "target": "안넝"}``.
+"""
+
+import asyncio
+import json
+import math
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cost_model import CostModel
+from .hangul import Hangul
+from .hangul_automata import convert_keystrokes_to_hangul
+from .instrumentation import Stats
+from .ko_levenstein_distance import KoLevensteinDistance
+from .utils import KoDubeolsikDistance
+
+__all__ = ['DistanceService', 'serve']
+
+# per process functions of every operation and the cost version they use, set by _load_costs
+_state: Dict[str, Any] = {}
+
+# (operation, arguments)
+_Request = Tuple[str, tuple]
+
+
+def _load_costs(version: int, table: np.ndarray) -> None:
+    kdd = KoDubeolsikDistance(CostModel(table))
+    h = Hangul()
+    _state.update({
+        'version': version,
+        'distance': kdd.get_distance,
+        'to-keys': h.convert_hangul_to_keystrokes,
+        'to-jamo': h.convert_hangul_to_jamos,
+        'from-keys': convert_keystrokes_to_hangul,
+    })
+
+
+def _run_batch(version: int, requests: List[_Request], table: Optional[np.ndarray] = None) -> Optional[List[Any]]:
+    # the result of every request, or the exception it raised, None when the
+    # costs of `version` are needed and were not sent
+    if _state.get('version') != version:
+        if table is None:
+            return None
+        _load_costs(version, table)
+    results: List[Any] = []
+    for op, args in requests:
+        try:
+            results.append(_state[op](*args))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class DistanceService:
+    """Micro-batching asyncio front end of KoDubeolsikDistance.
+
+    Calls wait until a batch is dispatched, at most `max_delay` seconds or
+    `max_batch` requests. Up to two batches per worker are in flight; once
+    `max_pending` requests are waiting to be batched, callers wait for room,
+    so a burst slows its producers down instead of growing the queue.
+    reload changes the costs of the next batches, every batch carries the
+    version of its costs and a worker that has other costs asks for the
+    table once, so the table is only sent when it changes.
+    The workers are forked by start and live as long as the service, so
+    start it before opening connections that must not be inherited. Use as
+    ``async with DistanceService() as service``.
+
+    Args:
+        n_jobs (int, optional): worker processes. Defaults to 1.
+        cost_model (Optional[CostModel], optional): keystroke costs, the
+            table of KoLevensteinDistance when None. Defaults to None.
+        max_delay (float, optional): seconds a request waits for others. Defaults to 0.002.
+        max_batch (int, optional): requests per batch. Defaults to 256.
+        max_pending (int, optional): requests waiting to be batched. Defaults to 10000.
+    """
+    OPERATIONS: Tuple[str, ...] = ('distance', 'to-keys', 'to-jamo', 'from-keys')
+
+    def __init__(self, n_jobs: int = 1, cost_model: Optional[CostModel] = None, max_delay: float = 0.002,
+                 max_batch: int = 256, max_pending: int = 10000) -> None:
+        if n_jobs < 1 or max_batch < 1 or max_pending < 1 or max_delay < 0:
+            raise ValueError('n_jobs, max_batch and max_pending must be positive, max_delay non-negative')
+        self.n_jobs = n_jobs
+        self.cost_model = cost_model
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        # opt-in counters, see Stats
+        self.stats: Optional[Stats] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._batches: set = set()
+        self._version: int = 0
+
+    async def __aenter__(self) -> 'DistanceService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """start the workers and the batching task"""
+        self._queue = asyncio.Queue(self.max_pending)
+        self._slots = asyncio.Semaphore(2 * self.n_jobs)
+        self._pool = ProcessPoolExecutor(self.n_jobs)
+        # fork and warm up the workers before the first request
+        loop = asyncio.get_running_loop()
+        version, table = self._costs()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _run_batch, version, [], table)
+                               for _ in range(self.n_jobs)))
+        self._collector = asyncio.create_task(self._collect())
+
+    async def close(self) -> None:
+        """finish the requests already submitted and stop the workers"""
+        if self._collector is None:
+            return
+        await self._queue.join()
+        self._collector.cancel()
+        if self._batches:
+            await asyncio.gather(*self._batches)
+        self._collector = None
+        # waiting for the workers to exit would block the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+
+    def _costs(self) -> Tuple[int, np.ndarray]:
+        model: CostModel = self.cost_model or KoLevensteinDistance.compiled_cost_model()
+        return self._version, model.table
+
+    def reload(self, cost_model: Optional[CostModel] = None) -> None:
+        """use other costs for the batches dispatched from now on
+
+        Args:
+            cost_model (Optional[CostModel], optional): keystroke costs, the
+                table of KoLevensteinDistance when None. Defaults to None.
+        """
+        self.cost_model = cost_model
+        self._version += 1
+
+    async def submit(self, op: str, *args: Any) -> Any:
+        """result of one operation, computed in the next batch
+
+        Args:
+            op (str): one of OPERATIONS
+            args (Any): its arguments, as the method it stands for
+
+        Raises:
+            ValueError: unknown operation, or raised by the operation
+
+        Returns:
+            Any: result of the operation
+        """
+        if op not in DistanceService.OPERATIONS:
+            raise ValueError('unknown operation {!r}, expected one of {}'.format(op, DistanceService.OPERATIONS))
+        if self._collector is None:
+            raise RuntimeError('the service is not started')
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, args, future))
+        return await future
+
+    async def get_distance(self, src: str, target: str, max_cost: Optional[float] = None) -> float:
+        """KoDubeolsikDistance.get_distance"""
+        return await self.submit('distance', src, target, max_cost)
+
+    async def convert(self, text: str, op: str = 'to-keys') -> str:
+        """Hangul to keystrokes ('to-keys') or jamos ('to-jamo'), or keystrokes to Hangul ('from-keys')"""
+        if op == 'distance':
+            raise ValueError('convert does not compute distances, use get_distance')
+        return await self.submit(op, text)
+
+    async def _collect(self) -> None:
+        queue: asyncio.Queue = self._queue
+        while True:
+            batch: List[Tuple[str, tuple, asyncio.Future]] = [await queue.get()]
+            if queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            await self._slots.acquire()
+            task: asyncio.Task = asyncio.create_task(self._dispatch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, tuple, asyncio.Future]]) -> None:
+        start: float = time.perf_counter() if self.stats is not None else 0.0
+        try:
+            requests: List[_Request] = [(op, args) for op, args, _ in batch]
+            loop = asyncio.get_running_loop()
+            version, table = self._costs()
+            try:
+                results: Optional[List[Any]] = await loop.run_in_executor(self._pool, _run_batch, version, requests)
+                if results is None:
+                    # the worker has older costs, send them along this time
+                    results = await loop.run_in_executor(self._pool, _run_batch, version, requests, table)
+            except Exception as e:
+                # e.g. a worker died, every request of the batch fails
+                results = [e] * len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue  # the caller went away
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
+        if self.stats is not None:
+            self.stats.record('service', time.perf_counter() - start, calls=len(batch), batches=1)
+
+
+async def _respond(service: DistanceService, request: Any, reload: Callable[[], Awaitable[bool]]) -> Dict:
+    # response object of one request object
+    if not isinstance(request, dict):
+        return {'error': 'expected a JSON object'}
+    response: Dict = {'id': request['id']} if 'id' in request else {}
+    op: Any = request.get('op')
+    try:
+        fields: Tuple[str, ...] = {'distance': ('src', 'target'), 'reload': ()}.get(op, ('text', ))
+        for field in fields:
+            if not isinstance(request[field], str):
+                raise TypeError('{} must be a string'.format(field))
+        if op == 'distance':
+            distance: float = await service.get_distance(request['src'], request['target'], request.get('max_cost'))
+            # over max_cost, JSON has no infinity
+            response['result'] = None if math.isinf(distance) else distance
+        elif op == 'reload':
+            # only the costs of the operator, a "path" of the client is ignored
+            if await reload():
+                response['result'] = 'reloaded'
+            else:
+                response['error'] = 'costs not reloaded'
+        else:
+            response['result'] = await service.submit(op, request['text'])
+    except KeyError as e:
+        response['error'] = 'missing field {}'.format(e)
+    except Exception as e:
+        # whatever a request raises is its own answer, the others go on
+        response['error'] = str(e) or type(e).__name__
+    return response
+
+
+async def _json_lines(service: DistanceService, first: bytes, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter, reload: Callable[[], Awaitable[bool]]) -> None:
+    # responses are written as they complete, match them by "id"
+    window = asyncio.Semaphore(service.max_pending)
+    tasks: set = set()
+
+    async def answer(line: bytes) -> None:
+        try:
+            try:
+                response: Dict = await _respond(service, json.loads(line), reload)
+            except json.JSONDecodeError as e:
+                response = {'error': 'invalid JSON: {}'.format(e)}
+            writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            await writer.drain()
+        finally:
+            window.release()
+
+    line: bytes = first
+    while line:
+        if line.strip():
+            # stop reading when too many requests of this connection are pending
+            await window.acquire()
+            task: asyncio.Task = asyncio.create_task(answer(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        line = await reader.readline()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _http(service: DistanceService, first: bytes, reader: asyncio.StreamReader,
+                writer: asyncio.StreamWriter, reload: Callable[[], Awaitable[bool]]) -> None:
+    # POST a request object, or a list of them, and get the response(s) back
+    line: bytes = first
+    while line:
+        method: str = line.split(b' ', 1)[0].decode('latin-1')
+        headers: Dict[str, str] = {}
+        while True:
+            header: bytes = await reader.readline()
+            if header in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = header.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body: bytes = await reader.readexactly(int(headers.get('content-length', 0)))
+        if method != 'POST':
+            status, payload = '405 Method Not Allowed', {'error': 'POST a JSON request'}
+        else:
+            status = '200 OK'
+            try:
+                request: Any = json.loads(body)
+            except json.JSONDecodeError as e:
+                status, payload = '400 Bad Request', {'error': 'invalid JSON: {}'.format(e)}
+            else:
+                if isinstance(request, list):
+                    payload = await asyncio.gather(*(_respond(service, r, reload) for r in request))
+                else:
+                    payload = await _respond(service, request, reload)
+        data: bytes = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write('HTTP/1.1 {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n'.format(
+            status, len(data)).encode('latin-1') + data)
+        await writer.drain()
+        if headers.get('connection', '').lower() == 'close':
+            return
+        line = await reader.readline()
+
+
+async def serve(service: DistanceService, host: str = '127.0.0.1', port: int = 8700,
+                costs: Optional[str] = None, ready: Optional[Callable[[asyncio.AbstractServer], None]] = None) -> None:
+    """serve `service` until cancelled
+
+    Every connection speaks either JSON lines or HTTP, told apart by its
+    first line. Requests are objects with an "op" of
+    DistanceService.OPERATIONS, "src" and "target" (and optionally
+    "max_cost") for distances, "text" for conversions, and an optional "id"
+    copied to the response, which holds "result" or "error". The op
+    "reload", or SIGHUP, reloads the costs from `costs`.
+
+    Args:
+        service (DistanceService): started service
+        host (str, optional): address to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): port, any free one when 0. Defaults to 8700.
+        costs (Optional[str], optional): cost table file of CostModel.load. Defaults to None.
+        ready (Optional[Callable[[asyncio.AbstractServer], None]], optional):
+            called once listening, e.g. to read the port. Defaults to None.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def reload() -> bool:
+        # whether the costs were reloaded, the reason they were not is only logged
+        try:
+            model: Optional[CostModel] = await loop.run_in_executor(None, CostModel.load, costs) if costs else None
+        except (OSError, ValueError) as e:
+            # keep serving with the current costs
+            sys.stderr.write('hdku: costs not reloaded: {}\n'.format(e))
+            return False
+        service.reload(model)
+        return True
+
+    # reloads started by SIGHUP, kept until done
+    signals: set = set()
+
+    def reload_on_signal() -> None:
+        task: asyncio.Task = asyncio.create_task(reload())
+        signals.add(task)
+        task.add_done_callback(signals.discard)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            first: bytes = await reader.readline()
+            if first.startswith((b'GET ', b'POST ', b'PUT ', b'HEAD ')):
+                await _http(service, first, reader, writer, reload)
+            else:
+                await _json_lines(service, first, reader, writer, reload)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # the client went away or sent garbage
+        finally:
+            writer.close()
+
+    server: asyncio.AbstractServer = await asyncio.start_server(handle, host, port)
+    if hasattr(signal, 'SIGHUP'):
+        loop.add_signal_handler(signal.SIGHUP, reload_on_signal)
+    try:
+        async with server:
+            if ready is not None:
+                ready(server)
+            await server.serve_forever()
+    finally:
+        if hasattr(signal, 'SIGHUP'):
+            loop.remove_signal_handler(signal.SIGHUP)
@@ -0,0 +1,321 @@
+# coding=utf-8
+# Copyright 2021 Heewon Jeon. All rights reserved.
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from itertools import combinations
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .hangul import Hangul
+
+__all__ = ['KoSpellCorrector']
+
+
+class _PackedStrings(Sequence):
+    """strings stored as utf-8 bytes and offsets, decoded on access"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def pack(cls, strings: Iterable[str]) -> '_PackedStrings':
+        encoded: List[bytes] = [s.encode('utf-8') for s in strings]
+        offsets: np.ndarray = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+
+class _PackedWords(Sequence):
+    """word -> frequency of every key, stored as packed words grouped by key"""
+
+    def __init__(self, words: _PackedStrings, counts: np.ndarray, offsets: np.ndarray) -> None:
+        self.words = words
+        self.counts = counts
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key_id: int) -> Dict[str, int]:
+        lo: int = int(self.offsets[key_id])
+        hi: int = int(self.offsets[key_id + 1])
+        return {self.words[i]: int(self.counts[i]) for i in range(lo, hi)}
+
+
+class KoSpellCorrector:
+    """Top-k spelling correction over a frequency lexicon.
+
+    Words are stored as Dubeolsik keystrokes. Candidates come from a
+    SymSpell style index of every string obtained by deleting up to
+    `max_edits` keystrokes of the first PREFIX_LENGTH keystrokes, lower
+    cased so that shifted keys (e.g. ㄲ and ㄱ) fall together. The index
+    holds crc32 hashes of those strings in a sorted array, which keeps it
+    compact and stable across processes. Candidates whose keystroke counts
+    alone need more than `max_edits` edits are dropped, the rest are
+    verified with the weighted distance get_distance(query, word) and ranked
+    by distance, then frequency.
+
+    Queries are matched in keystroke space, so text typed while the keyboard
+    was in English mode, e.g. 'dkssud' for '안녕', is corrected as well.
+    Words that need more than `max_edits` keystroke edits are not found,
+    whatever their weighted distance.
+
+    A built corrector can be saved to a binary file, which `load` maps into
+    memory instead of reading it, so worker processes start at once and
+    share its pages through the OS page cache.
+    """
+    # keystrokes of a word that go into the deletion index
+    PREFIX_LENGTH: int = 8
+    # on-disk format, see save
+    MAGIC: bytes = b'HDKUIDX\x00'
+    VERSION: int = 1
+    _HEADER = struct.Struct('<8sIIII')
+
+    def __init__(self, distance=None, max_edits: int = 2) -> None:
+        if distance is None:
+            from .utils import KoDubeolsikDistance
+            distance = KoDubeolsikDistance()
+        self.distance = distance
+        self.max_edits: int = max_edits
+        self.keys: Sequence[str] = []
+        # word -> frequency of every key
+        self.words: Sequence[Dict[str, int]] = []
+        self._key_ids: Dict[str, int] = {}
+        self._size: int = 0
+        # deletion index, built on the first query after a change
+        self._hashes: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+        self._lengths: Optional[np.ndarray] = None
+        self._histograms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def build(self, lexicon: Union[Dict[str, int], Iterable[Tuple[str, int]]]) -> 'KoSpellCorrector':
+        for word, count in (lexicon.items() if isinstance(lexicon, dict) else lexicon):
+            self.add(word, count)
+        return self
+
+    def add(self, word: str, count: int = 1) -> None:
+        if not isinstance(self.keys, list):
+            # loaded from a file, continue in memory
+            self.keys = list(self.keys)
+            self.words = list(self.words)
+            self._key_ids = {key: key_id for key_id, key in enumerate(self.keys)}
+        key: str = self.distance.hangul.convert_hangul_to_keystrokes(word)
+        key_id: Optional[int] = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.words.append({})
+        if word not in self.words[key_id]:
+            self._size += 1
+        self.words[key_id][word] = self.words[key_id].get(word, 0) + count
+        self._hashes = None
+
+    def _deletes(self, key: str) -> Set[str]:
+        # the key prefix with up to max_edits keystrokes deleted
+        prefix: str = key[:KoSpellCorrector.PREFIX_LENGTH].lower()
+        deletes: Set[str] = {prefix}
+        for n in range(1, min(self.max_edits, len(prefix)) + 1):
+            for drop in combinations(range(len(prefix)), n):
+                deletes.add(''.join(ch for i, ch in enumerate(prefix) if i not in drop))
+        return deletes
+
+    @staticmethod
+    def _hash(strings: Iterable[str]) -> np.ndarray:
+        return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in strings), dtype=np.uint32)
+
+    @staticmethod
+    def _histograms_of(keys: List[str]) -> np.ndarray:
+        # lower cased keystroke counts, one column per letter and one for the rest
+        lengths: np.ndarray = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+        joined: str = ''.join(keys).lower()
+        codes: np.ndarray = np.fromiter(map(ord, joined), dtype=np.int64, count=len(joined)) - ord('a')
+        codes[(codes < 0) | (codes >= 26)] = 26
+        cells: np.ndarray = np.repeat(np.arange(len(keys)) * 27, lengths) + codes
+        return np.bincount(cells, minlength=len(keys) * 27).reshape(len(keys), 27).astype(np.int16)
+
+    @classmethod
+    def _fingerprint(cls) -> int:
+        # changes with the keystroke table and the indexing, either makes a saved index stale
+        to_keys: Mapping[int, str] = Hangul.translation_table('keystrokes')
+        return zlib.crc32(repr((sorted(to_keys.items()), cls.PREFIX_LENGTH)).encode('utf-8'))
+
+    def _build_index(self) -> None:
+        hashes: List[np.ndarray] = []
+        ids: List[np.ndarray] = []
+        for key_id, key in enumerate(self.keys):
+            h: np.ndarray = self._hash(self._deletes(key))
+            hashes.append(h)
+            ids.append(np.full(len(h), key_id, dtype=np.int32))
+        all_hashes: np.ndarray = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint32)
+        all_ids: np.ndarray = np.concatenate(ids) if ids else np.empty(0, dtype=np.int32)
+        order: np.ndarray = np.argsort(all_hashes, kind='stable')
+        self._hashes = all_hashes[order]
+        self._ids = all_ids[order]
+        self._lengths = np.fromiter(map(len, self.keys), dtype=np.int32, count=len(self.keys))
+        self._histograms = self._histograms_of(self.keys)
+
+    def candidates(self, key: str) -> np.ndarray:
+        """ids of the keys sharing a deletion with `key`
+
+        Args:
+            key (str): keystroke string
+
+        Returns:
+            np.ndarray: sorted key ids
+        """
+        if self._hashes is None:
+            self._build_index()
+        h: np.ndarray = self._hash(self._deletes(key))
+        lo: np.ndarray = np.searchsorted(self._hashes, h, side='left')
+        hi: np.ndarray = np.searchsorted(self._hashes, h, side='right')
+        found: np.ndarray = np.unique(np.concatenate([self._ids[a:b] for a, b in zip(lo, hi)] +
+                                                     [np.empty(0, dtype=np.int32)]))
+        found = found[np.abs(self._lengths[found] - len(key)) <= self.max_edits]
+        # an edit changes the keystroke counts by at most 2
+        moved: np.ndarray = np.abs(self._histograms[found] - self._histograms_of([key])).sum(axis=1)
+        return found[moved <= 2 * self.max_edits]
+
+    def suggest(self, text: str, k: int = 5, max_cost: float = 1.0) -> List[Tuple[float, str, int]]:
+        """the `k` best corrections of `text`
+
+        Args:
+            text (str): Hangul string, or keystrokes typed in English mode
+            k (int, optional): number of suggestions. Defaults to 5.
+            max_cost (float, optional): largest distance. Defaults to 1.0.
+
+        Returns:
+            List[Tuple[float, str, int]]: (distance, word, frequency) by distance, then frequency
+        """
+        key: str = self.distance.hangul.convert_hangul_to_keystrokes(text)
+        ids: np.ndarray = self.candidates(key)
+        if len(ids) == 0:
+            return []
+        costs: np.ndarray = self.distance.dubul_levelstein.get_dubeolsik_distances(key, [self.keys[i] for i in ids])
+        found: List[Tuple[float, str, int]] = []
+        for key_id, cost in zip(ids[costs <= max_cost].tolist(), costs[costs <= max_cost].tolist()):
+            found.extend((cost, word, count) for word, count in self.words[key_id].items())
+        found.sort(key=lambda s: (s[0], -s[2], s[1]))
+        return found[:k]
+
+    def save(self, path: str) -> None:
+        """write the lexicon and its index for load
+
+        The file is a header (magic, version, fingerprint of the keystroke
+        table, crc32 of the rest and the directory size), a JSON directory of
+        the settings and arrays, and the arrays, 8-byte aligned. It is
+        written to a temporary file first and renamed, so readers never see
+        a partial file.
+
+        Args:
+            path (str): output file
+        """
+        if self._hashes is None:
+            self._build_index()
+        words: List[Tuple[str, int]] = [item for w in self.words for item in w.items()]
+        keys: _PackedStrings = _PackedStrings.pack(self.keys)
+        packed_words: _PackedStrings = _PackedStrings.pack(w for w, _ in words)
+        word_offsets: np.ndarray = np.zeros(len(self.words) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, self.words), dtype=np.int64, count=len(self.words)), out=word_offsets[1:])
+        arrays: Dict[str, np.ndarray] = {
+            'keys': keys.data, 'key_offsets': keys.offsets,
+            'words': packed_words.data, 'word_offsets': packed_words.offsets,
+            'counts': np.fromiter((n for _, n in words), dtype=np.int64, count=len(words)),
+            'key_words': word_offsets,
+            'hashes': self._hashes, 'ids': self._ids, 'lengths': self._lengths, 'histograms': self._histograms,
+        }
+        directory: Dict = {'max_edits': self.max_edits, 'size': self._size, 'arrays': {}}
+        offset: int = 0
+        for name, array in arrays.items():
+            directory['arrays'][name] = [array.dtype.str, list(array.shape), offset]
+            offset += -(-array.nbytes // 8) * 8
+        encoded: bytes = json.dumps(directory).encode('utf-8')
+        encoded += b' ' * (-(KoSpellCorrector._HEADER.size + len(encoded)) % 8)
+
+        tmp: str = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(tmp, 'wb') as f:
+                # the header is written again once the checksum is known
+                f.write(bytes(KoSpellCorrector._HEADER.size))
+                f.write(encoded)
+                checksum: int = zlib.crc32(encoded)
+                for array in arrays.values():
+                    data: bytes = np.ascontiguousarray(array).tobytes() + bytes(-array.nbytes % 8)
+                    f.write(data)
+                    checksum = zlib.crc32(data, checksum)
+                f.seek(0)
+                f.write(KoSpellCorrector._HEADER.pack(KoSpellCorrector.MAGIC, KoSpellCorrector.VERSION,
+                                                      self._fingerprint(), checksum, len(encoded)))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str, distance=None, verify: bool = True) -> 'KoSpellCorrector':
+        """map a file written by save
+
+        The arrays are read-only views of the mapping, strings are decoded
+        when a query needs them. Adding words copies the lexicon to memory.
+
+        Args:
+            path (str): index file
+            distance (KoDubeolsikDistance, optional): Defaults to None.
+            verify (bool, optional): check the crc32 of the whole file,
+                which reads it once. Defaults to True.
+
+        Raises:
+            ValueError: not an index, another version, a different keystroke
+                table, or a checksum mismatch
+
+        Returns:
+            KoSpellCorrector: corrector ready for suggest
+        """
+        with open(path, 'rb') as f:
+            mapped: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header_size: int = KoSpellCorrector._HEADER.size
+        if len(mapped) < header_size:
+            raise ValueError('{} is not an hdku index'.format(path))
+        magic, version, fingerprint, checksum, directory_size = KoSpellCorrector._HEADER.unpack_from(mapped)
+        if magic != KoSpellCorrector.MAGIC:
+            raise ValueError('{} is not an hdku index'.format(path))
+        if version != KoSpellCorrector.VERSION:
+            raise ValueError('{} has index version {}, expected {}, rebuild it'.format(
+                path, version, KoSpellCorrector.VERSION))
+        if fingerprint != cls._fingerprint():
+            raise ValueError('{} was built with another keystroke table, rebuild it'.format(path))
+        if verify and zlib.crc32(memoryview(mapped)[header_size:]) != checksum:
+            raise ValueError('{} is corrupt, checksum mismatch'.format(path))
+        directory: Dict = json.loads(bytes(mapped[header_size:header_size + directory_size]))
+        start: int = header_size + directory_size
+        arrays: Dict[str, np.ndarray] = {}
+        for name, (dtype, shape, offset) in directory['arrays'].items():
+            count: int = int(np.prod(shape))
+            arrays[name] = (np.frombuffer(mapped, dtype=dtype, count=count, offset=start + offset).reshape(shape)
+                            if count else np.empty(shape, dtype=dtype))
+
+        corrector = cls(distance, directory['max_edits'])
+        corrector.keys = _PackedStrings(arrays['keys'], arrays['key_offsets'])
+        corrector.words = _PackedWords(_PackedStrings(arrays['words'], arrays['word_offsets']),
+                                       arrays['counts'], arrays['key_words'])
+        corrector._size = directory['size']
+        corrector._hashes = arrays['hashes']
+        corrector._ids = arrays['ids']
+        corrector._lengths = arrays['lengths']
+        corrector._histograms = arrays['histograms']
+        return corrector
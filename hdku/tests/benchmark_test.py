@@ -0,0 +1,19 @@
+from ..benchmark import IMPORTS, compare, make_corpus, measure_imports, run_benchmarks
+
+
+def test_benchmark():
+    assert make_corpus('sentence', 3, seed=1) == make_corpus('sentence', 3, seed=1)
+    assert make_corpus('word', 3, seed=1) != make_corpus('word', 3, seed=2)
+    run = run_benchmarks(scale=0.005, buckets=['word', 'sentence'], imports=False)
+    assert len(run['results']) == 12
+    r = run['results']['KoDubeolsikDistance.get_distance/sentence']
+    assert r['calls'] == 1 and r['p50_us'] <= r['p99_us'] and r['peak_kib'] > 0
+    assert compare(run, run) == []
+    slower = {'results': {k: dict(v, chars_per_s=v['chars_per_s'] / 2) for k, v in run['results'].items()}}
+    assert len(compare(run, slower)) == 12
+
+    imports = measure_imports(repeat=1)
+    assert list(imports) == list(IMPORTS) and all(ms > 0 for ms in imports.values())
+    run['imports'] = imports
+    assert compare(dict(run, imports={s: ms * 2 for s, ms in imports.items()}), run) == []
+    assert len(compare(dict(run, imports={s: ms / 2 for s, ms in imports.items()}), run)) == len(IMPORTS)
@@ -0,0 +1,14 @@
+from ..bk_tree import KoDubeolsikBKTree
+
+
+def test_bk_tree():
+    words = ["안녕하세요", "안녕허세요", "안녕하셈", "아주 바빠요", "아주 바뻐요", "고감자"]
+    tree = KoDubeolsikBKTree().build(words)
+    assert len(tree) == len(words)
+    res = tree.query("안녕하세요", 1.0)
+    assert [w for _, w in res] == ["안녕하세요", "안녕허세요"]
+    assert res[0][0] == 0
+    assert 0 < tree.last_evaluations <= len(words)
+    res = tree.knn("아주 바쁘요", 2)
+    assert sorted(w for _, w in res) == ["아주 바빠요", "아주 바뻐요"]
+    assert tree.query("고감자", 0) == [(0, "고감자")]
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from ..bulk import convert_column
+from ..hangul import Hangul
+from ..hangul_automata import KeystrokeAutomata
+
+ROWS = ['안녕하세요 반갑습니다', '아버지가 방에', '', 'abc ㄳ 뷁!', 'x\x00y'] * 20
+
+
+def test_convert_column():
+    h = Hangul()
+    jamos = [h.convert_hangul_to_jamos(r) for r in ROWS]
+    keys = [h.convert_hangul_to_keystrokes(r) for r in ROWS]
+    assert convert_column(ROWS, chunk_size=7) == jamos
+    assert convert_column(tuple(ROWS), 'to-keys') == keys
+    assert convert_column(np.array(ROWS), 'to-keys').tolist() == [k.rstrip('\x00') for k in keys]
+    assert convert_column(np.array(ROWS + [None], dtype=object)).tolist() == jamos + [None]
+
+    typed = keys + ['rhrkaawk']
+    for force in (True, False):
+        expected = [KeystrokeAutomata(force).convert(k) for k in typed]
+        assert convert_column(typed, 'from-keys', force, chunk_size=9) == expected
+
+    with pytest.raises(ValueError):
+        convert_column(ROWS, 'to-hanja')
+    with pytest.raises(ValueError):
+        convert_column(np.arange(3))
+
+
+def test_convert_column_arrow():
+    pa = pytest.importorskip('pyarrow')
+    h = Hangul()
+    keys = [h.convert_hangul_to_keystrokes(r) for r in ROWS]
+    array = pa.array(ROWS + [None])
+    converted = convert_column(array, 'to-keys', chunk_size=7)
+    assert converted.type == pa.string() and converted.to_pylist() == keys + [None]
+    assert convert_column(array.slice(3, 5), 'to-keys').to_pylist() == keys[3:8]
+    chunked = pa.chunked_array([pa.array(ROWS[:3], pa.large_string()), pa.array(ROWS[3:], pa.large_string())])
+    assert convert_column(chunked, 'to-jamo').to_pylist() == [h.convert_hangul_to_jamos(r) for r in ROWS]
+    assert convert_column(converted, 'from-keys').to_pylist() == [
+        KeystrokeAutomata().convert(k) for k in keys] + [None]
+    with pytest.raises(ValueError):
+        convert_column(pa.array([1, 2]))
+
+
+def test_convert_column_pandas():
+    pd = pytest.importorskip('pandas')
+    h = Hangul()
+    jamos = [h.convert_hangul_to_jamos(r) for r in ROWS]
+    series = pd.Series(ROWS + [None], name='text', dtype=object)
+    converted = convert_column(series)
+    assert converted.name == 'text' and converted.dtype == object and converted.tolist() == jamos + [None]
+    if hasattr(pd, 'ArrowDtype'):
+        pytest.importorskip('pyarrow')
+        series = series.astype('string[pyarrow]')
+        converted = convert_column(series)
+        assert converted.dtype == series.dtype and converted[:len(ROWS)].tolist() == jamos
+        assert converted.isna().iloc[-1]
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from ..__main__ import main
+from ..cost_estimator import CostEstimator
+from ..cost_model import CostModel
+
+
+def test_cost_estimator(tmp_path):
+    # shift slips and dropped keys are frequent, ㅕ/ㅓ confusions rare
+    pairs = [('학꾜', '학교'), ('사랑햬', '사랑해'), ('아녕', '안녕'), ('하교', '학교')] * 50
+    pairs.append(('안넝', '안녕'))
+    estimator = CostEstimator().fit(pairs)
+    assert estimator.pairs == len(pairs)
+    model = estimator.distance.cost_model
+    r, R, o, O, s = (model.code(c) for c in 'rRoOs')
+    assert estimator.substitutions[R, r] == 50
+    assert estimator.substitutions[O, o] == 50
+    assert estimator.deletes[s] == 50
+    assert estimator.deletes[r] == 50
+
+    table = np.array(estimator.to_table(min_count=50))
+    assert table.shape == (66, 66)
+    assert table[R, r] < table[model.code('u'), model.code('j')] <= 3.0
+    assert np.diagonal(table)[:-1].tolist() == [0] * 65
+    # too rare, the base costs are kept
+    assert table[model.code('Q'), model.code('q')] == model.table[model.code('Q'), model.code('q')]
+    assert estimator.to_cost_model(min_count=50).substitution[R, r] == table[R, r]
+
+    # chunked, in processes and resumed from a checkpoint give the same counts
+    src = tmp_path / 'typos.tsv'
+    src.write_text(''.join('{}\t{}\n'.format(*p) for p in pairs) + 'malformed\n', encoding='utf-8')
+    checkpoint = tmp_path / 'counts.npz'
+    first = CostEstimator().fit_files([str(src)], chunk_size=7, checkpoint=str(checkpoint), checkpoint_every=30)
+    assert first.skipped == 1
+    np.testing.assert_array_equal(first.substitutions, estimator.substitutions)
+    np.testing.assert_array_equal(first.deletes, estimator.deletes)
+
+    # resuming a finished pass counts nothing more
+    resumed = CostEstimator().fit_files([str(src)], checkpoint=str(checkpoint))
+    assert resumed.pairs == len(pairs)
+    position = CostEstimator().load_checkpoint(str(checkpoint))
+    assert position['offset'] == src.stat().st_size
+    # interrupted after the first half
+    lines = src.read_bytes().splitlines(keepends=True)
+    half = CostEstimator().fit_lines(lines[:100])
+    half.save_checkpoint(str(checkpoint), dict(position, offset=sum(map(len, lines[:100]))))
+    resumed = CostEstimator().fit_files([str(src)], checkpoint=str(checkpoint))
+    np.testing.assert_array_equal(resumed.intended, estimator.intended)
+
+    parallel = CostEstimator().fit_files([str(src), str(src)], n_jobs=2, chunk_size=50)
+    assert parallel.pairs == 2 * len(pairs)
+    np.testing.assert_array_equal(parallel.inserts, 2 * estimator.inserts)
+
+    with pytest.raises(ValueError):
+        CostEstimator().fit_files([str(src), str(src)], checkpoint=str(checkpoint))
+    other = np.array(model.table)
+    other[-1] = 3
+    with pytest.raises(ValueError):
+        CostEstimator(CostModel(other)).load_checkpoint(str(checkpoint))
+
+    out = tmp_path / 'costs.json'
+    assert main(['estimate-costs', str(src), '-o', str(out), '--min-count', '50']) == 0
+    assert CostModel.load(str(out)).table.tolist() == table.tolist()
+
+
+def test_cost_estimator_round_trip():
+    from ..utils import KoDubeolsikDistance
+
+    # an extra ㄱ after 가 is charged at the insert cost of k, the last intended keystroke
+    pairs = [('각', '가')] * 200 + [('꺼', '거')] * 200 + [('거', '거')] * 100
+    estimator = CostEstimator().fit(pairs)
+    model = estimator.distance.cost_model
+    r, R, k = (model.code(c) for c in 'rRk')
+    assert estimator.inserts[k] == 200 and estimator.inserts.sum() == 200
+    assert estimator.substitutions[R, r] == 200
+
+    base = KoDubeolsikDistance()
+    fitted = KoDubeolsikDistance(estimator.to_cost_model(min_count=50))
+    assert fitted.get_distance('각', '가') < base.get_distance('각', '가')
+    assert fitted.get_distance('꺼', '거') < base.get_distance('꺼', '거')
+    # ㅓ was never mistyped, its substitutions get dearer
+    assert fitted.get_distance('가', '거') > base.get_distance('가', '거')
+
+    # no estimate is free, however frequent the edit
+    table = np.array(estimator.to_table(min_count=50, min_cost=0.2))
+    assert table[R, r] == 0.2 and table[k, -1] == 0.2
+    # every k was followed by an extra keystroke, -log p rounds to 0
+    assert estimator.to_table(min_count=50, smoothing=1e-9)[k][-1] == 0.01
+    with pytest.raises(ValueError):
+        estimator.to_table(min_cost=0)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from ..cost_model import CostModel
+from ..ko_levenstein_distance import KoLevensteinDistance
+
+
+def test_cost_model():
+    model = CostModel(KoLevensteinDistance.cost)
+    assert model.encode('aZ0 ').tolist() == [0, 51, 52, 62]
+    # non table characters share one code
+    assert model.encode('.가').tolist() == [model.OTHER, model.OTHER]
+    # same costs as the table
+    assert model.substitution[model.code('w'), model.code('W')] == 0.3
+    assert model.substitution[model.code('z'), model.code('r')] == 0.5
+    assert model.insert[model.code('1')] == 2
+    assert model.delete[model.code(' ')] == 0.5
+    # fallback to 1.0
+    assert model.insert[model.OTHER] == 1.0
+    assert model.substitution[model.code('.'), model.code('a')] == 1.0
+    # compiled only once
+    assert KoLevensteinDistance().cost_model is KoLevensteinDistance().cost_model
+
+
+def test_cost_model_pluggable(tmp_path):
+    from ..jamo_distance import KoJamoDistance
+    from ..utils import KoDubeolsikDistance
+
+    table = np.array(KoLevensteinDistance.cost)
+    table[-1] = 3  # expensive deletes
+    for path in [str(tmp_path / 'costs.json'), str(tmp_path / 'costs.npz')]:
+        CostModel(table).save(path)
+        assert np.array_equal(CostModel.load(path).table, table)
+    model = CostModel.load(str(tmp_path / 'costs.json'))
+
+    default = KoDubeolsikDistance()
+    custom = KoDubeolsikDistance(model)
+    assert custom.cost_model is model and default.cost_model is KoLevensteinDistance.compiled_cost_model()
+    assert default.get_distance('안녕', '안녕하') == 2 and custom.get_distance('안녕', '안녕하') == 6
+    assert custom.cdist(['안녕'], ['안녕하'], n_jobs=2).tolist() == [[6]]
+    assert custom.get_syllable_distance('안녕', '안녕하') == 6
+    # swapped in place, the converters are kept
+    automata = custom.automata
+    custom.cost_model = default.cost_model
+    assert custom.get_distance('안녕', '안녕하') == 2 and custom.get_syllable_distance('안녕', '안녕하') == 2
+    assert custom.automata is automata
+    assert KoJamoDistance(model).get_distance('안녕', '안녕하') == 6
+    assert KoJamoDistance(model).cost_model is KoJamoDistance(model).cost_model
+
+    free_insert = table.copy()
+    free_insert[0, -1] = 0
+    free_delete = table.copy()
+    free_delete[-1, 0] = 0
+    for bad in [table[:10], table[:, :-1], -table, np.where(table == 0.3, np.nan, table), table + 1,
+                free_insert, free_delete]:
+        with pytest.raises(ValueError):
+            CostModel(bad)
+    assert CostModel(table).min_indel_cost == 0.5
+    (tmp_path / 'bad.json').write_text('[[0]]', encoding='utf-8')
+    with pytest.raises(ValueError):
+        CostModel.load(str(tmp_path / 'bad.json'))
@@ -13,3 +13,51 @@ def test_hangul_automata():
     assert kam.convert("rhrkaawk") == 'rhrkaawk'
     kam = KeystrokeAutomata(True)
     assert kam.convert("rhrkaawk") == '고감ㅁ자'
+
+
+def test_convert_matches_feed():
+    keys = ['rhrkawk', 'rhrkaawk', 'dkssudgktpdy. qksrkqtmqslek!', 'rtk fk ', 'QQQ dhkd', 'dho 123 rnpfe', 'rRkkk']
+    jamos = ['ㄱㅗㄱㅏㅁㅈㅏ', 'ㄱㅗㄱㅏㅁㅁㅈㅏ', 'ㅇㅏㄴㄴㅕㅇ ㅎㅏㅅㅔㅇㅛ.', 'ㄱㅏㅅㅅ ㄹ', 'ㅏㅏ ㄱ']
+    for force in (True, False):
+        kam = KeystrokeAutomata(force)
+        for k in keys:
+            assert kam.convert(k) == kam._convert_by_feed(k)
+        am = JamoAutomata(force)
+        for j in jamos:
+            assert am.convert(j) == am._convert_by_feed(j)
+
+
+def test_streaming():
+    kam = KeystrokeAutomata(True)
+    assert kam.push('rhr') == ''
+    assert kam.push('kaw') == '고감'
+    assert kam.push('k ') == '자 '
+    assert kam.flush() == ''
+    assert ''.join(kam.iter_convert(['dkssud', 'gk', 'tpdy. q', 'kdrkq'])) == kam.convert('dkssudgktpdy. qkdrkq')
+
+    kam = KeystrokeAutomata(False)
+    assert kam.push('rhrk') == ''
+    assert kam.push('awk rhr') == '고감자 '
+    assert kam.push('kaawk ') == 'rhrkaawk '
+    assert kam.push('wk') == ''
+    assert kam.flush() == '자'
+    assert list(kam.iter_convert(['dkssud', ' rkaa'])) == ['안녕 ', 'rkaa']
+
+    am = JamoAutomata(True)
+    assert ''.join(am.iter_convert('ㄱㅗㄱㅏㅁㅁㅈㅏ')) == '고감ㅁ자'
+
+
+def test_reentrant_convert():
+    from concurrent.futures import ThreadPoolExecutor
+    from ..hangul_automata import convert_jamos_to_hangul, convert_keystrokes_to_hangul
+
+    assert convert_keystrokes_to_hangul('rhrkaawk') == '고감ㅁ자'
+    assert convert_keystrokes_to_hangul('rhrkaawk', force=False) == 'rhrkaawk'
+    assert convert_jamos_to_hangul('ㄱㅗㄱㅏㅁㅈㅏ') == '고감자'
+
+    # one automata shared by threads converting different texts
+    kam = KeystrokeAutomata(False)
+    texts = ['rhrkawk', 'rhrkaawk', 'dkssudgktpdy. qksrkqtmqslek!', 'dho 123 rnpfe', 'rRkkk'] * 200
+    expected = [KeystrokeAutomata(False).convert(t) for t in texts]
+    with ThreadPoolExecutor(8) as pool:
+        assert list(pool.map(kam.convert, texts)) == expected
@@ -1,3 +1,5 @@
+import pytest
+
 from ..hangul import Hangul
 
 
@@ -19,6 +21,10 @@ def test_Hangul():
     assert ret == 'ㅈㅓㄴㅎㅢㅇㅝㄴ'
     ret = h.convert_hangul_to_jamos("전희원", True)
     assert ret == 'ㅈㅓㄴ｜ㅎㅢ｜ㅇㅝㄴ｜'
+    # compatibility jamo and non Hangul characters
+    assert h.convert_hangul_to_jamos("ㄳ힣 a", True) == 'ㄳ｜ㅎㅣㅎ｜ ｜a｜'
+    assert h.convert_hangul_to_keystrokes("ㄳ힣 a") == 'rtglg a'
+    assert h.convert_hangul_to_keystrokes("") == ''
     assert h.convert_jamos_to_syllable('ㅈㅓㄴ') == '전'
     assert h.convert_jamos_to_syllable('ㄱㅣㄹㅎ') == '긿'
     assert h.convert_jamos_to_syllable('ㅎㅡㅣㄹㅎ') == '흻'
@@ -42,3 +48,14 @@ def test_Hangul():
     assert h.is_jamo('ㄲㅐaㅇB게놀자') is False
     assert h.is_jamo('ㄲㅐ게놀자') is False
     assert h.is_jamo('ㄲㅐ')
+    # get_keystroke_offsets
+    assert h.get_keystroke_offsets('고감 a') == [0, 2, 5, 6, 7]
+    assert h.get_keystroke_offsets('') == [0]
+    # translation_table
+    assert h.translation_table()[ord('전')] == 'wjs'
+    assert 'ab전'.translate(h.translation_table('jamos')) == h.convert_hangul_to_jamos('ab전')
+    assert len(h.translation_table('fullwidth')) == len(h.translation_table('keystrokes'))
+    with pytest.raises(TypeError):
+        h.translation_table()[ord('a')] = 'a'
+    with pytest.raises(ValueError):
+        h.translation_table('hanja')
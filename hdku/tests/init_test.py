@@ -0,0 +1,25 @@
+import importlib
+import subprocess
+import sys
+
+import hdku
+
+
+def test_lazy_imports():
+    # a fresh interpreter, this one has imported the submodules already
+    code = 'import sys, hdku; print(sorted(m for m in sys.modules if m.startswith("hdku.") or m == "numpy"))'
+    assert subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.strip() == '[]'
+    for name in hdku.__all__:
+        module = importlib.import_module('hdku.' + hdku._EXPORTS[name])
+        assert name in module.__all__
+        assert getattr(hdku, name) is getattr(module, name)
+    assert sorted(hdku.__all__) == sorted(n for m in hdku._SUBMODULES for n in importlib.import_module('hdku.' + m).__all__)
+    assert hdku.utils.KoDubeolsikDistance is hdku.KoDubeolsikDistance
+    assert 'KoSpellCorrector' in dir(hdku)
+    try:
+        hdku.missing
+    except AttributeError:
+        pass
+    else:
+        assert False
@@ -0,0 +1,34 @@
+from ..hangul_automata import KeystrokeAutomata
+from ..instrumentation import Stats
+from ..utils import KoDubeolsikDistance
+
+
+def test_stats():
+    kdd = KoDubeolsikDistance()
+    assert kdd.stats is None
+    seen = []
+    kdd.stats = Stats(callback=lambda stage, seconds, counts: seen.append(stage))
+    kdd.get_distance("안녕하세요", "안녕허세요")
+    kdd.get_distances("안녕하세요", ["안녕", ""])
+    kdd.get_syllable_distance("안녕", "안녕")
+    kdd.get_syllable_distance("안녕", "안녕")
+    snap = kdd.stats.snapshot()
+    counters = snap['counters']
+    assert counters['keystrokes.calls'] == 5
+    assert counters['keystrokes.chars'] == 17
+    # syllable pair costs are keystroke distances too
+    assert counters['distance.cells'] == 12 * 12 + 2 * 3 * 3
+    assert counters['batch_distance.pairs'] == 2
+    assert counters['syllable_distance.calls'] == 2
+    assert counters['syllable_distance.cache_misses'] == 4
+    assert counters['syllable_distance.cache_hits'] == 4
+    assert set(snap['seconds']) == {'keystrokes', 'distance', 'batch_distance', 'syllable_distance'}
+    assert seen[:2] == ['keystrokes', 'distance']
+    assert kdd.stats.reset() == snap
+    assert kdd.stats.snapshot() == {'counters': {}, 'seconds': {}}
+
+    kam = KeystrokeAutomata()
+    kam.stats = Stats()
+    kam.convert('rhrkawk')
+    kam.push('rhr')
+    assert kam.stats.snapshot()['counters'] == {'automata.calls': 2, 'automata.chars': 10}
@@ -0,0 +1,25 @@
+from ..hangul import Hangul
+from ..instrumentation import Stats
+from ..jamo_distance import KoJamoDistance
+from ..utils import KoDubeolsikDistance
+
+
+def test_jamo_distance():
+    jd = KoJamoDistance()
+    kdd = KoDubeolsikDistance()
+    model = jd.cost_model
+    assert model.substitution.shape == (len(model.symbols) + 1, ) * 2 and len(model.symbols) == 51 + 63
+    assert KoJamoDistance().cost_model is model
+    # compound jamo are single symbols, costed by their keystrokes
+    assert jd.get_jamo_distance("ㅘ", "ㅗ") == kdd.dubul_levelstein.get_dubeolsik_distance("hk", "h")
+    assert jd.get_distance("까", "가") == 0.3
+    assert jd.get_distance("", "과") == 3.0
+    assert jd.get_distance("과", "") == 3.0
+    assert len(Hangul().convert_hangul_to_jamos("과")) < len(Hangul().convert_hangul_to_keystrokes("과"))
+    # without compound jamo, the keystroke distance
+    for a, b in [("안녕하세요", "안녕허세요"), ("아버지가 방에", "아버지 가방에"), ("가나 12", "카나 1.2"), ("a.b", "a,b")]:
+        assert jd.get_distance(a, b) == kdd.get_distance(a, b)
+        assert jd.get_distance(b, a) == kdd.get_distance(b, a)
+    jd.stats = Stats()
+    jd.get_distance("과자", "고자")
+    assert jd.stats.snapshot()['counters'] == {'jamo_distance.calls': 1, 'jamo_distance.cells': 16}
@@ -0,0 +1,17 @@
+from ..keystroke_trie import KoDubeolsikTrie
+from ..utils import KoDubeolsikDistance
+
+
+def test_keystroke_trie():
+    kdd = KoDubeolsikDistance()
+    words = ["안녕하세요", "안녕허세요", "안녕하셈", "안녕", "아주 바빠요", "아주 바뻐요", "고감자", "고감"]
+    trie = KoDubeolsikTrie(kdd).build(words)
+    assert len(trie) == len(words)
+    for query in ["안녕하세요", "아주 바쁘요", "고감ㅈ", "안녕."]:
+        expected = sorted((kdd.get_distance(query, w), w) for w in words if kdd.get_distance(query, w) <= 2.0)
+        assert trie.search(query, 2.0) == expected
+    # capital/lowercase and phonetic costs of the table
+    trie = KoDubeolsikTrie(kdd).build(["짜", "카", "따"])
+    assert trie.search("자", 0.3) == [(0.3, "짜")]
+    assert (0.5, "카") in trie.search("가", 0.5)
+    assert (0.5, "따") in trie.search("타", 0.5)
@@ -1,3 +1,5 @@
+import pytest
+
 from ..ko_levenstein_distance import KoLevensteinDistance
 
 
@@ -25,3 +27,46 @@ def test_kolevensteindistance():
     assert dist.get_dubeolsik_distance("DD", "") == 2
     # phonetic distance
     assert dist.get_dubeolsik_distance("z", "r") == 0.5
+    # characters outside the cost table
+    assert dist.get_dubeolsik_distance("rk.", "rk.") == 0
+    assert dist.get_dubeolsik_distance("rk.", "rk,") == 1
+    assert dist.get_dubeolsik_distance("rk.", "rk") == 1
+    assert dist.trans_cost(".", ",") == 1.0
+
+
+def test_kolevensteindistance_batch():
+    dist = KoLevensteinDistance()
+    others = ["rhrkaWk", "", "rhrkaw", "rhrkawk1", "z", "rk.", "rhrkawk "]
+    for target in ["rhrkawk", "", "rk.", "r"]:
+        res = dist.get_dubeolsik_distances(target, others)
+        assert res.tolist() == [dist.get_dubeolsik_distance(target, o) for o in others]
+    assert len(dist.get_dubeolsik_distances("rhrkawk", [])) == 0
+
+
+def test_kolevensteindistance_max_cost():
+    dist = KoLevensteinDistance()
+    assert dist.get_dubeolsik_distance("rhrkawk", "rhrkaWk", 0.3) == 0.3
+    assert dist.get_dubeolsik_distance("rhrkawk", "rhrkaWk", 0.2) == dist.MAX_COST_EXCEEDED
+    assert dist.get_dubeolsik_distance("rhrkawk", "rhrkawk1", 2) == 2
+    assert dist.get_dubeolsik_distance("rhrkawk", "rhrkawk1", 1.5) == dist.MAX_COST_EXCEEDED
+    # length difference alone is over the budget
+    assert dist.get_dubeolsik_distance("rhrkawk", "r", 2) == dist.MAX_COST_EXCEEDED
+    assert dist.get_dubeolsik_distance("rk.", "rk.", 0) == 0
+    assert dist.get_dubeolsik_distance("", "", 0) == 0
+
+
+def test_kolevensteindistance_align(monkeypatch):
+    dist = KoLevensteinDistance()
+    assert dist.align("rhrkawk", "rhrkawk") == []
+    assert dist.align("rhrkawk", "rhrkaWk") == [('transition', 0.3, 5, 5)]
+    assert dist.align("rk", "") == [('insert', 1.0, 0, None), ('insert', 1.0, 1, None)]
+    pairs = [("rhrkawk", "rhrkawk1"), ("dkssudgktpdy", "dkssudgjtpdy"), ("rk. rk", "rkrk"), ("", "z1"),
+             ("dkqjwl rk qkddp", "dkqjwlrk qkdd")]
+    for target, other in pairs:
+        ops = dist.align(target, other)
+        assert sum(op.cost for op in ops) == pytest.approx(dist.get_dubeolsik_distance(target, other))
+    # split into sub-problems
+    monkeypatch.setattr(KoLevensteinDistance, 'ALIGN_BLOCK_CELLS', 4)
+    for target, other in pairs:
+        ops = dist.align(target, other)
+        assert sum(op.cost for op in ops) == pytest.approx(dist.get_dubeolsik_distance(target, other))
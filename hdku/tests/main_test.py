@@ -0,0 +1,29 @@
+from ..__main__ import main
+from ..hangul import Hangul
+from ..spell_corrector import KoSpellCorrector
+
+
+def test_main(tmp_path, capsys):
+    src = tmp_path / 'pairs.tsv'
+    src.write_text('안녕하세요\t안녕허세요\n아버지가 방에\t아버지 가방에\n', encoding='utf-8')
+    out = tmp_path / 'out.tsv'
+    assert main(['distance', str(src), '-o', str(out), '-q']) == 0
+    assert out.read_text(encoding='utf-8') == '안녕하세요\t안녕허세요\t0.5\n아버지가 방에\t아버지 가방에\t1.5\n'
+    assert main(['distance', str(src), '-o', str(out), '--max-cost', '1', '-j', '2', '--chunk-size', '1']) == 0
+    assert out.read_text(encoding='utf-8').split('\n')[1].endswith('\tinf')
+    assert 'lines/s' in capsys.readouterr().err
+
+    assert main(['to-keys', str(src), '-o', str(out), '-q']) == 0
+    keys = out.read_text(encoding='utf-8')
+    assert keys == Hangul().convert_hangul_to_keystrokes(src.read_text(encoding='utf-8'))
+    assert main(['from-keys', str(out), '-q', '-j', '2']) == 0
+    assert capsys.readouterr().out == src.read_text(encoding='utf-8')
+    assert main(['to-jamo', str(src), '--div', '-q']) == 0
+    assert capsys.readouterr().out.startswith('ㅇㅏㄴ｜ㄴㅕㅇ｜')
+
+    lexicon = tmp_path / 'lexicon.tsv'
+    lexicon.write_text('안녕하세요\t50\n안녕허세요\t1\n\n고감자\n', encoding='utf-8')
+    index = tmp_path / 'lexicon.idx'
+    assert main(['index', str(lexicon), '-o', str(index)]) == 0
+    res = KoSpellCorrector.load(str(index)).suggest('안녕하셰요', 2)
+    assert [(w, n) for _, w, n in res] == [('안녕하세요', 50), ('안녕허세요', 1)]
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from ..cost_model import CostModel
+from ..ko_levenstein_distance import KoLevensteinDistance
+from ..service import DistanceService, _run_batch, serve
+from ..utils import KoDubeolsikDistance
+
+
+def test_distance_service():
+    pairs = [('안녕하세요', '안녕허세요'), ('아버지가 방에', '아버지 가방에'), ('학교', '핚교')] * 20
+    expected = [KoDubeolsikDistance().get_distance(a, b) for a, b in pairs]
+    table = np.where(np.eye(len(KoLevensteinDistance.cost)), 0.0, 9.0)
+
+    async def run():
+        async with DistanceService(max_batch=16) as service:
+            assert await asyncio.gather(*(service.get_distance(a, b) for a, b in pairs)) == expected
+            assert await service.convert('안녕') == 'dkssud'
+            assert await service.convert('안녕', 'to-jamo') == 'ㅇㅏㄴㄴㅕㅇ'
+            assert await service.convert('dkssud', 'from-keys') == '안녕'
+            with pytest.raises(ValueError):
+                await service.submit('unknown', 'a')
+            # errors only fail their own request
+            results = await asyncio.gather(service.get_distance('a', None), service.get_distance('a', 'b'),
+                                           return_exceptions=True)
+            assert isinstance(results[0], Exception) and results[1] == KoDubeolsikDistance().get_distance('a', 'b')
+
+            service.reload(CostModel(table))
+            assert await service.get_distance('학교', '핚교') == 9
+            service.reload()
+            assert await service.get_distance('학교', '핚교') == expected[2]
+
+    asyncio.run(run())
+
+    # a worker asks for the table of a version it has not seen, once
+    assert _run_batch(100, [('to-keys', ('안녕', ))]) is None
+    assert _run_batch(100, [('to-keys', ('안녕', ))], table) == ['dkssud']
+    assert _run_batch(100, [('distance', ('학교', '핚교', None))]) == [9]
+
+
+def test_serve():
+    async def run():
+        async with DistanceService() as service:
+            listening = asyncio.get_running_loop().create_future()
+            server = asyncio.create_task(serve(service, port=0, ready=listening.set_result))
+            port = (await listening).sockets[0].getsockname()[1]
+
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write('{"id": 1, "op": "distance", "src": "안녕하세요", "target": "안녕허세요"}\n'
+                         '{"id": 2, "op": "to-keys", "text": "안녕"}\n{"id": 3, "op": "distance"}\n'
+                         'not json\n{"id": 4, "op": "distance", "src": "a", "target": null}\n'
+                         '{"id": 5, "op": "to-keys", "text": 5}\n'
+                         '{"id": 6, "op": "distance", "src": "a", "target": "b", "max_cost": "x"}\n'
+                         '{"id": 7, "op": "reload", "path": 7}\n'.encode('utf-8'))
+            writer.write_eof()
+            responses = [json.loads(await reader.readline()) for _ in range(8)]
+            writer.close()
+            by_id = {r.get('id'): r for r in responses}
+            assert by_id[1]['result'] == 0.5
+            assert by_id[2]['result'] == 'dkssud'
+            assert 'error' in by_id[3] and 'error' in by_id[None]
+            # wrong types are answered with an error too
+            assert by_id[4] == {'id': 4, 'error': 'target must be a string'}
+            assert by_id[5] == {'id': 5, 'error': 'text must be a string'}
+            assert 'error' in by_id[6] and by_id[7] == {'id': 7, 'result': 'reloaded'}
+
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            body = json.dumps([{'op': 'distance', 'src': '학교', 'target': '학교'}, {'op': 'to-jamo', 'text': None},
+                               {'op': 'reload'}]).encode()
+            writer.write(b'POST / HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body)
+            response = await reader.read()
+            writer.close()
+            assert response.startswith(b'HTTP/1.1 200 OK')
+            assert json.loads(response.split(b'\r\n\r\n', 1)[1]) == [
+                {'result': 0.0}, {'error': 'text must be a string'}, {'result': 'reloaded'}]
+
+            server.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await server
+
+    asyncio.run(run())
+
+
+def test_serve_reload(tmp_path, monkeypatch):
+    costs = tmp_path / 'costs.json'
+    CostModel(KoLevensteinDistance.cost).save(str(costs))
+    elsewhere = tmp_path / 'elsewhere.json'
+    CostModel(np.where(np.eye(len(KoLevensteinDistance.cost)), 0.0, 9.0)).save(str(elsewhere))
+    loaded = []
+    load = CostModel.load
+    monkeypatch.setattr(CostModel, 'load', lambda path: loaded.append(path) or load(path))
+
+    async def request(port, line):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(json.dumps(line).encode() + b'\n')
+        writer.write_eof()
+        response = json.loads(await reader.readline())
+        writer.close()
+        return response
+
+    async def run():
+        async with DistanceService() as service:
+            listening = asyncio.get_running_loop().create_future()
+            server = asyncio.create_task(serve(service, port=0, costs=str(costs), ready=listening.set_result))
+            port = (await listening).sockets[0].getsockname()[1]
+            distance = {'op': 'distance', 'src': '학교', 'target': '핚교'}
+            expected = KoDubeolsikDistance().get_distance('학교', '핚교')
+
+            # the path of a client never reaches the loader, the configured costs are reloaded
+            assert await request(port, {'op': 'reload', 'path': str(elsewhere)}) == {'result': 'reloaded'}
+            assert loaded == [str(costs)]
+            assert (await request(port, distance))['result'] == expected
+
+            costs.write_text(elsewhere.read_text())
+            assert await request(port, {'op': 'reload'}) == {'result': 'reloaded'}
+            assert (await request(port, distance))['result'] == 9
+            # a failed reload keeps the current costs and tells nothing of the file
+            costs.unlink()
+            assert await request(port, {'op': 'reload'}) == {'error': 'costs not reloaded'}
+            assert (await request(port, distance))['result'] == 9
+
+            server.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await server
+
+    asyncio.run(run())
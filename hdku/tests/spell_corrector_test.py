@@ -0,0 +1,56 @@
+import pytest
+
+from ..spell_corrector import KoSpellCorrector
+from ..utils import KoDubeolsikDistance
+
+
+def test_spell_corrector():
+    kdd = KoDubeolsikDistance()
+    lexicon = {"안녕하세요": 50, "안녕허세요": 1, "안녕하셈": 5, "안녕": 30, "아주 바빠요": 7, "아주 바뻐요": 2,
+               "고감자": 3, "감자": 9, "짜": 4, "자": 8}
+    corrector = KoSpellCorrector(kdd).build(lexicon)
+    assert len(corrector) == len(lexicon)
+    for query in ["안녕하세요", "안녕하셰요", "아주 바쁘요", "고감ㅈ", "감쟈"]:
+        expected = sorted(((kdd.get_distance(query, w), w, n) for w, n in lexicon.items()
+                           if kdd.get_distance(query, w) <= 1.5), key=lambda s: (s[0], -s[2], s[1]))
+        assert corrector.suggest(query, len(lexicon), 1.5) == expected
+    assert corrector.suggest("안녕하세요", 1) == [(0.0, "안녕하세요", 50)]
+    # same distance, the more frequent word first
+    corrector.build([("가", 3), ("ㄱㅏ", 6)])
+    assert corrector.suggest("가", 2) == [(0.0, "ㄱㅏ", 6), (0.0, "가", 3)]
+    # typed with the keyboard in English mode, and with shift
+    assert corrector.suggest("dkssudgktpdy", 1) == [(0.0, "안녕하세요", 50)]
+    assert corrector.suggest("wk", 2, 0.3) == [(0.0, "자", 8), (0.3, "짜", 4)]
+    assert corrector.suggest("뷁", 3) == []
+    assert corrector.suggest("dkssudgktpdy", 1, 1.0) == corrector.suggest("안녕하세요", 1, 1.0)
+    corrector.add("뷁", 2)
+    assert corrector.suggest("뷁", 3) == [(0.0, "뷁", 2)]
+
+
+def test_spell_corrector_file(tmp_path):
+    path = str(tmp_path / "lexicon.idx")
+    lexicon = {"안녕하세요": 50, "안녕허세요": 1, "안녕하셈": 5, "가": 3, "ㄱㅏ": 6, "hdku": 2}
+    corrector = KoSpellCorrector().build(lexicon)
+    corrector.save(path)
+    loaded = KoSpellCorrector.load(path)
+    assert len(loaded) == len(corrector)
+    for query in ["안녕하셰요", "가", "hdkv"]:
+        assert loaded.suggest(query, 5, 1.5) == corrector.suggest(query, 5, 1.5)
+    loaded.add("안녕하세용", 4)
+    assert (0.0, "안녕하세용", 4) in loaded.suggest("안녕하세용")
+    KoSpellCorrector().save(path)
+    assert KoSpellCorrector.load(path).suggest("가") == []
+
+    corrector.save(path)
+    with open(path, "r+b") as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 1]))
+    with pytest.raises(ValueError, match="checksum"):
+        KoSpellCorrector.load(path)
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write(b"\xff")
+    with pytest.raises(ValueError, match="version"):
+        KoSpellCorrector.load(path)
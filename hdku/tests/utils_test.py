@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 from ..utils import KoDubeolsikDistance
 
 
@@ -12,5 +15,98 @@ def test_KoDubeolsikDistance():
     assert kdd.get_distance("찡그린 상판때기가 너무 보기 싫어", "찡그린 상판떼기가 너무 보기 싫어") == 0.5
     assert kdd.get_distance("찡그린 상판때기가 너무 보기 싫어", "찡그린 상판때기게 너무 보기 싫어") == 1.0
 
-    # res = kdd.get_edx_samples('기시다와 아베 신조(安倍晋三).')
-    # assert len(res) == 3
+
+def test_KoDubeolsikDistance_batch():
+    kdd = KoDubeolsikDistance()
+    cands = ["안녕하세요", "안녕허세요", "안녕하셈", "", "아주 바빠요"]
+    assert kdd.get_distances("안녕하세요", cands).tolist() == [kdd.get_distance("안녕하세요", c) for c in cands]
+
+
+def test_KoDubeolsikDistance_max_cost():
+    kdd = KoDubeolsikDistance()
+    assert kdd.get_distance("안녕하세요", "안녕허세요", max_cost=1.0) == 0.5
+    assert kdd.get_distance("안녕하세요", "안녕하셈", max_cost=1.0) == float('inf')
+
+
+def test_KoDubeolsikDistance_align():
+    kdd = KoDubeolsikDistance()
+    assert kdd.align("안녕하세요", "안녕허세요") == [('transition', 0.5, 2, 2)]
+    assert kdd.align("아버지가 방에", "아버지 가방에") == [('delete', 0.5, None, 3), ('insert', 1.0, 4, None)]
+
+
+def test_KoDubeolsikDistance_syllable():
+    kdd = KoDubeolsikDistance()
+    assert kdd.get_syllable_distance("안녕하세요", "안녕허세요") == 0.5
+    assert kdd.get_syllable_distance("안녕하세요", "안녕하셈") == 3
+    assert kdd.get_syllable_distance("가", "") == kdd.get_distance("가", "")
+    assert kdd.get_syllable_distance("", "가나") == kdd.get_distance("", "가나")
+    misses = kdd.syllable_cache_info().misses
+    kdd.get_syllable_distance("안녕하세요", "안녕허세요")
+    assert kdd.syllable_cache_info().misses == misses
+
+
+def test_KoDubeolsikDistance_edx_samples():
+    kdd = KoDubeolsikDistance()
+    res = kdd.get_edx_samples('기시다와 아베 신조(安倍晋三).')
+    assert len(res) == 3
+    assert len(res['delete']) == len(res['insert']) == len(res['transition'])
+    assert kdd.get_edx_samples('가방', seed=1) == kdd.get_edx_samples('가방', seed=1)
+    deletes = list(kdd.iter_edx_samples('가방', 'delete'))
+    assert deletes == [(1.0, 'ㅏ방'), (1.0, 'ㄱ방'), (1.0, '가ㅏㅇ'), (1.0, '가ㅂㅇ'), (1.0, '가바')]
+    inserts = [c for _, c in kdd.iter_edx_samples('가방', 'insert', 1.0)]
+    assert '가 방' in inserts and '간방' in inserts and len(inserts) == len(set(inserts))
+    assert (0.5, '가빙') in list(kdd.iter_edx_samples('가방', 'transition', 0.5))
+    # an operation without candidates leaves nothing to draw from
+    assert kdd.get_edx_samples('') == {'delete': [], 'insert': [], 'transition': []}
+    assert kdd.get_edx_samples('123', seed=1) == {'delete': [], 'insert': [], 'transition': []}
+    assert len(kdd.get_edx_samples('123', downsample=False)['insert']) > 0
+
+
+def test_KoDubeolsikDistance_pairwise():
+    kdd = KoDubeolsikDistance()
+    words = ["안녕하세요", "안녕허세요", "안녕하셈", "아주 바빠요", ""]
+    full = kdd.pdist(words)
+    assert full.dtype == np.float32
+    assert full.tolist() == [[np.float32(kdd.get_distance(a, b)) for b in words] for a in words]
+    assert kdd.cdist(words[:2], words, n_jobs=2, tile_size=2).tolist() == full[:2].tolist()
+    cond = kdd.pdist(words, symmetric=True, n_jobs=2, tile_size=2)
+    assert len(cond) == 10
+    assert cond[0] == np.float32(kdd.get_symmetric_distance(words[0], words[1]))
+    assert cond[-1] == np.float32(kdd.get_symmetric_distance(words[3], words[4]))
+
+
+def test_KoDubeolsikDistance_encoded():
+    kdd = KoDubeolsikDistance()
+    texts = ["안녕하세요", "안녕허세요", "아버지가 방에", "아버지 가방에", "HDKU 1.0", "HDKU 1,0", ""]
+    codes = [kdd.encode(t) for t in texts]
+    assert codes[0].dtype == np.uint8 and len(codes[0]) == len("dkssudgktpdy")
+    for a, ca in zip(texts, codes):
+        for b, cb in zip(texts, codes):
+            expected = kdd.get_distance(a, b)
+            if "," in a + b and "." in a + b:
+                # '.' and ',' are both outside the cost table and share a code
+                expected -= 1
+            assert kdd.get_distance(ca, cb) == expected
+            assert kdd.get_distance(a, cb) == expected
+            assert kdd.get_distance(ca, cb, 1.0) == kdd.get_distance(ca, cb) or expected > 1.0
+            assert sum(op.cost for op in kdd.dubul_levelstein.align(ca, cb)) == pytest.approx(expected)
+        assert np.array_equal(kdd.get_distances(ca, codes), [kdd.get_distance(ca, cb) for cb in codes])
+    assert np.array_equal(kdd.cdist(codes, codes), kdd.cdist(texts, texts) - np.array(
+        [[("," in a + b and "." in a + b) for b in texts] for a in texts]))
+
+
+def test_KoDubeolsikDistance_threads():
+    kdd = KoDubeolsikDistance()
+    texts = ["안녕하세요", "안녕허세요", "아버지가 방에", "아버지 가방에", "HDKU 1.0", ""] * 50
+    keys = kdd.convert_many(texts, chunk_size=7, n_jobs=4)
+    assert keys == [kdd.hangul.convert_hangul_to_keystrokes(t) for t in texts]
+    assert kdd.convert_many(keys, 'from-keys', chunk_size=7) == [t for t in texts]
+    assert kdd.convert_many(texts[:2], 'to-jamo')[0] == 'ㅇㅏㄴㄴㅕㅇㅎㅏㅅㅔㅇㅛ'
+    with pytest.raises(ValueError):
+        kdd.convert_many(texts, 'to-hanja')
+
+    pairs = list(zip(texts, texts[1:] + texts[:1]))
+    expected = [kdd.get_distance(a, b) for a, b in pairs]
+    assert kdd.get_distances_parallel(pairs, chunk_size=5, n_jobs=4).tolist() == expected
+    assert kdd.get_distances_parallel(pairs, max_cost=1.0, n_jobs=1).tolist() == [
+        kdd.get_distance(a, b, 1.0) for a, b in pairs]
@@ -1,32 +1,357 @@
 # coding=utf-8
 # Copyright 2021 Heewon Jeon. All rights reserved.
 
-from typing import List, Dict
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 import string
+import time
 
 import numpy as np
 
+from .cost_model import CostModel
+from .hangul import Hangul
+from .hangul_automata import convert_keystrokes_to_hangul
+from .instrumentation import Stats
+from .ko_levenstein_distance import EditOperation, Keystrokes
+
 __all__ = ['KoDubeolsikDistance']
 
 
 class KoDubeolsikDistance:
-    """[summary]
+    """Keystroke distances between Hangul strings.
+
+    Conversions and distances keep their state in locals, so one instance
+    can be shared by threads without locking, see convert_many and
+    get_distances_parallel. Only assigning cost_model or stats is not
+    synchronized with calls running in other threads.
+
+    Args:
+        cost_model (Optional[CostModel], optional): keystroke costs, the
+            table of KoLevensteinDistance when None. Defaults to None.
     """
+    # syllable pairs kept by the cost cache of get_syllable_distance
+    SYLLABLE_CACHE_SIZE: int = 1 << 16
 
-    def __init__(self) -> None:
+    def __init__(self, cost_model: Optional[CostModel] = None) -> None:
         from . import Hangul
         from . import KoLevensteinDistance
         from . import KeystrokeAutomata
         self.hangul = Hangul()
-        self.dubul_levelstein = KoLevensteinDistance()
+        self.dubul_levelstein = KoLevensteinDistance(cost_model)
         self.automata = KeystrokeAutomata(force=True)
+        self._syllable_costs = lru_cache(maxsize=KoDubeolsikDistance.SYLLABLE_CACHE_SIZE)(self._syllable_cost)
+        self._syllable_pair_costs = lru_cache(maxsize=KoDubeolsikDistance.SYLLABLE_CACHE_SIZE)(self._syllable_pair_cost)
+        self._stats: Optional[Stats] = None
+        # recomposition of edited syllables, see iter_edx_samples
+        self._compose = lru_cache(maxsize=KoDubeolsikDistance.SYLLABLE_CACHE_SIZE)(self.automata.convert)
+
+    @property
+    def cost_model(self) -> CostModel:
+        """keystroke costs of every distance, replaceable without rebuilding the converters"""
+        return self.dubul_levelstein.cost_model
+
+    @cost_model.setter
+    def cost_model(self, cost_model: CostModel) -> None:
+        self.dubul_levelstein.cost_model = cost_model
+        # the syllable caches hold costs, the recomposition cache does not
+        self._syllable_costs.cache_clear()
+        self._syllable_pair_costs.cache_clear()
+
+    @property
+    def stats(self) -> Optional[Stats]:
+        """opt-in counters, shared with the distance and automata instances"""
+        return self._stats
+
+    @stats.setter
+    def stats(self, stats: Optional[Stats]) -> None:
+        self._stats = stats
+        self.dubul_levelstein.stats = stats
+        self.automata.stats = stats
+
+    def encode(self, text: str) -> np.ndarray:
+        """cost table codes of the keystrokes of `text`
+
+        The methods taking Hangul strings for a distance also take these
+        uint8 arrays, so a string compared many times is converted once. The
+        codes are the 52 letters, the digits, space and one code for every
+        other character, which are then all equal to each other.
+
+        Args:
+            text (str): Hangul string
+
+        Returns:
+            np.ndarray: uint8 codes, one per keystroke
+        """
+        return self.cost_model.encode(self.hangul.convert_hangul_to_keystrokes(text))
+
+    def _keystrokes(self, texts: Sequence[Keystrokes]) -> List[Keystrokes]:
+        # keystrokes of every text, recorded as the 'keystrokes' stage, encoded texts are kept
+        if self._stats is None:
+            return [t if isinstance(t, np.ndarray) else self.hangul.convert_hangul_to_keystrokes(t) for t in texts]
+        start: float = time.perf_counter()
+        keys: List[Keystrokes] = [t if isinstance(t, np.ndarray) else self.hangul.convert_hangul_to_keystrokes(t)
+                                  for t in texts]
+        self._stats.record('keystrokes', time.perf_counter() - start, calls=len(texts), chars=sum(map(len, texts)))
+        return keys
+
+    def get_distance(self, src: Keystrokes, target: Keystrokes, max_cost: Optional[float] = None) -> float:
+        """keystroke distance between two Hangul strings
+
+        Args:
+            src (Keystrokes): Hangul string, or its codes from encode
+            target (Keystrokes): Hangul string, or its codes from encode
+            max_cost (Optional[float], optional): budget, larger distances are
+                reported as KoLevensteinDistance.MAX_COST_EXCEEDED. Defaults to None.
 
-    def get_distance(self, src: str, target: str) -> float:
-        src_key: str = self.hangul.convert_hangul_to_keystrokes(src)
-        target_key: str = self.hangul.convert_hangul_to_keystrokes(target)
-        cost = self.dubul_levelstein.get_dubeolsik_distance(src_key, target_key)
+        Returns:
+            float: distance
+        """
+        src_key, target_key = self._keystrokes((src, target))
+        cost = self.dubul_levelstein.get_dubeolsik_distance(src_key, target_key, max_cost)
         return cost
 
+    def get_distances(self, query: Keystrokes, candidates: Sequence[Keystrokes]) -> np.ndarray:
+        """get_distance of `query` against every candidate, computed as one batch
+
+        Args:
+            query (Keystrokes): Hangul string, or its codes from encode
+            candidates (Sequence[Keystrokes]): Hangul strings, or their codes from encode
+
+        Returns:
+            np.ndarray: distances aligned with `candidates`
+        """
+        query_key: Keystrokes = self._keystrokes((query, ))[0]
+        candidate_keys: List[Keystrokes] = self._keystrokes(candidates)
+        return self.dubul_levelstein.get_dubeolsik_distances(query_key, candidate_keys)
+
+    def _converter(self, op: str) -> Callable[[str], str]:
+        if op == 'to-keys':
+            return self.hangul.convert_hangul_to_keystrokes
+        if op == 'to-jamo':
+            return self.hangul.convert_hangul_to_jamos
+        if op == 'from-keys':
+            return convert_keystrokes_to_hangul
+        raise ValueError("unknown conversion {!r}, expected 'to-keys', 'to-jamo' or 'from-keys'".format(op))
+
+    @staticmethod
+    def _map_chunks(fn: Callable[[Sequence], List], items: Sequence, n_jobs: Optional[int],
+                    chunk_size: int) -> List[Any]:
+        # fn over chunks of `items` in a thread pool, concatenated in order
+        if chunk_size < 1 or (n_jobs is not None and n_jobs < 1):
+            raise ValueError('n_jobs and chunk_size must be positive')
+        chunks: List[Sequence] = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        if len(chunks) <= 1 or n_jobs == 1:
+            return list(chain.from_iterable(map(fn, chunks)))
+        with ThreadPoolExecutor(n_jobs) as pool:
+            return list(chain.from_iterable(pool.map(fn, chunks)))
+
+    def convert_many(self, texts: Sequence[str], op: str = 'to-keys', n_jobs: Optional[int] = None,
+                     chunk_size: int = 1024) -> List[str]:
+        """convert every text in a pool of threads sharing this instance
+
+        Threads only run in parallel on free-threaded Python builds, with
+        the GIL they merely interleave.
+
+        Args:
+            texts (Sequence[str]): strings to convert
+            op (str, optional): Hangul to keystrokes ('to-keys') or jamos
+                ('to-jamo'), or keystrokes to Hangul ('from-keys'). Defaults to 'to-keys'.
+            n_jobs (Optional[int], optional): worker threads, the
+                ThreadPoolExecutor default when None. Defaults to None.
+            chunk_size (int, optional): texts per task. Defaults to 1024.
+
+        Raises:
+            ValueError: unknown conversion
+
+        Returns:
+            List[str]: converted texts, aligned with `texts`
+        """
+        convert: Callable[[str], str] = self._converter(op)
+        return self._map_chunks(lambda chunk: [convert(t) for t in chunk], texts, n_jobs, chunk_size)
+
+    def get_distances_parallel(self, pairs: Sequence[Tuple[Keystrokes, Keystrokes]], max_cost: Optional[float] = None,
+                               n_jobs: Optional[int] = None, chunk_size: int = 256) -> np.ndarray:
+        """get_distance of every pair in a pool of threads sharing this instance
+
+        Args:
+            pairs (Sequence[Tuple[Keystrokes, Keystrokes]]): (src, target) Hangul
+                strings, or their codes from encode
+            max_cost (Optional[float], optional): budget, see get_distance. Defaults to None.
+            n_jobs (Optional[int], optional): worker threads, the
+                ThreadPoolExecutor default when None. Defaults to None.
+            chunk_size (int, optional): pairs per task. Defaults to 256.
+
+        Returns:
+            np.ndarray: distances aligned with `pairs`
+        """
+        def distances(chunk: Sequence[Tuple[Keystrokes, Keystrokes]]) -> List[float]:
+            return [self.get_distance(src, target, max_cost) for src, target in chunk]
+        return np.array(self._map_chunks(distances, pairs, n_jobs, chunk_size), dtype=np.float64)
+
+    def get_syllable_distance(self, src: str, target: str) -> float:
+        """syllable level approximation of get_distance
+
+        The DP runs over syllables instead of keystrokes. Replacing a syllable
+        costs the keystroke distance between the two syllables, which is kept
+        in an LRU cache of syllable pairs (see syllable_cache_info). Inserting
+        or deleting one costs the sum of its keystroke insert or delete costs,
+        and one per keystroke at the borders, as in the keystroke DP.
+
+        Every syllable alignment is also a keystroke alignment, so for Hangul
+        and letters, whose insert and delete costs are all 1, the result is
+        never below get_distance. It is above only where the cheapest keystroke
+        alignment edits across a syllable boundary, e.g. a space moved to
+        another position, and by at most the number of keystrokes of the
+        syllables involved, which then get deleted and inserted whole. Spaces
+        (0.5) and digits (2) make both bounds approximate.
+
+        Args:
+            src (str): Hangul string
+            target (str): Hangul string
+
+        Returns:
+            float: distance
+        """
+        if self._stats is None:
+            return self._syllable_distance(src, target)
+        start: float = time.perf_counter()
+        before = self._syllable_pair_costs.cache_info()
+        distance: float = self._syllable_distance(src, target)
+        after = self._syllable_pair_costs.cache_info()
+        self._stats.record('syllable_distance', time.perf_counter() - start, calls=1, cells=len(src) * len(target),
+                           cache_hits=after.hits - before.hits, cache_misses=after.misses - before.misses)
+        return distance
+
+    def _syllable_distance(self, src: str, target: str) -> float:
+        src_costs: List[Tuple[int, float, float]] = [self._syllable_costs(ch) for ch in src]
+        src_ins: List[float] = [ins for _, ins, _ in src_costs]
+        # fetch each distinct pair from the cache once per call
+        distinct: Dict[str, int] = {ch: i for i, ch in enumerate(dict.fromkeys(src))}
+        src_ids: List[int] = [distinct[ch] for ch in src]
+        rows: Dict[str, List[float]] = {}
+        p: List[float] = [0.0]  # 'previous' cost array, horizontally
+        for keys, _, _ in src_costs:
+            p.append(p[-1] + keys)
+        for t in target:
+            trans: Optional[List[float]] = rows.get(t)
+            if trans is None:
+                costs: List[float] = [self._syllable_pair_costs(ch, t) for ch in distinct]
+                trans = rows[t] = [costs[i] for i in src_ids]
+            keys, _, dele = self._syllable_costs(t)
+            left: float = p[0] + keys
+            d: List[float] = [left]
+            diag: float = p[0]
+            for ins, up, cost in zip(src_ins, p[1:], trans):
+                v = left + ins
+                x = up + dele
+                if x < v:
+                    v = x
+                x = diag + cost
+                if x < v:
+                    v = x
+                d.append(v)
+                left = v
+                diag = up
+            p = d
+        return p[-1]
+
+    def syllable_cache_info(self):
+        """hits, misses and size of the syllable pair cache of get_syllable_distance
+
+        Returns:
+            functools._CacheInfo: statistics of functools.lru_cache
+        """
+        return self._syllable_pair_costs.cache_info()
+
+    def _syllable_cost(self, syllable: str) -> Tuple[int, float, float]:
+        # number of keystrokes, insert and delete cost of a syllable
+        keys: str = self.hangul.convert_hangul_to_keystrokes(syllable)
+        return (len(keys), sum(self.dubul_levelstein.insert_cost(k) for k in keys),
+                sum(self.dubul_levelstein.delete_cost(k) for k in keys))
+
+    def _syllable_pair_cost(self, src: str, target: str) -> float:
+        if src == target:
+            return 0.0
+        return self.dubul_levelstein.get_dubeolsik_distance(self.hangul.convert_hangul_to_keystrokes(src),
+                                                            self.hangul.convert_hangul_to_keystrokes(target))
+
+    def get_symmetric_distance(self, src: Keystrokes, target: Keystrokes) -> float:
+        """mean of the distances in both directions
+
+        Insert and delete costs differ, so get_distance is not symmetric.
+
+        Args:
+            src (Keystrokes): Hangul string, or its codes from encode
+            target (Keystrokes): Hangul string, or its codes from encode
+
+        Returns:
+            float: symmetrized distance
+        """
+        src_key, target_key = self._keystrokes((src, target))
+        return (self.dubul_levelstein.get_dubeolsik_distance(src_key, target_key) +
+                self.dubul_levelstein.get_dubeolsik_distance(target_key, src_key)) / 2
+
+    def align(self, src: str, target: str) -> List[EditOperation]:
+        """edits between two Hangul strings, by syllable
+
+        Args:
+            src (str): Hangul string
+            target (str): Hangul string
+
+        Returns:
+            List[EditOperation]: keystroke edits of get_distance(src, target) in order,
+                with source and target replaced by the indexes of the syllables they belong to
+        """
+        src_offsets: List[int] = self.hangul.get_keystroke_offsets(src)
+        target_offsets: List[int] = self.hangul.get_keystroke_offsets(target)
+        ops = self.dubul_levelstein.align(*self._keystrokes((src, target)))
+        return [op._replace(source=None if op.source is None else bisect_right(src_offsets, op.source) - 1,
+                            target=None if op.target is None else bisect_right(target_offsets, op.target) - 1)
+                for op in ops]
+
+    def cdist(self, a: Sequence[Keystrokes], b: Sequence[Keystrokes], n_jobs: int = 1, tile_size: int = 256,
+              out: Optional[str] = None) -> np.ndarray:
+        """distance between each pair of the two collections, like scipy's cdist
+
+        Args:
+            a (Sequence[Keystrokes]): Hangul strings, or their codes from encode
+            b (Sequence[Keystrokes]): Hangul strings, or their codes from encode
+            n_jobs (int, optional): worker processes. Defaults to 1.
+            tile_size (int, optional): rows/columns of a tile handed to one worker. Defaults to 256.
+            out (Optional[str], optional): path of a memory-mapped output file, for
+                matrices larger than RAM. Defaults to None.
+
+        Returns:
+            np.ndarray: float32 matrix whose (i, j) element is get_distance(a[i], b[j])
+        """
+        from .pairwise import pairwise_distances
+        a_keys: List[Keystrokes] = self._keystrokes(a)
+        b_keys: List[Keystrokes] = self._keystrokes(b)
+        return pairwise_distances(a_keys, b_keys, False, n_jobs, tile_size, out, self.cost_model)
+
+    def pdist(self, strings: Sequence[Keystrokes], symmetric: bool = False, n_jobs: int = 1, tile_size: int = 256,
+              out: Optional[str] = None) -> np.ndarray:
+        """pairwise distances among `strings`, like scipy's pdist
+
+        Args:
+            strings (Sequence[Keystrokes]): Hangul strings, or their codes from encode
+            symmetric (bool, optional): return the upper triangle of get_symmetric_distance
+                as a scipy style condensed vector instead of the full asymmetric matrix.
+                Defaults to False.
+            n_jobs (int, optional): worker processes. Defaults to 1.
+            tile_size (int, optional): rows/columns of a tile handed to one worker. Defaults to 256.
+            out (Optional[str], optional): path of a memory-mapped output file. Defaults to None.
+
+        Returns:
+            np.ndarray: float32 (n, n) matrix or condensed vector of length n * (n - 1) / 2
+        """
+        from .pairwise import pairwise_distances
+        keys: List[Keystrokes] = self._keystrokes(strings)
+        return pairwise_distances(keys, keys, symmetric, n_jobs, tile_size, out, self.cost_model)
+
     def _construct_string_from_mixedkeystroke(self, mixkey: str) -> str:
         """[summary]
 
@@ -55,136 +380,94 @@ class KoDubeolsikDistance:
                 return True
         return False
 
-    # def get_edx_samples(self, reference: str, ed_cost: List[float] = [1.0, 1.5, 1.5],
-    #                     downsample: bool = True) -> Dict[str, str]:
-    #     """generate all sentences below editdistance cost
-
-    #     Args:
-    #         reference (str): [description]
-    #         ed_cost (float, optional): [description]. Defaults to 0.5.
-
-    #     Returns:
-    #         List[str]: [description]
-    #     """
-    #     # insert, delete, trans
-    #     rml: List[str] = []
-    #     adl: List[str] = []
-    #     tra: List[str] = []
-    #     key_strokes: str = self.hangul.convert_hangul_to_keystrokes(reference, fullwidth=True, div=True)
-    #     rl: int = len(key_strokes)
-    #     d_cost, i_cost, tr_cost = ed_cost
-    #     # delete any position
-    #     for i in range(rl):
-    #         if self.hangul.DIVIDER == key_strokes[i]:
-    #             continue
-    #         # delete
-    #         rmed_key: str = key_strokes[:i] + key_strokes[(i + 1):]
-    #         rmed_sylla = self._construct_string_from_mixedkeystroke(rmed_key)
-    #         cost: float = self.get_distance(reference, rmed_sylla)
-    #         if cost > d_cost and key_strokes[i] != ' ':
-    #             continue
-    #         rml.append([cost, rmed_sylla])
-
-    #         # insert any position any ascii
-    #         if self.hangul.is_keystroke_fullwidth(key_strokes[i]):
-    #             if ord(key_strokes[i]) >= 65 and ord(key_strokes[i]) <= 90:  # A-Z
-    #                 letters = string.ascii_uppercase
-    #             else:
-    #                 letters = string.ascii_lowercase
-    #             for letter in self.hangul._convert_halfwidth_to_fullwidth(letters) + ' ':
-    #                 if letter == ' ':
-    #                     letter = ' ' + self.hangul.DIVIDER
-    #                 added_key: str = key_strokes[:i] + letter + key_strokes[i:]
-    #                 added_sylla = self._construct_string_from_mixedkeystroke(added_key)
-    #                 cost: float = self.get_distance(reference, added_sylla)
-    #                 if cost > i_cost and letter != ' ' + self.hangul.DIVIDER:
-    #                     continue
-    #                 adl.append([cost, added_sylla])
-    #         # elif ord(key_strokes[i]) >= 48 and ord(key_strokes[i]) <= 57:  # number
-    #         #     for number in string.digits + ' ':
-    #         #         if number == ' ':
-    #         #             number = ' ' + self.hangul.DIVIDER
-    #         #         added_key: str = key_strokes[:i] + number + key_strokes[i:]
-    #         #         added_sylla = self._construct_string_from_mixedkeystroke(added_key)
-    #         #         cost: float = self.get_distance(reference, added_sylla)
-    #         #         if cost > i_cost and number != ' ' + self.hangul.DIVIDER:
-    #         #             continue
-    #         #         adl.append([cost, added_sylla])
-    #         elif ord(key_strokes[i]) >= 65 and ord(key_strokes[i]) <= 90:  # A-Z
-    #             for letter in string.ascii_uppercase + ' ':
-    #                 if letter == ' ':
-    #                     letter = ' ' + self.hangul.DIVIDER
-    #                 added_key: str = key_strokes[:i] + letter + key_strokes[i:]
-    #                 added_sylla = self._construct_string_from_mixedkeystroke(added_key)
-    #                 cost: float = self.get_distance(reference, added_sylla)
-    #                 if cost > i_cost and letter != ' ' + self.hangul.DIVIDER:
-    #                     continue
-    #                 adl.append([cost, added_sylla])
-    #         elif ord(key_strokes[i]) >= 97 and ord(key_strokes[i]) <= 122:  # a-z
-    #             for letter in string.ascii_lowercase + ' ':
-    #                 if letter == ' ':
-    #                     letter = ' ' + self.hangul.DIVIDER
-    #                 added_key: str = key_strokes[:i] + letter + key_strokes[i:]
-    #                 added_sylla = self._construct_string_from_mixedkeystroke(added_key)
-    #                 cost: float = self.get_distance(reference, added_sylla)
-    #                 if cost > i_cost and letter != ' ' + self.hangul.DIVIDER:
-    #                     continue
-    #                 adl.append([cost, added_sylla])
-    #         # replace any position any ascii
-    #         if self.hangul.is_keystroke_fullwidth(key_strokes[i]):
-    #             if ord(key_strokes[i]) >= 65 and ord(key_strokes[i]) <= 90:  # A-Z
-    #                 letters = string.ascii_uppercase
-    #             else:
-    #                 letters = string.ascii_lowercase
-    #             for letter in self.hangul._convert_halfwidth_to_fullwidth(letters) + ' ':
-    #                 if letter == ' ':
-    #                     letter += self.hangul.DIVIDER
-    #                 trans_key: str = key_strokes[:(i - 1)] + letter + key_strokes[i:]
-    #                 trans_sylla = self._construct_string_from_mixedkeystroke(trans_key)
-    #                 cost: float = self.get_distance(reference, trans_sylla)
-    #                 if cost > tr_cost and letter != ' ' + self.hangul.DIVIDER:
-    #                     continue
-    #                 tra.append([cost, trans_sylla])
-    #         # elif ord(key_strokes[i]) >= 48 and ord(key_strokes[i]) <= 57:  # number
-    #         #     for number in string.digits + ' ':
-    #         #         if number == ' ':
-    #         #             number = ' ' + self.hangul.DIVIDER
-    #         #         trans_key: str = key_strokes[: (i - 1)] + number + key_strokes[i:]
-    #         #         trans_sylla = self._construct_string_from_mixedkeystroke(trans_key)
-    #         #         cost: float = self.get_distance(reference, trans_sylla)
-    #         #         if cost > tr_cost and number != ' ' + self.hangul.DIVIDER:
-    #         #             continue
-    #         #         tra.append([cost, trans_sylla])
-    #         elif ord(key_strokes[i]) >= 65 and ord(key_strokes[i]) <= 90:  # A-Z
-    #             for letter in string.ascii_uppercase + ' ':
-    #                 if letter == ' ':
-    #                     letter = ' ' + self.hangul.DIVIDER
-    #                 trans_key: str = key_strokes[:(i - 1)] + letter + key_strokes[i:]
-    #                 trans_sylla = self._construct_string_from_mixedkeystroke(trans_key)
-    #                 cost: float = self.get_distance(reference, trans_sylla)
-    #                 if cost > tr_cost and letter != ' ' + self.hangul.DIVIDER:
-    #                     continue
-    #                 tra.append([cost, trans_sylla])
-    #         elif ord(key_strokes[i]) >= 97 and ord(key_strokes[i]) <= 122 or key_strokes[i] == ' ':  # a-z
-    #             for letter in string.ascii_lowercase + ' ':
-    #                 if letter == ' ':
-    #                     letter = ' ' + self.hangul.DIVIDER
-    #                 trans_key: str = key_strokes[:(i - 1)] + letter + key_strokes[i:]
-    #                 trans_sylla = self._construct_string_from_mixedkeystroke(trans_key)
-    #                 cost: float = self.get_distance(reference, trans_sylla)
-    #                 if cost > tr_cost and letter != ' ' + self.hangul.DIVIDER:
-    #                     continue
-    #                 tra.append([cost, trans_sylla])
-
-    #     result = {'delete': [(c, v) for c, v in rml if c > 0 and not self._any_fullwidth(v)],
-    #               'insert': [(c, v) for c, v in adl if c > 0 and not self._any_fullwidth(v)],
-    #               'transition': [(c, v) for c, v in tra if c > 0 and not self._any_fullwidth(v)]}
-    #     if downsample:
-    #         min_cnt = min([len(v) for _, v in result.items()])
-    #         for k, v in result.items():
-    #             vl = len(v)
-    #             weight = np.array([1.0 / w for w, _ in v])
-    #             p = weight / np.sum(weight)
-    #             sel_vl = np.random.choice(vl, size=min_cnt, p=p, replace=False)
-    #             result[k] = np.array(v)[sel_vl].tolist()
-    #     return result
+    # keys of the Dubeolsik layout
+    HANGUL_KEYS: str = 'EOPQRTWabcdefghijklmnopqrstuvwxyz'
+
+    def _edit_unit(self, ch: str) -> Tuple[str, str, bool]:
+        # keystrokes of a character, keys it may be edited to, whether they compose
+        if ord(ch) in Hangul.translation_table('keystrokes'):
+            return self.hangul.convert_hangul_to_keystrokes(ch), KoDubeolsikDistance.HANGUL_KEYS, True
+        if 'a' <= ch <= 'z':
+            return ch, string.ascii_lowercase, False
+        if 'A' <= ch <= 'Z':
+            return ch, string.ascii_uppercase, False
+        return ch, '', False
+
+    def iter_edx_samples(self, reference: str, operation: str,
+                         max_cost: Optional[float] = None) -> Iterator[Tuple[float, str]]:
+        """strings one keystroke edit away from `reference`, lazily
+
+        Keys of Hangul and Latin letters are edited to keys of the same kind or
+        a space, other characters are only deleted, and a space may be inserted
+        anywhere. The cost is the one of the edited key in the cost table, and
+        only the syllable holding the edit is composed again.
+
+        Args:
+            reference (str): Hangul string
+            operation (str): 'delete', 'insert' or 'transition'
+            max_cost (Optional[float], optional): largest cost, edits of spaces are
+                always kept. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[float, str]]: (cost, candidate), every candidate once
+        """
+        if operation not in ('delete', 'insert', 'transition'):
+            raise ValueError('unknown operation {!r}'.format(operation))
+        lev = self.dubul_levelstein
+        seen: set = {reference}
+        for k, ch in enumerate(reference):
+            prefix: str = reference[:k]
+            suffix: str = reference[k + 1:]
+            keys, alphabet, composes = self._edit_unit(ch)
+            compose: Callable[[str], str] = self._compose if composes else str
+            edits: List[Tuple[float, str, bool]] = []  # cost, syllable after the edit, involves a space
+            if operation == 'delete':
+                for i, key in enumerate(keys):
+                    edits.append((lev.delete_cost(key), compose(keys[:i] + keys[i + 1:]), key == ' '))
+            elif operation == 'insert':
+                for i in range(len(keys) + 1):
+                    edits.append((lev.insert_cost(' '), compose(keys[:i]) + ' ' + compose(keys[i:]), True))
+                    for letter in alphabet:
+                        edits.append((lev.insert_cost(letter), compose(keys[:i] + letter + keys[i:]), False))
+            elif alphabet:
+                for i, key in enumerate(keys):
+                    edits.append((lev.trans_cost(key, ' '), compose(keys[:i]) + ' ' + compose(keys[i + 1:]), True))
+                    for letter in alphabet:
+                        if letter != key:
+                            edits.append((lev.trans_cost(key, letter), compose(keys[:i] + letter + keys[i + 1:]), False))
+            for cost, syllable, space in edits:
+                if max_cost is not None and cost > max_cost and not space:
+                    continue
+                candidate: str = prefix + syllable + suffix
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield cost, candidate
+
+    def get_edx_samples(self, reference: str, ed_cost: Sequence[float] = (1.0, 1.5, 1.5),
+                        downsample: bool = True, seed: Optional[int] = None) -> Dict[str, List[Tuple[float, str]]]:
+        """typo candidates of `reference` by edit operation
+
+        Args:
+            reference (str): Hangul string
+            ed_cost (Sequence[float], optional): largest delete, insert and transition cost.
+                Defaults to (1.0, 1.5, 1.5).
+            downsample (bool, optional): draw the same number of candidates from every
+                operation, without replacement and with probability 1 / cost. Defaults to True.
+            seed (Optional[int], optional): seed of the downsampling. Defaults to None.
+
+        Returns:
+            Dict[str, List[Tuple[float, str]]]: (cost, candidate) of 'delete', 'insert' and 'transition'
+        """
+        result: Dict[str, List[Tuple[float, str]]] = {
+            op: list(self.iter_edx_samples(reference, op, c)) for op, c in zip(('delete', 'insert', 'transition'), ed_cost)}
+        if downsample:
+            rng = np.random.default_rng(seed)
+            min_cnt: int = min(len(v) for v in result.values())
+            if min_cnt == 0:
+                # an operation without candidates, e.g. no letter to substitute
+                return {op: [] for op in result}
+            for op, v in result.items():
+                weight: np.ndarray = np.array([1.0 / c for c, _ in v])
+                selected: np.ndarray = rng.choice(len(v), size=min_cnt, p=weight / weight.sum(), replace=False)
+                result[op] = [v[i] for i in selected]
+        return result
@@ -2,7 +2,7 @@ from setuptools import setup
 
 
 setup(name='hdku',
-      python_requires='>=3.6',
+      python_requires='>=3.8',
       version=0.1,
       url='https://github.com/haven-jeon/HDKU',
       license='GPL-3',
@@ -13,5 +13,7 @@ setup(name='hdku',
       long_description=open('README.md', encoding='utf-8').read(),
       zip_safe=False,
       include_package_data=True,
-      install_requires=[]
+      entry_points={'console_scripts': ['hdku=hdku.__main__:main']},
+      install_requires=['numpy'],
+      extras_require={'arrow': ['pyarrow'], 'pandas': ['pandas']}
       )